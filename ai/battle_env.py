@@ -1,37 +1,62 @@
 import random
 from services.battle_simulator import BattleSimulator
 
+def observe(simulator, side="p1"):
+    """
+    Simplified state dictionary from one side's point of view: "p1_*" is always
+    the acting Pokémon, so an agent trained as P1 can also play as P2.
+    Types and the acting side's move set identify the matchup, so one model can
+    tell different pairings apart.
+    """
+    me, opp = (simulator.p1, simulator.p2) if side == "p1" else (simulator.p2, simulator.p1)
+    return {
+        "p1_hp": me.hp / me.max_hp,
+        "p2_hp": opp.hp / opp.max_hp,
+        "p1_status": me.status or "none",
+        "p2_status": opp.status or "none",
+        "p1_types": tuple(t.lower() for t in me.types),
+        "p2_types": tuple(t.lower() for t in opp.types),
+        "p1_moves": tuple(me.available_moves),
+    }
+
+def compute_reward(simulator, damage_done, damage_taken):
+    """Reward for P1 after a turn and whether the battle is over."""
+    winner = simulator.get_winner()
+    if winner == simulator.p1.name:
+        return 100 + damage_done - damage_taken, True  # Win bonus
+    elif winner == simulator.p2.name:
+        return -100 + damage_done - damage_taken, True  # Loss penalty
+    return damage_done - damage_taken, False  # Ongoing battle reward
+
 class PokemonBattleEnv:
-    def __init__(self, pokemon1_info, pokemon2_info):
+    def __init__(self, pokemon1_info, pokemon2_info, debug=False, opponent=None):
+        """`opponent` is an optional policy (see ai/policies.py) for P2; random moves otherwise."""
         self.p1_info = pokemon1_info
         self.p2_info = pokemon2_info
-        self.simulator = BattleSimulator(self.p1_info, self.p2_info)
+        self.debug = debug
+        self.opponent = opponent
+        self.simulator = BattleSimulator(self.p1_info, self.p2_info, debug=debug)
         self.done = False
 
     def reset(self):
-        self.simulator = BattleSimulator(self.p1_info, self.p2_info)
+        self.simulator = BattleSimulator(self.p1_info, self.p2_info, debug=self.debug)
         self.done = False
         return self.get_state()
 
     def get_state(self):
-        # Simplified state dictionary to represent current battle
-        return {
-            "p1_hp": self.simulator.p1.hp / self.simulator.p1.max_hp,
-            "p2_hp": self.simulator.p2.hp / self.simulator.p2.max_hp,
-            "p1_status": self.simulator.p1.status or "none",
-            "p2_status": self.simulator.p2.status or "none",
-        }
+        return observe(self.simulator, "p1")
 
     def step(self, p1_move):
-        print(f"[ENV STEP] p1_move: {p1_move}")
-
-        p2_move = random.choice(self.simulator.p2.available_moves)
-        print(f"[ENV STEP] p2_move: {p2_move}")
+        if self.opponent is not None:
+            p2_move = self.opponent.act_batch([self.simulator], "p2")[0]
+        else:
+            p2_move = random.choice(self.simulator.p2.available_moves)
+        if self.debug:
+            print(f"[ENV STEP] p1_move: {p1_move}, p2_move: {p2_move}")
 
         # Properly handle the result from execute_turn_with_moves
         try:
             result = self.simulator.execute_turn_with_moves(p1_move, p2_move)
-            print(f"[ENV STEP] execute_turn_with_moves returned: {result}")
 
             # Result is a tuple (damage_done, damage_taken), not None
             if not isinstance(result, tuple) or len(result) != 2:
@@ -39,26 +64,15 @@ class PokemonBattleEnv:
                 return self.get_state(), -10, True, {}
 
             damage_done, damage_taken = result
-            print(f"[ENV STEP] damage_done: {damage_done}, damage_taken: {damage_taken}")
 
         except Exception as e:
             print(f"[ENV STEP] ERROR during battle execution: {e}")
             return self.get_state(), -10, True, {}
 
         next_state = self.get_state()
-        winner = self.simulator.get_winner()
-        reward = 0
-        done = False
-        
-        # Better reward calculation
-        if winner == self.simulator.p1.name:
-            reward = 100 + damage_done - damage_taken  # Win bonus
-            done = True
-        elif winner == self.simulator.p2.name:
-            reward = -100 + damage_done - damage_taken  # Loss penalty
-            done = True
-        else:
-            reward = damage_done - damage_taken  # Ongoing battle reward
+        reward, done = compute_reward(self.simulator, damage_done, damage_taken)
 
-        print(f"[ENV STEP] reward: {reward}, done: {done}")
-        return next_state, reward, done, {}
\ No newline at end of file
+        if self.debug:
+            print(f"[ENV STEP] damage_done: {damage_done}, damage_taken: {damage_taken}, "
+                  f"reward: {reward}, done: {done}")
+        return next_state, reward, done, {}
@@ -0,0 +1,111 @@
+"""
+Incremental checkpoints for long `train_agent` runs.
+
+A checkpoint directory holds:
+  - snapshot.pkl: the full Q-table plus the episode / epsilon it was taken at
+  - deltas.log:   pickled records appended after the snapshot, each holding
+                  only the rows changed since the previous checkpoint
+
+Each `checkpoint()` appends one delta record, so its cost follows the number
+of rows touched since the last one. Every `compact_every` deltas the table is
+written as a new snapshot (atomically, via rename) and the log is truncated.
+Delta rows are absolute values, so replaying a record twice is harmless: a
+crash between the snapshot rename and the log truncation loses nothing.
+
+Only the Q-table, episode number and epsilon are restored. Replay buffers,
+n-step windows and eligibility traces start empty after a resume.
+"""
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from ai.rl_agent import migrate_q_table
+
+SNAPSHOT_FILE = "snapshot.pkl"
+DELTA_FILE = "deltas.log"
+
+
+class QTableCheckpointer:
+    def __init__(self, directory: str, compact_every: int = 20):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.compact_every = max(1, compact_every)
+        self._deltas_since_snapshot = self._repair_delta_log()
+
+    @property
+    def snapshot_path(self) -> Path:
+        return self.directory / SNAPSHOT_FILE
+
+    @property
+    def delta_path(self) -> Path:
+        return self.directory / DELTA_FILE
+
+    def checkpoint(self, agent, episode: int, epsilon: float) -> int:
+        """Append the rows changed since the last checkpoint; returns how many were written."""
+        rows = agent.drain_changes()
+        with open(self.delta_path, "ab") as f:
+            pickle.dump({"episode": episode, "epsilon": epsilon, "rows": rows}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        self._deltas_since_snapshot += 1
+        if self._deltas_since_snapshot >= self.compact_every:
+            self.compact(agent, episode, epsilon)
+        return len(rows)
+
+    def compact(self, agent, episode: int, epsilon: float):
+        """Write the full table as the new snapshot and start an empty delta log."""
+        agent.drain_changes()
+        tmp = self.snapshot_path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump({"episode": episode, "epsilon": epsilon, "q_table": agent.export_q_table()}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_path)
+        open(self.delta_path, "wb").close()
+        self._deltas_since_snapshot = 0
+
+    def restore(self, agent) -> Optional[Tuple[int, float]]:
+        """
+        Load snapshot + deltas into `agent`. Returns (episode, epsilon) of the
+        latest checkpoint, or None when the directory holds no checkpoint.
+        """
+        table: Dict[Any, Dict[str, float]] = {}
+        state = None
+        if self.snapshot_path.exists():
+            with open(self.snapshot_path, "rb") as f:
+                snapshot = pickle.load(f)
+            table = snapshot["q_table"]
+            state = (snapshot["episode"], snapshot["epsilon"])
+        for record, _ in self._read_deltas():
+            table.update(record["rows"])
+            state = (record["episode"], record["epsilon"])
+        if state is None:
+            return None
+        agent.load_q_table(migrate_q_table(table))
+        return state
+
+    def _read_deltas(self):
+        """Yield (record, end_offset) for every intact record of the delta log."""
+        if not self.delta_path.exists():
+            return
+        with open(self.delta_path, "rb") as f:
+            while True:
+                try:
+                    record = pickle.load(f)
+                except (EOFError, pickle.UnpicklingError, ValueError):
+                    # End of log, or a record cut short by a crash mid-write
+                    return
+                yield record, f.tell()
+
+    def _repair_delta_log(self) -> int:
+        """Drop a torn trailing record so new appends stay readable; returns the intact record count."""
+        count, end = 0, 0
+        for _, end in self._read_deltas():
+            count += 1
+        if self.delta_path.exists() and self.delta_path.stat().st_size > end:
+            with open(self.delta_path, "r+b") as f:
+                f.truncate(end)
+        return count
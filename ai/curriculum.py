@@ -0,0 +1,200 @@
+"""
+Roster-driven curriculum training.
+
+Matchups are sampled from a Pokémon pool (AI_POKEMON_POOL, the default
+training pair and an optional local dex at config.ROSTER_PATH), ordered from
+easy to hard and sharded across worker processes. Each shard trains one
+agent through its matchups in order, so what it learns on easy matchups
+carries over to the hard ones. The shard agents are either merged into one
+generalized agent or saved as a per-matchup table bank.
+
+State keys identify P2 only by its types and status, so matchups against
+opponents of the same types share rows. Within a shard those rows simply keep
+learning; across shards the merge keeps each action's highest value.
+
+Usage:
+    python -m ai.curriculum --episodes 2000 --workers 4 --mode generalized
+"""
+import argparse
+import json
+import pickle
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import config
+from ai.rl_agent import QLearningAgent, save_agent
+from services.battle_simulator import BattleSimulator
+
+Matchup = Tuple[Dict[str, Any], Dict[str, Any]]
+
+def load_roster(path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Training pool: AI_POKEMON_POOL + the default train.py pair + an optional local dex file."""
+    from api.play import AI_POKEMON_POOL
+    from train import p1_info, p2_info
+
+    roster: Dict[str, Dict[str, Any]] = {}
+    for poke in [*AI_POKEMON_POOL, p1_info, p2_info]:
+        roster.setdefault(poke["name"], poke)
+
+    path = path or config.ROSTER_PATH
+    if path:
+        with open(path, "r") as f:
+            for poke in json.load(f):
+                roster[poke["name"]] = poke
+    return list(roster.values())
+
+def _best_damage(attacker, defender, move_data, type_chart) -> float:
+    """Expected damage of the attacker's strongest move (no crits, mean variance)."""
+    best = 0.0
+    for move_name in attacker.available_moves:
+        move = move_data.get(move_name)
+        if not move or move.get("power", 0) <= 0:
+            continue
+        dmg = (((2 * 50 / 5 + 2) * move["power"] * (attacker.attack / max(1, defender.defense))) / 50) + 2
+        if move["type"] in [t.lower() for t in attacker.types]:
+            dmg *= 1.5
+        for t in defender.types:
+            dmg *= type_chart.get(move["type"], {}).get(t.lower(), 1.0)
+        best = max(best, dmg * move.get("accuracy", 1.0) * 0.925)
+    return best
+
+def matchup_difficulty(p1: Dict[str, Any], p2: Dict[str, Any]) -> float:
+    """
+    Difficulty in [0, 1] from P1's point of view: the share of the race to a KO
+    that P1 needs. 0.5 is an even fight, higher is harder.
+    """
+    sim = BattleSimulator(p1, p2)
+    p1_ttk = sim.p2.max_hp / max(1e-6, _best_damage(sim.p1, sim.p2, sim.move_data, sim.type_chart))
+    p2_ttk = sim.p1.max_hp / max(1e-6, _best_damage(sim.p2, sim.p1, sim.move_data, sim.type_chart))
+    return p1_ttk / (p1_ttk + p2_ttk)
+
+def build_curriculum(roster: List[Dict[str, Any]], max_matchups: Optional[int] = None,
+                     seed: Optional[int] = None) -> List[Tuple[float, Matchup]]:
+    """All ordered pairs (optionally a random sample), sorted easy -> hard."""
+    matchups = [(a, b) for a in roster for b in roster if a["name"] != b["name"]]
+    if max_matchups is not None and max_matchups < len(matchups):
+        matchups = random.Random(seed).sample(matchups, max_matchups)
+    return sorted(((matchup_difficulty(a, b), (a, b)) for a, b in matchups), key=lambda x: x[0])
+
+def matchup_key(p1: Dict[str, Any], p2: Dict[str, Any]) -> str:
+    return f"{p1['name']}_vs_{p2['name']}"
+
+def _train_shard(shard: List[Tuple[float, Matchup]], base_episodes: int, seed: int,
+                 train_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Worker entry point: train one agent through the shard's matchups in
+    curriculum order. Returns per-matchup results, each with the rows that
+    matchup updated, and the agent's final table.
+    """
+    from train import train_agent
+
+    agent = QLearningAgent(actions=shard[0][1][0].get("available_moves") or ["tackle"])
+    results = []
+    for i, (difficulty, (p1, p2)) in enumerate(shard):
+        # Harder matchups get a bigger episode budget
+        episodes = max(1, int(base_episodes * (0.5 + difficulty)))
+        agent.drain_changes()
+        metrics = train_agent(episodes=episodes, log_every=episodes, p1=p1, p2=p2, agent=agent,
+                              seed=seed + i, save_path=None, **train_kwargs)
+        results.append({
+            "matchup": matchup_key(p1, p2),
+            "difficulty": difficulty,
+            "episodes": metrics.count,
+            "steps": int(metrics.steps[:metrics.count].sum()),
+            "win_rate": metrics.win_rate,
+            "q_table": agent.drain_changes(),  # rows this matchup touched, after training on it
+        })
+    return {"results": results, "q_table": agent.export_q_table()}
+
+def train_roster(roster: List[Dict[str, Any]], episodes: int = 2000, workers: int = 1,
+                 max_matchups: Optional[int] = None, seed: int = 0,
+                 **train_kwargs) -> Dict[str, Any]:
+    """
+    Train every matchup of the curriculum across `workers` processes.
+    Matchups are dealt round-robin from the sorted list so each shard also
+    runs from easy to hard and shards get a similar amount of work. The
+    report's `tables` holds each shard agent's final table.
+    """
+    curriculum = build_curriculum(roster, max_matchups=max_matchups, seed=seed)
+    workers = max(1, min(workers, len(curriculum)))
+    shards = [curriculum[i::workers] for i in range(workers)]
+
+    started = time.perf_counter()
+    if workers == 1:
+        shard_results = [_train_shard(shards[0], episodes, seed, train_kwargs)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_train_shard, shard, episodes, seed + 1000 * i, train_kwargs)
+                       for i, shard in enumerate(shards)]
+            shard_results = [f.result() for f in futures]
+    elapsed = time.perf_counter() - started
+
+    results = sorted((r for shard in shard_results for r in shard["results"]), key=lambda r: r["difficulty"])
+    total_episodes = sum(r["episodes"] for r in results)
+    return {
+        "results": results,
+        "tables": [shard["q_table"] for shard in shard_results],
+        "elapsed_seconds": elapsed,
+        "workers": workers,
+        "matchups": len(results),
+        "matchups_per_hour": len(results) / elapsed * 3600 if elapsed else 0.0,
+        "episodes_per_second": total_episodes / elapsed if elapsed else 0.0,
+    }
+
+def merge_tables(tables: List[Dict[Any, Dict[str, float]]]) -> QLearningAgent:
+    """
+    One generalized agent from the shard agents' tables. A state learned by
+    several shards keeps, for each action, the highest value any of them
+    learned; no row is overwritten wholesale.
+    """
+    merged: Dict[Any, Dict[str, float]] = {}
+    for table in tables:
+        for key, row in table.items():
+            target = merged.get(key)
+            if target is None:
+                merged[key] = dict(row)
+                continue
+            for action, value in row.items():
+                if value > target.get(action, float("-inf")):
+                    target[action] = value
+    actions = sorted({a for row in merged.values() for a in row})
+    agent = QLearningAgent(actions=actions)
+    agent.load_q_table(merged)
+    return agent
+
+def save_table_bank(results: List[Dict[str, Any]], filename: str):
+    """Per-matchup bank: {"p1_vs_p2": rows updated while training that matchup}."""
+    with open(filename, "wb") as f:
+        pickle.dump({r["matchup"]: r["q_table"] for r in results}, f)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--episodes", type=int, default=2000, help="Base episodes per matchup (scaled by difficulty)")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--max-matchups", type=int, default=None, help="Randomly sample this many matchups")
+    parser.add_argument("--roster", default=None, help="JSON list of extra Pokémon (defaults to config.ROSTER_PATH)")
+    parser.add_argument("--mode", choices=("generalized", "bank"), default="generalized")
+    parser.add_argument("--output", default=None, help="qtable.pkl (generalized) or qtable_bank.pkl (bank)")
+    parser.add_argument("--update", default="one_step", choices=("one_step", "n_step", "lambda"))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    roster = load_roster(args.roster)
+    report = train_roster(roster, episodes=args.episodes, workers=args.workers,
+                          max_matchups=args.max_matchups, seed=args.seed, update=args.update)
+
+    for r in report["results"]:
+        print(f"{r['matchup']:<28} difficulty={r['difficulty']:.2f} episodes={r['episodes']:>6} win_rate={r['win_rate']:.2%}")
+    print(f"{report['matchups']} matchups in {report['elapsed_seconds']:.1f}s with {report['workers']} workers: "
+          f"{report['matchups_per_hour']:.0f} matchups/hour, {report['episodes_per_second']:.0f} episodes/s")
+
+    if args.mode == "generalized":
+        output = args.output or "qtable.pkl"
+        save_agent(merge_tables(report["tables"]), output)
+    else:
+        output = args.output or "qtable_bank.pkl"
+        save_table_bank(report["results"], output)
+    print(f"Saved {args.mode} tables to {Path(output).resolve()}")
@@ -0,0 +1,162 @@
+import random
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+import torch
+from torch import nn
+
+from ai.features import BattleFeaturizer
+from ai.replay_buffer import ReplayBuffer
+
+
+class QNetwork(nn.Module):
+    """Small MLP mapping a feature vector to one Q-value per vocabulary move."""
+    def __init__(self, input_dim: int, n_actions: int, hidden: int = 128):
+        super().__init__()
+        self.layers = nn.Sequential(
+            nn.Linear(input_dim, hidden),
+            nn.ReLU(),
+            nn.Linear(hidden, hidden),
+            nn.ReLU(),
+            nn.Linear(hidden, n_actions),
+        )
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        return self.layers(x)
+
+
+class DQNAgent:
+    """
+    CPU DQN agent with a target network and experience replay.
+
+    Implements the same `choose_action` / `learn` interface as `QLearningAgent`,
+    but works on `BattleFeaturizer` vectors, so one model covers every matchup.
+    Actions outside the state's legal moves (`p1_moves`, else `self.actions`)
+    are masked out. `choose_actions` / `q_values` run a whole batch of states
+    through a single forward pass.
+    """
+    def __init__(self, actions, featurizer: Optional[BattleFeaturizer] = None, hidden=128,
+                 learning_rate=1e-3, discount_factor=0.9, epsilon=0.2, batch_size=64,
+                 replay_capacity=50000, train_every=1, target_sync=500, seed=None):
+        if seed is not None:
+            torch.manual_seed(seed)
+        self.featurizer = featurizer or BattleFeaturizer()
+        self.actions = list(actions)
+        self.gamma = discount_factor
+        self.epsilon = epsilon
+        self.batch_size = batch_size
+        self.train_every = train_every
+        self.target_sync = target_sync
+        self.hidden = hidden
+
+        n_actions = len(self.featurizer.moves)
+        self.policy_net = QNetwork(self.featurizer.dim, n_actions, hidden)
+        self.target_net = QNetwork(self.featurizer.dim, n_actions, hidden)
+        self.target_net.load_state_dict(self.policy_net.state_dict())
+        self.target_net.eval()
+        self.optimizer = torch.optim.Adam(self.policy_net.parameters(), lr=learning_rate)
+
+        self.replay = ReplayBuffer(replay_capacity, seed=seed, state_shape=(self.featurizer.dim,),
+                                   state_dtype=np.float32)
+        # Legal-move mask of each stored next state, indexed by replay slot
+        self._next_legal = np.zeros((replay_capacity, n_actions), dtype=bool)
+        self._steps = 0
+        self._updates = 0
+
+    # ----- acting -----
+
+    @torch.inference_mode()
+    def q_values(self, states: Sequence[Mapping[str, Any]]) -> np.ndarray:
+        """Q-values for a batch of states, shape (len(states), len(featurizer.moves)); illegal moves are -inf."""
+        if not states:
+            return np.zeros((0, len(self.featurizer.moves)), dtype=np.float32)
+        features = self.featurizer.encode_batch(states, self.actions)
+        q = self.policy_net(torch.from_numpy(features)).numpy()
+        return np.where(self.featurizer.legal_from_features(features), q, -np.inf)
+
+    def choose_actions(self, states: Sequence[Mapping[str, Any]]) -> List[str]:
+        """Greedy (epsilon-perturbed) actions for many states with one forward pass."""
+        if not states:
+            return []
+        q = self.q_values(states)
+        greedy = q.argmax(axis=1)
+        explore = (np.random.random(len(states)) < self.epsilon) | ~np.isfinite(q).any(axis=1)
+        moves = self.featurizer.moves
+        chosen = [moves[a] for a in greedy.tolist()]
+        for i in np.flatnonzero(explore).tolist():
+            chosen[i] = random.choice(list(states[i].get("p1_moves") or self.actions))
+        return chosen
+
+    def choose_action(self, state):
+        return self.choose_actions([state])[0]
+
+    def greedy_action(self, state):
+        q = self.q_values([state])[0]
+        return self.featurizer.moves[int(q.argmax())] if np.isfinite(q).any() else None
+
+    # ----- learning -----
+
+    def begin_episode(self):
+        """Kept for interface parity with QLearningAgent; DQN has no per-episode state."""
+
+    def learn(self, state, action, reward, next_state, done=None):
+        """
+        Store the transition and, every `train_every` calls, take one minibatch
+        gradient step. `done` defaults to "either side has fainted".
+        """
+        if done is None:
+            done = next_state.get("p1_hp", 1.0) <= 0 or next_state.get("p2_hp", 1.0) <= 0
+        aid = self.featurizer.move_ids.get(action)
+        if aid is None:
+            return None
+        next_features = self.featurizer.encode(next_state, self.actions)
+        slot = self.replay.add(self.featurizer.encode(state, self.actions), aid, reward, next_features, done)
+        self._next_legal[slot] = self.featurizer.legal_from_features(next_features)
+
+        self._steps += 1
+        if self._steps % self.train_every or len(self.replay) < self.batch_size:
+            return None
+        return self._train_step()
+
+    def _train_step(self) -> float:
+        idx, s, a, r, s2, done, _ = self.replay.sample(self.batch_size)
+        s = torch.from_numpy(s)
+        s2 = torch.from_numpy(s2)
+        a = torch.from_numpy(a.astype(np.int64))
+        r = torch.from_numpy(r)
+        not_done = torch.from_numpy(~done).float()
+        next_legal = torch.from_numpy(self._next_legal[idx])
+
+        q = self.policy_net(s).gather(1, a.unsqueeze(1)).squeeze(1)
+        with torch.no_grad():
+            next_q = self.target_net(s2).masked_fill(~next_legal, float("-inf")).max(dim=1).values
+            next_q = torch.where(torch.isfinite(next_q), next_q, torch.zeros_like(next_q))
+            target = r + self.gamma * next_q * not_done
+
+        loss = nn.functional.smooth_l1_loss(q, target)
+        self.optimizer.zero_grad()
+        loss.backward()
+        self.optimizer.step()
+
+        self._updates += 1
+        if self._updates % self.target_sync == 0:
+            self.target_net.load_state_dict(self.policy_net.state_dict())
+        return float(loss.item())
+
+    # ----- persistence -----
+
+    def save(self, filename='dqn.pt'):
+        torch.save({
+            "moves": self.featurizer.moves,
+            "hidden": self.hidden,
+            "state_dict": self.policy_net.state_dict(),
+        }, filename)
+
+    @classmethod
+    def load(cls, filename='dqn.pt', actions=None, **kwargs) -> "DQNAgent":
+        checkpoint: Dict[str, Any] = torch.load(filename, map_location="cpu")
+        featurizer = BattleFeaturizer(moves=checkpoint["moves"])
+        agent = cls(actions or [], featurizer=featurizer, hidden=checkpoint["hidden"], **kwargs)
+        agent.policy_net.load_state_dict(checkpoint["state_dict"])
+        agent.target_net.load_state_dict(checkpoint["state_dict"])
+        return agent
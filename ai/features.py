@@ -0,0 +1,115 @@
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from services.battle_simulator import BattleSimulator
+from utils.type_chart import TYPE_EFFECTIVENESS
+
+TYPES: List[str] = list(TYPE_EFFECTIVENESS.keys())
+STATUSES: List[str] = ["none", "burn", "poison", "sleep", "paralyze", "freeze"]
+
+
+class BattleFeaturizer:
+    """
+    Turns a `PokemonBattleEnv` state dict into a fixed-length float vector.
+
+    Layout (in order):
+      - p1_hp, p2_hp ratios                                    (2)
+      - p1 / p2 status one-hot over STATUSES                   (2 x 6)
+      - p1 / p2 type multi-hot over TYPES                      (2 x 18)
+      - per move in `moves` (the action vocabulary):
+        legal flag, effective power vs p2 (STAB and type
+        multiplier applied, scaled by 1/300), accuracy         (3 x len(moves))
+
+    The per-move block is what lets a single network generalize across
+    matchups: it sees how good each of its moves is against this opponent.
+    Everything after the status block depends only on the matchup and is
+    cached per (p1_types, p2_types, p1_moves).
+    """
+    def __init__(self, moves: Optional[Sequence[str]] = None,
+                 move_data: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.move_data = move_data or BattleSimulator._get_move_database()
+        self.moves: List[str] = list(moves) if moves is not None else sorted(self.move_data)
+        self.move_ids = {m: i for i, m in enumerate(self.moves)}
+        self._type_ids = {t: i for i, t in enumerate(TYPES)}
+        self._status_ids = {s: i for i, s in enumerate(STATUSES)}
+
+        n = len(self.moves)
+        self._power = np.array([self.move_data.get(m, {}).get("power", 0) for m in self.moves], dtype=np.float32)
+        self._accuracy = np.array([self.move_data.get(m, {}).get("accuracy", 1.0) for m in self.moves], dtype=np.float32)
+        self._move_types = [self.move_data.get(m, {}).get("type", "normal") for m in self.moves]
+        # Effectiveness of every vocabulary move against every single type
+        self._effectiveness = np.ones((n, len(TYPES)), dtype=np.float32)
+        for i, mtype in enumerate(self._move_types):
+            for j, dtype in enumerate(TYPES):
+                self._effectiveness[i, j] = TYPE_EFFECTIVENESS.get(mtype, {}).get(dtype, 1.0)
+        self._move_type_ids = np.array([self._type_ids.get(t, -1) for t in self._move_types])
+
+        self._context_offset = 2 + 2 * len(STATUSES)
+        self._moves_offset = self._context_offset + 2 * len(TYPES)
+        self.dim = self._moves_offset + 3 * n
+        self._context_cache: Dict[tuple, np.ndarray] = {}
+
+    def legal_mask(self, state: Mapping[str, Any], default_moves: Iterable[str] = ()) -> np.ndarray:
+        moves = state.get("p1_moves") or default_moves
+        mask = np.zeros(len(self.moves), dtype=bool)
+        for m in moves:
+            idx = self.move_ids.get(m)
+            if idx is not None:
+                mask[idx] = True
+        return mask
+
+    def legal_from_features(self, features: np.ndarray) -> np.ndarray:
+        """Legal-move mask recovered from already encoded vectors (the per-move legal flags)."""
+        o = self._moves_offset
+        return features[..., o:o + len(self.moves)] > 0
+
+    def encode(self, state: Mapping[str, Any], default_moves: Iterable[str] = (),
+               out: Optional[np.ndarray] = None) -> np.ndarray:
+        vec = out if out is not None else np.zeros(self.dim, dtype=np.float32)
+        moves = state.get("p1_moves") or tuple(default_moves)
+        context_key = (tuple(state.get("p1_types", ())), tuple(state.get("p2_types", ())), tuple(moves))
+        context = self._context_cache.get(context_key)
+        if context is None:
+            context = self._encode_context(*context_key)
+            self._context_cache[context_key] = context
+        vec[self._context_offset:] = context
+
+        vec[0] = float(state.get("p1_hp", 1.0))
+        vec[1] = float(state.get("p2_hp", 1.0))
+        vec[2:self._context_offset] = 0.0
+        base = 2
+        for side in ("p1_status", "p2_status"):
+            status = (state.get(side) or "none").lower()
+            vec[base + self._status_ids.get(status, 0)] = 1.0
+            base += len(STATUSES)
+        return vec
+
+    def _encode_context(self, p1_types, p2_types, moves) -> np.ndarray:
+        """Matchup-dependent part of the vector (types + per-move block); constant within a battle."""
+        context = np.zeros(self.dim - self._context_offset, dtype=np.float32)
+        p1_idx = self._type_indices(p1_types)
+        p2_idx = self._type_indices(p2_types)
+        context[p1_idx] = 1.0
+        context[len(TYPES) + p2_idx] = 1.0
+
+        legal = self.legal_mask({"p1_moves": moves})
+        multiplier = self._effectiveness[:, p2_idx].prod(axis=1) if len(p2_idx) else np.ones(len(self.moves), np.float32)
+        stab = np.isin(self._move_type_ids, p1_idx).astype(np.float32) * 0.5 + 1.0
+        n = len(self.moves)
+        o = self._moves_offset - self._context_offset
+        context[o:o + n] = legal
+        context[o + n:o + 2 * n] = legal * self._power * multiplier * stab / 300.0
+        context[o + 2 * n:o + 3 * n] = legal * self._accuracy
+        return context
+
+    def encode_batch(self, states: Sequence[Mapping[str, Any]], default_moves: Iterable[str] = ()) -> np.ndarray:
+        default_moves = list(default_moves)
+        batch = np.zeros((len(states), self.dim), dtype=np.float32)
+        for i, state in enumerate(states):
+            self.encode(state, default_moves, out=batch[i])
+        return batch
+
+    def _type_indices(self, types: Iterable[str]) -> np.ndarray:
+        idx = [self._type_ids[t.lower()] for t in types if t.lower() in self._type_ids]
+        return np.array(idx, dtype=np.int64)
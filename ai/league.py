@@ -0,0 +1,221 @@
+"""
+Self-play league training.
+
+A Q-learning agent trains against opponents drawn from a pool: the /play
+heuristic, a random policy and frozen snapshots of the agent itself taken
+every `snapshot_every` episodes (only the newest `pool_size` are kept).
+`n_envs` battles run in lockstep so each opponent policy is asked for the
+moves of all its battles in one `act_batch` call per turn. The agent plays
+either side of the matchup (picked at random per episode), which is why
+states come from `observe(sim, side)` and each update passes the acting
+side's moves as the legal ones.
+
+Usage:
+    python -m ai.league --episodes 5000 --n-envs 32 --snapshot-every 500
+"""
+import argparse
+import random
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from ai.battle_env import observe
+from ai.metrics import TrainingMetrics
+from ai.policies import AgentPolicy, FrozenPolicy, HeuristicPolicy, RandomPolicy
+from ai.rl_agent import QLearningAgent, save_agent
+from services.battle_simulator import BattleSimulator
+
+
+def _other(side: str) -> str:
+    return "p2" if side == "p1" else "p1"
+
+def _turn(sim: BattleSimulator, side: str, move: str, opp_move: str):
+    """Run one turn with `side` playing `move`; returns (damage_done, damage_taken) for that side."""
+    if side == "p1":
+        return sim.execute_turn_with_moves(move, opp_move)
+    taken, done = sim.execute_turn_with_moves(opp_move, move)
+    return done, taken
+
+def _outcome(sim: BattleSimulator, side: str) -> Optional[int]:
+    """1 win, -1 loss, 0 draw for `side`; None while the battle is running."""
+    me, opp = (sim.p1, sim.p2) if side == "p1" else (sim.p2, sim.p1)
+    if me.hp <= 0 and opp.hp <= 0:
+        return 0
+    if opp.hp <= 0:
+        return 1
+    if me.hp <= 0:
+        return -1
+    return None
+
+def play_matches(policy_a, policy_b, p1: Dict[str, Any], p2: Dict[str, Any],
+                 battles: int = 100, max_turns: int = 100) -> Dict[str, Any]:
+    """
+    `battles` lockstep battles with `policy_a` on `p1` and `policy_b` on `p2`.
+    Both policies are queried once per turn for every running battle.
+    Battles still running after `max_turns` count as draws.
+    """
+    sims = [BattleSimulator(p1, p2) for _ in range(battles)]
+    turns = np.zeros(battles, dtype=np.int32)
+    outcomes: List[Optional[int]] = [None] * battles
+    running = list(range(battles))
+    while running:
+        active = [sims[i] for i in running]
+        moves_a = policy_a.act_batch(active, "p1")
+        moves_b = policy_b.act_batch(active, "p2")
+        still_running = []
+        for i, move_a, move_b in zip(running, moves_a, moves_b):
+            sims[i].execute_turn_with_moves(move_a, move_b)
+            turns[i] += 1
+            outcomes[i] = _outcome(sims[i], "p1")
+            if outcomes[i] is None and turns[i] < max_turns:
+                still_running.append(i)
+        running = still_running
+
+    wins = sum(1 for o in outcomes if o == 1)
+    losses = sum(1 for o in outcomes if o == -1)
+    return {
+        "battles": battles,
+        "wins": wins,
+        "losses": losses,
+        "draws": battles - wins - losses,
+        "win_rate": wins / battles if battles else 0.0,
+        "avg_turns": float(turns.mean()) if battles else 0.0,
+    }
+
+def win_rate_matrix(policies: List[Any], p1: Dict[str, Any], p2: Dict[str, Any],
+                    battles: int = 100, max_turns: int = 100) -> np.ndarray:
+    """
+    matrix[i, j] is the win rate of policies[i] against policies[j], with half
+    of the battles played from each side of the matchup.
+    """
+    n = len(policies)
+    matrix = np.full((n, n), np.nan)
+    half = max(1, battles // 2)
+    for i in range(n):
+        for j in range(n):
+            if i == j:
+                continue
+            as_p1 = play_matches(policies[i], policies[j], p1, p2, half, max_turns)
+            as_p2 = play_matches(policies[j], policies[i], p1, p2, half, max_turns)
+            matrix[i, j] = (as_p1["wins"] + as_p2["losses"]) / (2 * half)
+    return matrix
+
+def train_league(episodes: int = 5000, n_envs: int = 16, snapshot_every: int = 500,
+                 pool_size: int = 8, p1: Optional[Dict[str, Any]] = None,
+                 p2: Optional[Dict[str, Any]] = None, agent: Optional[QLearningAgent] = None,
+                 snapshot_dir: Optional[str] = None, max_turns: int = 100, log_every: int = 100,
+                 seed: Optional[int] = None, verbose: bool = False) -> Dict[str, Any]:
+    """
+    Train `agent` against the opponent pool. Returns the agent, the final pool
+    (fixed policies first, then snapshots oldest -> newest) and the metrics.
+    Snapshots are also written to `snapshot_dir` as compact .npz files.
+    """
+    from train import p1_info, p2_info
+
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+    p1 = p1 or p1_info
+    p2 = p2 or p2_info
+    agent = agent or QLearningAgent(actions=[*p1["available_moves"], *p2["available_moves"]])
+    fixed = [HeuristicPolicy(), RandomPolicy()]
+    snapshots: List[FrozenPolicy] = []
+    if snapshot_dir:
+        Path(snapshot_dir).mkdir(parents=True, exist_ok=True)
+    metrics = TrainingMetrics(episodes, log_every=log_every, verbose=verbose)
+
+    epsilon = 1.0
+    epsilon_decay = 0.995
+    min_epsilon = 0.1
+
+    def new_episode() -> Dict[str, Any]:
+        side = random.choice(("p1", "p2"))
+        sim = BattleSimulator(p1, p2)
+        return {"sim": sim, "side": side, "opponent": random.choice(fixed + snapshots),
+                "state": observe(sim, side), "reward": 0.0, "steps": 0}
+
+    started = 0
+    slots: List[Dict[str, Any]] = []
+    for _ in range(min(n_envs, episodes)):
+        slots.append(new_episode())
+        started += 1
+
+    while slots:
+        # One batched act_batch call per opponent policy
+        by_opponent = defaultdict(list)
+        for slot in slots:
+            by_opponent[id(slot["opponent"])].append(slot)
+        opp_moves: Dict[int, str] = {}
+        for group in by_opponent.values():
+            for side in ("p1", "p2"):
+                members = [s for s in group if _other(s["side"]) == side]
+                if members:
+                    moves = group[0]["opponent"].act_batch([s["sim"] for s in members], side)
+                    opp_moves.update({id(s): m for s, m in zip(members, moves)})
+
+        next_slots = []
+        for slot in slots:
+            sim, side, state = slot["sim"], slot["side"], slot["state"]
+            legal = (sim.p1 if side == "p1" else sim.p2).available_moves
+            action = agent.greedy_action(state) if random.random() >= epsilon else None
+            if action not in legal:
+                action = random.choice(legal)
+
+            damage_done, damage_taken = _turn(sim, side, action, opp_moves[id(slot)])
+            outcome = _outcome(sim, side)
+            reward = damage_done - damage_taken + (100 * outcome if outcome else 0)
+            next_state = observe(sim, side)
+            agent.learn(state, action, reward, next_state, legal_actions=legal)
+
+            slot["state"] = next_state
+            slot["reward"] += reward
+            slot["steps"] += 1
+            if outcome is None and slot["steps"] < max_turns:
+                next_slots.append(slot)
+                continue
+
+            epsilon = max(min_epsilon, epsilon * epsilon_decay)
+            metrics.record(slot["reward"], epsilon, slot["steps"], outcome == 1)
+            if snapshot_every and metrics.count % snapshot_every == 0:
+                snapshot = FrozenPolicy.from_agent(agent, name=f"ckpt_{metrics.count}")
+                snapshots.append(snapshot)
+                del snapshots[:-pool_size]
+                if snapshot_dir:
+                    snapshot.save(str(Path(snapshot_dir) / f"{snapshot.name}.npz"))
+            if started < episodes:
+                next_slots.append(new_episode())
+                started += 1
+        slots = next_slots
+
+    metrics.close()
+    return {"agent": agent, "pool": fixed + snapshots, "metrics": metrics}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--episodes", type=int, default=5000)
+    parser.add_argument("--n-envs", type=int, default=16, help="Battles stepped in lockstep")
+    parser.add_argument("--snapshot-every", type=int, default=500)
+    parser.add_argument("--pool-size", type=int, default=8, help="Most recent snapshots kept as opponents")
+    parser.add_argument("--snapshot-dir", default=None, help="Write snapshots here as .npz")
+    parser.add_argument("--eval-battles", type=int, default=100, help="Battles per pair for the win-rate matrix")
+    parser.add_argument("--output", default="qtable.pkl")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    result = train_league(episodes=args.episodes, n_envs=args.n_envs, snapshot_every=args.snapshot_every,
+                          pool_size=args.pool_size, snapshot_dir=args.snapshot_dir, seed=args.seed,
+                          verbose=True)
+    agent = result["agent"]
+    save_agent(agent, args.output)
+
+    from train import p1_info, p2_info
+    policies = [AgentPolicy(agent, name="final"), *result["pool"]]
+    matrix = win_rate_matrix(policies, p1_info, p2_info, battles=args.eval_battles)
+    names = [p.name for p in policies]
+    width = max(len(n) for n in names) + 2
+    print("Win rate of row vs column:")
+    print(" " * width + "".join(f"{n:>{width}}" for n in names))
+    for name, row in zip(names, matrix):
+        print(f"{name:<{width}}" + "".join(f"{'-':>{width}}" if np.isnan(v) else f"{v:>{width}.2f}" for v in row))
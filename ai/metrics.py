@@ -0,0 +1,160 @@
+import csv
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+CSV_FIELDS = ["episode", "mean_reward", "win_rate", "mean_steps", "epsilon", "elapsed_seconds"]
+
+
+class TrainingMetrics:
+    """
+    Records per-episode training results into preallocated arrays and writes
+    rolling aggregates every `log_every` episodes instead of printing per step.
+
+    Files written to `output_dir` (if given):
+      - metrics.csv: one aggregate row per window
+      - series.npz:  full per-episode series (rewards, epsilons, steps, wins)
+    """
+    def __init__(self, episodes: int, log_every: int = 100,
+                 output_dir: Optional[str] = None, verbose: bool = False):
+        self.capacity = max(1, int(episodes))
+        self.log_every = max(1, int(log_every))
+        self.verbose = verbose
+        self.output_dir = Path(output_dir) if output_dir else None
+
+        self.rewards = np.zeros(self.capacity, dtype=np.float32)
+        self.epsilons = np.zeros(self.capacity, dtype=np.float32)
+        self.steps = np.zeros(self.capacity, dtype=np.int32)
+        self.wins = np.zeros(self.capacity, dtype=bool)
+        self.count = 0
+        self.action_counts: Dict[str, int] = {}
+
+        self.rows: List[Dict[str, Any]] = []
+        self._window_start = 0
+        self._started = time.perf_counter()
+        self._finished: Optional[float] = None
+
+        if self.output_dir is not None:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.csv_path, "w", newline="") as f:
+                csv.writer(f).writerow(CSV_FIELDS)
+
+    @property
+    def csv_path(self) -> Optional[Path]:
+        return self.output_dir / "metrics.csv" if self.output_dir else None
+
+    @property
+    def series_path(self) -> Optional[Path]:
+        return self.output_dir / "series.npz" if self.output_dir else None
+
+    @property
+    def elapsed_seconds(self) -> float:
+        end = self._finished if self._finished is not None else time.perf_counter()
+        return end - self._started
+
+    @property
+    def win_count(self) -> int:
+        return int(self.wins[:self.count].sum())
+
+    @property
+    def win_rate(self) -> float:
+        return self.win_count / self.count if self.count else 0.0
+
+    def record(self, total_reward: float, epsilon: float, steps: int, won: bool):
+        """Store one finished episode; flush an aggregate row when a window fills up."""
+        if self.count >= self.capacity:
+            self._grow()
+        i = self.count
+        self.rewards[i] = total_reward
+        self.epsilons[i] = epsilon
+        self.steps[i] = steps
+        self.wins[i] = won
+        self.count += 1
+
+        if self.count - self._window_start >= self.log_every:
+            self._flush_window()
+
+    def rolling_win_rate(self, window: Optional[int] = None) -> float:
+        """Win rate over the last `window` episodes (defaults to `log_every`)."""
+        window = window or self.log_every
+        if self.count == 0:
+            return 0.0
+        start = max(0, self.count - window)
+        return float(self.wins[start:self.count].mean())
+
+    def close(self):
+        """Flush any partial window and write the full series to disk."""
+        if self.count > self._window_start:
+            self._flush_window()
+        self._finished = time.perf_counter()
+        if self.series_path is not None:
+            np.savez_compressed(
+                self.series_path,
+                rewards=self.rewards[:self.count],
+                epsilons=self.epsilons[:self.count],
+                steps=self.steps[:self.count],
+                wins=self.wins[:self.count],
+            )
+
+    def summary(self, max_points: int = 200) -> Dict[str, Any]:
+        """JSON-friendly summary with the series downsampled to at most `max_points` buckets."""
+        n = self.count
+        return {
+            "total_episodes": n,
+            "win_count": self.win_count,
+            "win_rate": self.win_rate,
+            "final_epsilon": float(self.epsilons[n - 1]) if n else None,
+            "mean_reward": float(self.rewards[:n].mean()) if n else 0.0,
+            "mean_steps": float(self.steps[:n].mean()) if n else 0.0,
+            "elapsed_seconds": self.elapsed_seconds,
+            "action_counts": self.action_counts,
+            "downsampled": {
+                "episode": downsample(np.arange(n, dtype=np.float64), max_points),
+                "reward": downsample(self.rewards[:n], max_points),
+                "win_rate": downsample(self.wins[:n].astype(np.float32), max_points),
+                "epsilon": downsample(self.epsilons[:n], max_points),
+            },
+        }
+
+    def _grow(self):
+        new_capacity = self.capacity * 2
+        for attr in ("rewards", "epsilons", "steps", "wins"):
+            old = getattr(self, attr)
+            arr = np.zeros(new_capacity, dtype=old.dtype)
+            arr[:self.capacity] = old
+            setattr(self, attr, arr)
+        self.capacity = new_capacity
+
+    def _flush_window(self):
+        start, end = self._window_start, self.count
+        row = {
+            "episode": end,
+            "mean_reward": float(self.rewards[start:end].mean()),
+            "win_rate": float(self.wins[start:end].mean()),
+            "mean_steps": float(self.steps[start:end].mean()),
+            "epsilon": float(self.epsilons[end - 1]),
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+        }
+        self.rows.append(row)
+        self._window_start = end
+
+        if self.csv_path is not None:
+            with open(self.csv_path, "a", newline="") as f:
+                csv.DictWriter(f, fieldnames=CSV_FIELDS).writerow(row)
+        if self.verbose:
+            print(f"Episode {row['episode']}: mean_reward={row['mean_reward']:.2f} "
+                  f"win_rate={row['win_rate']:.2%} epsilon={row['epsilon']:.3f}")
+
+
+def downsample(values: np.ndarray, max_points: int) -> List[float]:
+    """Bucket-average a 1-D series down to at most `max_points` values."""
+    n = len(values)
+    if n == 0:
+        return []
+    if n <= max_points:
+        return [float(v) for v in values]
+    edges = np.linspace(0, n, max_points + 1).astype(np.int64)
+    sums = np.add.reduceat(values.astype(np.float64), edges[:-1])
+    return (sums / np.diff(edges)).tolist()
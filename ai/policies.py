@@ -0,0 +1,104 @@
+"""
+Move-selection policies that can drive either side of a `BattleSimulator`.
+
+Every policy implements `act_batch(simulators, side) -> List[str]`, so a
+caller stepping many battles in lockstep asks each policy once per turn
+instead of once per battle.
+"""
+import random
+from pathlib import Path
+from typing import List
+
+from ai.battle_env import observe
+from ai.policy_table import PolicyTable, distill
+
+
+class RandomPolicy:
+    name = "random"
+
+    def act_batch(self, simulators, side: str) -> List[str]:
+        return [random.choice(_side(sim, side).available_moves or ["tackle"]) for sim in simulators]
+
+
+class HeuristicPolicy:
+    """The deterministic STAB/type-effectiveness heuristic used by /play."""
+    name = "heuristic"
+
+    def __init__(self, epsilon: float = 0.0):
+        from api.play import choose_ai_move_epsilon_greedy
+        self._choose = choose_ai_move_epsilon_greedy
+        self.epsilon = epsilon
+
+    def act_batch(self, simulators, side: str) -> List[str]:
+        opp_side = "p2" if side == "p1" else "p1"
+        return [self._choose(_side(sim, side), _side(sim, opp_side).types, epsilon=self.epsilon)
+                for sim in simulators]
+
+
+class AgentPolicy:
+    """Greedy play from a live agent (QLearningAgent or DQNAgent)."""
+    def __init__(self, agent, name: str = "agent"):
+        self.agent = agent
+        self.name = name
+
+    def act_batch(self, simulators, side: str) -> List[str]:
+        moves = []
+        for sim in simulators:
+            move = self.agent.greedy_action(observe(sim, side))
+            legal = _side(sim, side).available_moves or ["tackle"]
+            moves.append(move if move in legal else random.choice(legal))
+        return moves
+
+
+class BlendPolicy:
+    """/play's serving rule: the heuristic with probability `heuristic_weight`, the agent otherwise."""
+    def __init__(self, agent_policy, heuristic_weight: float, name: str = "blend"):
+        self.agent_policy = agent_policy
+        self.heuristic = HeuristicPolicy()
+        self.heuristic_weight = heuristic_weight
+        self.name = name
+
+    def act_batch(self, simulators, side: str) -> List[str]:
+        use_heuristic = [random.random() < self.heuristic_weight for _ in simulators]
+        heuristic = self.heuristic.act_batch([s for s, h in zip(simulators, use_heuristic) if h], side)
+        learned = self.agent_policy.act_batch([s for s, h in zip(simulators, use_heuristic) if not h], side)
+        heuristic, learned = iter(heuristic), iter(learned)
+        return [next(heuristic) if h else next(learned) for h in use_heuristic]
+
+
+class FrozenPolicy:
+    """
+    Immutable greedy snapshot of a tabular agent, used as a league opponent.
+
+    The snapshot is a PolicyTable (ai/policy_table.py): sorted uint64 state
+    keys and a uint8 argmax action per key, a small fraction of the pickled
+    float Q-table, saved in the same .npz format as the serving table.
+    """
+    def __init__(self, table: PolicyTable, name: str = "frozen"):
+        self.table = table
+        self.table.meta["name"] = name
+        self.name = name
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    @classmethod
+    def from_agent(cls, agent, name: str = "frozen") -> "FrozenPolicy":
+        return cls(distill(agent), name=name)
+
+    def save(self, filename: str):
+        self.table.save(filename)
+
+    @classmethod
+    def load(cls, filename: str) -> "FrozenPolicy":
+        table = PolicyTable.load(filename)
+        return cls(table, name=table.meta.get("name", Path(filename).stem))
+
+    def act_batch(self, simulators, side: str) -> List[str]:
+        states = [observe(sim, side) for sim in simulators]
+        legal = [_side(sim, side).available_moves or ["tackle"] for sim in simulators]
+        return self.table.choose_actions(states, legal_moves=legal)
+
+
+def _side(sim, side: str):
+    return sim.p1 if side == "p1" else sim.p2
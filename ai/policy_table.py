@@ -0,0 +1,232 @@
+"""
+Distilled serving policies.
+
+`export_policy_table` reduces any trained agent to its greedy decisions: a
+sorted uint64 array of state keys (ai/state_encoder.py) and a parallel uint8
+array of action ids, saved with the action names and the encoder config.
+`PolicyTable` loads that artifact and answers `choose_action(s)` with a
+binary search of the key array, so the serving process holds nothing but
+the two arrays: no float Q-matrix and no per-key Python objects. The league's
+frozen opponents (ai.policies.FrozenPolicy) are the same tables. Export runs
+a validation pass that replays sampled battle states through both the
+source agent and the table and records their agreement.
+
+Usage:
+    python -m ai.policy_table --agent qtable.pkl --output policy_table.npz
+    python -m ai.policy_table --agent dqn.pt --kind dqn --states 20000
+"""
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ai.state_encoder import encode_state, encoder_config
+
+MAX_ACTIONS = 255
+
+
+class PolicyTable:
+    """
+    Read-only greedy policy served from a distilled table.
+
+    Implements the acting half of the agent interface (`actions`, `epsilon`,
+    `choose_action`, `choose_actions`, `greedy_action`) so the API can use it
+    wherever it used the QLearningAgent.
+    """
+    def __init__(self, keys: np.ndarray, action_ids: np.ndarray, action_names: Sequence[str],
+                 encoder: Optional[Dict[str, Any]] = None, meta: Optional[Dict[str, Any]] = None):
+        current = encoder_config()
+        if encoder is not None and encoder != current:
+            raise ValueError(f"Policy table was built with encoder {encoder}, current encoder is {current}")
+        self.keys = np.asarray(keys, dtype=np.uint64)
+        self.action_ids = np.asarray(action_ids, dtype=np.uint8)
+        if len(self.keys) > 1 and not (self.keys[1:] >= self.keys[:-1]).all():
+            order = np.argsort(self.keys)
+            self.keys, self.action_ids = self.keys[order], self.action_ids[order]
+        self.action_space: List[str] = list(action_names)
+        self.actions: List[str] = list(action_names)
+        self.epsilon = 0.0
+        self.meta = meta or {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def lookup(self, keys: np.ndarray) -> np.ndarray:
+        """Action id of each state key (binary search of the sorted key array), -1 where absent."""
+        keys = np.asarray(keys, dtype=np.uint64)
+        if not len(self.keys):
+            return np.full(len(keys), -1, dtype=np.int64)
+        idx = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        return np.where(self.keys[idx] == keys, self.action_ids[idx].astype(np.int64), -1)
+
+    def greedy_action(self, state: Mapping[str, Any]) -> Optional[str]:
+        aid = int(self.lookup([encode_state(state)])[0])
+        return None if aid < 0 else self.action_space[aid]
+
+    def choose_action(self, state: Mapping[str, Any]) -> str:
+        return self.choose_actions([state])[0]
+
+    def choose_actions(self, states: Sequence[Mapping[str, Any]],
+                       legal_moves: Optional[Sequence[Sequence[str]]] = None,
+                       greedy: bool = True) -> List[str]:
+        """Table move per state; unknown states and moves outside `legal_moves` fall back to a random legal move."""
+        if not len(states):
+            return []
+        names = self.action_space
+        aids = self.lookup(np.fromiter((encode_state(s) for s in states), dtype=np.uint64, count=len(states)))
+        chosen = []
+        for i, aid in enumerate(aids.tolist()):
+            legal = legal_moves[i] if legal_moves is not None and legal_moves[i] else None
+            move = names[aid] if aid >= 0 else None
+            if move is None or (legal is not None and move not in legal):
+                move = random.choice(list(legal or self.actions or ["tackle"]))
+            chosen.append(move)
+        return chosen
+
+    def save(self, filename: str):
+        np.savez_compressed(
+            filename,
+            keys=self.keys,
+            action_ids=self.action_ids,
+            action_names=np.array(self.action_space),
+            encoder=np.array(json.dumps(encoder_config())),
+            meta=np.array(json.dumps(self.meta)),
+        )
+
+    @classmethod
+    def load(cls, filename: str) -> "PolicyTable":
+        with np.load(filename) as data:
+            return cls(data["keys"], data["action_ids"], data["action_names"].tolist(),
+                       encoder=json.loads(str(data["encoder"])), meta=json.loads(str(data["meta"])))
+
+
+def distill(agent, states: Optional[Sequence[Mapping[str, Any]]] = None) -> PolicyTable:
+    """
+    Greedy table of `agent`. A tabular agent is exported row by row from its
+    Q-matrix; any other agent (e.g. DQNAgent) is queried on `states`.
+    """
+    if hasattr(agent, "_state_keys"):
+        n, n_actions = len(agent._state_keys), len(agent.action_space)
+        masked = np.where(agent._legal[:n, :n_actions], agent._q[:n, :n_actions], -np.inf)
+        known = np.isfinite(masked).any(axis=1)
+        keys = np.array(agent._state_keys, dtype=np.uint64)[known]
+        action_ids = masked.argmax(axis=1)[known]
+        names = agent.action_space
+    else:
+        if not states:
+            raise ValueError("States are required to distill a non-tabular agent")
+        by_key: Dict[int, str] = {}
+        for state in states:
+            move = agent.greedy_action(state)
+            if move is not None:
+                by_key.setdefault(encode_state(state), move)
+        names = sorted(set(by_key.values()))
+        ids = {m: i for i, m in enumerate(names)}
+        keys = np.fromiter(by_key, dtype=np.uint64, count=len(by_key))
+        action_ids = np.array([ids[m] for m in by_key.values()], dtype=np.int64)
+    if len(names) > MAX_ACTIONS:
+        raise ValueError(f"Policy tables support at most {MAX_ACTIONS} actions, got {len(names)}")
+    order = np.argsort(keys)
+    return PolicyTable(keys[order], action_ids[order].astype(np.uint8), names)
+
+def sample_states(matchups: Sequence[Tuple[Dict[str, Any], Dict[str, Any]]], n: int,
+                  seed: int = 0) -> List[Dict[str, Any]]:
+    """`n` states from random-move battles over `matchups`, seen from both sides."""
+    from ai.battle_env import observe
+    from services.battle_simulator import BattleSimulator
+
+    rng = random.Random(seed)
+    states: List[Dict[str, Any]] = []
+    while len(states) < n:
+        p1, p2 = matchups[rng.randrange(len(matchups))]
+        sim = BattleSimulator(p1, p2)
+        while sim.get_winner() is None and len(states) < n:
+            states.append(observe(sim, "p1"))
+            states.append(observe(sim, "p2"))
+            sim.execute_turn_with_moves(rng.choice(sim.p1.available_moves), rng.choice(sim.p2.available_moves))
+    return states[:n]
+
+def validate(table: PolicyTable, agent, states: Sequence[Mapping[str, Any]]) -> Dict[str, Any]:
+    """
+    Agreement of the table with the source agent's greedy action, over the
+    sampled states the source agent has an opinion on. `coverage` is the
+    share of those states present in the table.
+    """
+    decided = covered = agree = 0
+    for state in states:
+        expected = agent.greedy_action(state)
+        if expected is None:
+            continue
+        decided += 1
+        actual = table.greedy_action(state)
+        covered += actual is not None
+        agree += actual == expected
+    return {
+        "states": len(states),
+        "decided": decided,
+        "coverage": covered / decided if decided else 0.0,
+        "agreement": agree / decided if decided else 0.0,
+    }
+
+def export_policy_table(agent, filename: str, states: Sequence[Mapping[str, Any]],
+                        validation_states: Optional[Sequence[Mapping[str, Any]]] = None,
+                        source: str = "", min_agreement: Optional[float] = None) -> PolicyTable:
+    """
+    Distill (from `states` for non-tabular agents), validate on
+    `validation_states` (default: `states`), record the report in the
+    artifact and save it.
+    """
+    table = distill(agent, states)
+    report = validate(table, agent, validation_states if validation_states is not None else states)
+    if min_agreement is not None and report["agreement"] < min_agreement:
+        raise ValueError(f"Agreement {report['agreement']:.2%} is below the required {min_agreement:.2%}")
+    table.meta = {"source": source, "entries": len(table), "validation": report}
+    table.save(filename)
+    return table
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agent", default="qtable.pkl", help="Trained agent file")
+    parser.add_argument("--kind", choices=("qlearning", "dqn"), default="qlearning")
+    parser.add_argument("--output", default="policy_table.npz")
+    parser.add_argument("--states", type=int, default=10000, help="Sampled states (validation; DQN distillation)")
+    parser.add_argument("--roster", action="store_true", help="Sample states over the whole training roster")
+    parser.add_argument("--min-agreement", type=float, default=None, help="Fail the export below this agreement")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from train import p1_info, p2_info
+    matchups = [(p1_info, p2_info)]
+    if args.roster:
+        from ai.curriculum import load_roster
+        roster = load_roster()
+        matchups = [(a, b) for a in roster for b in roster if a["name"] != b["name"]]
+
+    started = time.perf_counter()
+    if args.kind == "dqn":
+        from ai.dqn_agent import DQNAgent
+        agent = DQNAgent.load(args.agent, epsilon=0.0)
+    else:
+        from ai.rl_agent import load_agent
+        agent = load_agent(args.agent, actions=[])
+    agent_load = time.perf_counter() - started
+
+    # Held-out states for validation, so a DQN is not only checked on the states it was distilled from
+    states = sample_states(matchups, args.states, seed=args.seed)
+    held_out = sample_states(matchups, args.states, seed=args.seed + 1)
+    table = export_policy_table(agent, args.output, states, validation_states=held_out,
+                                source=args.agent, min_agreement=args.min_agreement)
+
+    started = time.perf_counter()
+    PolicyTable.load(args.output)
+    table_load = time.perf_counter() - started
+    report = table.meta["validation"]
+    print(f"{len(table)} states -> {args.output} ({Path(args.output).stat().st_size / 1024:.1f} KiB, "
+          f"source {Path(args.agent).stat().st_size / 1024:.1f} KiB)")
+    print(f"agreement {report['agreement']:.2%}, coverage {report['coverage']:.2%} "
+          f"over {report['decided']} of {report['states']} sampled states")
+    print(f"load time: table {table_load * 1e3:.1f} ms, source agent {agent_load * 1e3:.1f} ms")
@@ -0,0 +1,85 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class ReplayBuffer:
+    """
+    Fixed-capacity ring buffer of transitions backed by preallocated NumPy arrays.
+
+    By default states are stored as the integer state ids assigned by the
+    tabular agent, so a whole minibatch can be gathered from the Q matrix with a
+    single fancy-index. Pass `state_shape`/`state_dtype` to store feature
+    vectors instead (used by the DQN agent).
+    With `prioritized=True`, transitions are sampled proportionally to
+    |TD error| ** alpha and returned with importance-sampling weights.
+    """
+    def __init__(self, capacity: int, prioritized: bool = False, alpha: float = 0.6,
+                 beta: float = 0.4, priority_eps: float = 1e-3, seed: Optional[int] = None,
+                 state_shape: Tuple[int, ...] = (), state_dtype=np.int64):
+        if capacity <= 0:
+            raise ValueError("Replay capacity must be positive")
+        self.capacity = int(capacity)
+        self.prioritized = prioritized
+        self.alpha = alpha
+        self.beta = beta
+        self.priority_eps = priority_eps
+        self.rng = np.random.default_rng(seed)
+
+        self.states = np.zeros((self.capacity, *state_shape), dtype=state_dtype)
+        self.actions = np.zeros(self.capacity, dtype=np.int32)
+        self.rewards = np.zeros(self.capacity, dtype=np.float32)
+        self.next_states = np.zeros((self.capacity, *state_shape), dtype=state_dtype)
+        self.dones = np.zeros(self.capacity, dtype=bool)
+        self.priorities = np.zeros(self.capacity, dtype=np.float64) if prioritized else None
+
+        self.pos = 0
+        self.size = 0
+        self._max_priority = 1.0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, state_id, action_id: int, reward: float, next_state_id, done: bool) -> int:
+        """Insert a transition, overwriting the oldest one once the buffer is full. Returns its slot."""
+        i = self.pos
+        self.states[i] = state_id
+        self.actions[i] = action_id
+        self.rewards[i] = reward
+        self.next_states[i] = next_state_id
+        self.dones[i] = done
+        if self.prioritized:
+            # New transitions get the max priority so they are replayed at least once
+            self.priorities[i] = self._max_priority
+        self.pos = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        return i
+
+    def sample(self, batch_size: int) -> Tuple[np.ndarray, ...]:
+        """
+        Sample a minibatch.
+        Returns (indices, states, actions, rewards, next_states, dones, weights).
+        """
+        if self.size == 0:
+            raise ValueError("Cannot sample from an empty replay buffer")
+
+        if self.prioritized:
+            scaled = self.priorities[:self.size] ** self.alpha
+            probs = scaled / scaled.sum()
+            idx = self.rng.choice(self.size, size=batch_size, p=probs)
+            weights = (self.size * probs[idx]) ** (-self.beta)
+            weights /= weights.max()
+        else:
+            idx = self.rng.integers(0, self.size, size=batch_size)
+            weights = np.ones(batch_size, dtype=np.float64)
+
+        return (idx, self.states[idx], self.actions[idx], self.rewards[idx],
+                self.next_states[idx], self.dones[idx], weights)
+
+    def update_priorities(self, indices: np.ndarray, td_errors: np.ndarray):
+        """Set priorities of sampled transitions from their latest TD errors."""
+        if not self.prioritized:
+            return
+        new = np.abs(td_errors) + self.priority_eps
+        self.priorities[indices] = new
+        self._max_priority = max(self._max_priority, float(new.max()))
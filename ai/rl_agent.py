@@ -1,40 +1,338 @@
 import random
 import pickle
+from collections import deque
+from typing import Any, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from ai.replay_buffer import ReplayBuffer
+from ai.state_encoder import encode_state
 
 class QLearningAgent:
+    """
+    Tabular Q-learning agent.
+
+    Q-values live in a dense NumPy matrix: each visited state key is assigned a
+    row id and each action a column id. `export_q_table()` / `load_q_table()`
+    convert to and from the {state_key: {action: value}} dict the agent has
+    always been saved as; both walk the whole table.
+    """
     def __init__(self, actions, learning_rate=0.1, discount_factor=0.9, epsilon=0.2):
-        self.q_table = {}  # state-action values
-        self.actions = actions
         self.lr = learning_rate
         self.gamma = discount_factor
         self.epsilon = epsilon
 
+        self.action_space = []      # every action ever seen, in column order
+        self._action_ids = {}
+        self._state_ids = {}        # state key -> row id
+        self._state_keys = []       # row id -> state key
+        self._q = np.zeros((16, 4), dtype=np.float64)
+        self._legal = np.zeros((16, 4), dtype=bool)  # actions available when the row was created
+        self._dirty = np.zeros(16, dtype=bool)       # rows changed since the last drain_changes()
+
+        self.replay: Optional[ReplayBuffer] = None
+        self._n_step_window = deque()   # (state_id, action_id, reward) not yet updated
+        self._traces = {}               # sparse eligibility traces: (state_id, action_id) -> e
+        self.actions = actions
+
+    # ----- action / state bookkeeping -----
+
+    @property
+    def actions(self):
+        return self._actions
+
+    @actions.setter
+    def actions(self, actions):
+        self._actions = list(actions)
+        for a in self._actions:
+            self._action_id(a)
+
+    def _action_id(self, action) -> int:
+        aid = self._action_ids.get(action)
+        if aid is None:
+            aid = len(self.action_space)
+            self._action_ids[action] = aid
+            self.action_space.append(action)
+            self._reserve(len(self._state_keys), aid + 1)
+        return aid
+
+    def _state_id(self, key, create=True, legal=None) -> Optional[int]:
+        """Row id of a state key; a new row's legal actions are `legal`, or `actions` if None."""
+        sid = self._state_ids.get(key)
+        if sid is None and create:
+            cols = [self._action_id(a) for a in (self._actions if legal is None else legal)]
+            sid = len(self._state_keys)
+            self._reserve(sid + 1, len(self.action_space))
+            self._state_ids[key] = sid
+            self._state_keys.append(key)
+            self._legal[sid, cols] = True
+            self._dirty[sid] = True
+        return sid
+
+    def _reserve(self, rows: int, cols: int):
+        """Grow the Q matrix geometrically so appends stay amortized O(1)."""
+        cur_rows, cur_cols = self._q.shape
+        if rows <= cur_rows and cols <= cur_cols:
+            return
+        new_rows = max(rows, cur_rows * 2 if rows > cur_rows else cur_rows)
+        new_cols = max(cols, cur_cols * 2 if cols > cur_cols else cur_cols)
+        q = np.zeros((new_rows, new_cols), dtype=self._q.dtype)
+        legal = np.zeros((new_rows, new_cols), dtype=bool)
+        q[:cur_rows, :cur_cols] = self._q
+        legal[:cur_rows, :cur_cols] = self._legal
+        dirty = np.zeros(new_rows, dtype=bool)
+        dirty[:cur_rows] = self._dirty
+        self._q, self._legal, self._dirty = q, legal, dirty
+
+    def _max_q(self, state_ids):
+        """Max Q over each row's legal actions (0 for rows with none)."""
+        masked = np.where(self._legal[state_ids], self._q[state_ids], -np.inf)
+        best = masked.max(axis=-1)
+        return np.where(np.isfinite(best), best, 0.0)
+
+    def export_q_table(self):
+        """The whole table as {state_key: {action: value}}; O(table size), not for hot paths."""
+        n_actions = len(self.action_space)
+        return {
+            key: {self.action_space[a]: float(self._q[sid, a])
+                  for a in range(n_actions) if self._legal[sid, a]}
+            for sid, key in enumerate(self._state_keys)
+        }
+
+    def load_q_table(self, table):
+        """Replace the Q-values with a {state_key: {action: value}} table."""
+        self._state_ids, self._state_keys = {}, []
+        self._q = np.zeros((max(16, len(table)), max(4, len(self.action_space))), dtype=np.float64)
+        self._legal = np.zeros_like(self._q, dtype=bool)
+        self._dirty = np.zeros(len(self._q), dtype=bool)
+        for key, row in table.items():
+            sid = len(self._state_keys)
+            self._state_ids[key] = sid
+            self._state_keys.append(key)
+            for action, value in row.items():
+                aid = self._action_id(action)
+                self._q[sid, aid] = value
+                self._legal[sid, aid] = True
+
+    def drain_changes(self):
+        """
+        {state_key: {action: value}} for every row changed since the previous
+        call, then mark all rows clean. Cost is proportional to the number of
+        changed rows, not to the table size.
+        """
+        rows = np.flatnonzero(self._dirty[:len(self._state_keys)])
+        self._dirty[rows] = False
+        changes = {}
+        for sid in rows.tolist():
+            aids = np.flatnonzero(self._legal[sid])
+            changes[self._state_keys[sid]] = {self.action_space[a]: float(self._q[sid, a]) for a in aids.tolist()}
+        return changes
+
+    # ----- acting -----
+
     def get_state_key(self, state):
-        # Convert state dict to a hashable tuple key
-        return tuple(sorted(state.items()))
+        # Fixed-width int key shared with serving (see ai/state_encoder.py)
+        return encode_state(state)
 
     def choose_action(self, state):
-        key = self.get_state_key(state)
-        if random.random() < self.epsilon or key not in self.q_table:
+        sid = self._state_ids.get(self.get_state_key(state))
+        if random.random() < self.epsilon or sid is None:
             return random.choice(self.actions)
-        else:
-            return max(self.q_table[key], key=self.q_table[key].get)
+        return self._greedy(sid)
+
+    def greedy_action(self, state):
+        """Best known action for a state, or None if the state was never visited."""
+        sid = self._state_ids.get(self.get_state_key(state))
+        return None if sid is None else self._greedy(sid)
+
+    def is_greedy(self, state, action):
+        """
+        Whether `action` ties the best legal value in `state` (learn_lambda's
+        `greedy`). Never visited states and never tried actions value 0, so a
+        first visit or a tie on an untouched row counts as greedy.
+        """
+        sid = self._state_ids.get(self.get_state_key(state))
+        if sid is None:
+            return True
+        aid = self._action_ids.get(action)
+        value = 0.0 if aid is None else self._q[sid, aid]
+        return bool(value >= self._max_q(sid))
 
-    def learn(self, state, action, reward, next_state):
-        key = self.get_state_key(state)
-        next_key = self.get_state_key(next_state)
+    def _greedy(self, sid):
+        row = np.where(self._legal[sid], self._q[sid], -np.inf)
+        return self.action_space[int(row.argmax())]
 
-        self.q_table.setdefault(key, {a: 0 for a in self.actions})
-        self.q_table.setdefault(next_key, {a: 0 for a in self.actions})
+    def state_ids(self, states: Sequence[Mapping[str, Any]]) -> np.ndarray:
+        """Row id of each state, -1 for states never visited."""
+        ids = self._state_ids
+        return np.fromiter((ids.get(encode_state(s), -1) for s in states),
+                           dtype=np.int64, count=len(states))
 
-        predict = self.q_table[key][action]
-        target = reward + self.gamma * max(self.q_table[next_key].values())
+    def q_values(self, states: Sequence[Mapping[str, Any]],
+                 legal_moves: Optional[Sequence[Sequence[str]]] = None) -> np.ndarray:
+        """
+        Q-values for a batch of states with one gather, shape (len(states), len(action_space)).
+        Actions never taken in a state, unknown states and, if `legal_moves` is
+        given, moves outside each state's list are -inf.
+        """
+        sids = self.state_ids(states)
+        known = sids >= 0
+        rows = np.where(known, sids, 0)
+        mask = self._legal[rows, :len(self.action_space)] & known[:, None]
+        if legal_moves is not None:
+            allowed = np.zeros_like(mask)
+            for i, moves in enumerate(legal_moves):
+                cols = [self._action_ids[m] for m in moves if m in self._action_ids]
+                allowed[i, cols] = True
+            mask &= allowed
+        return np.where(mask, self._q[rows, :len(self.action_space)], -np.inf)
 
-        self.q_table[key][action] += self.lr * (target - predict)
+    def choose_actions(self, states: Sequence[Mapping[str, Any]],
+                       legal_moves: Optional[Sequence[Sequence[str]]] = None,
+                       greedy: bool = False) -> List[str]:
+        """
+        Batched `choose_action`: one vectorized lookup for all states. States
+        with no usable Q-values (and, unless `greedy`, an epsilon share of the
+        rest) get a random move from their `legal_moves` entry, else from `actions`.
+        """
+        if not len(states):
+            return []
+        q = self.q_values(states, legal_moves)
+        best = q.argmax(axis=1)
+        fallback = ~np.isfinite(q).any(axis=1)
+        if not greedy:
+            fallback |= np.random.random(len(states)) < self.epsilon
+        chosen = [self.action_space[a] for a in best.tolist()]
+        for i in np.flatnonzero(fallback).tolist():
+            moves = legal_moves[i] if legal_moves is not None and legal_moves[i] else self.actions
+            chosen[i] = random.choice(list(moves))
+        return chosen
+
+    # ----- learning -----
+
+    def learn(self, state, action, reward, next_state, legal_actions=None):
+        """
+        One-step Q-learning update. `legal_actions` are the moves available to
+        the acting side when it is not every action of the agent (an agent
+        playing either side of a matchup); new rows then only count those.
+        """
+        s = self._state_id(self.get_state_key(state), legal=legal_actions)
+        s2 = self._state_id(self.get_state_key(next_state), legal=legal_actions)
+        a = self._action_id(action)
+        self._legal[s, a] = True
+        self._dirty[s] = True
+
+        predict = self._q[s, a]
+        target = reward + self.gamma * self._max_q(s2)
+
+        self._q[s, a] += self.lr * (target - predict)
+
+    def begin_episode(self):
+        """Drop pending n-step transitions and eligibility traces from the previous episode."""
+        self._n_step_window.clear()
+        self._traces.clear()
+
+    def learn_n_step(self, state, action, reward, next_state, done, n=3):
+        """
+        n-step Q-learning: the oldest pending (s, a) is updated toward
+        r_t + gamma r_{t+1} + ... + gamma^(n-1) r_{t+n-1} + gamma^n max_a Q(s_{t+n}, a).
+        On `done` every pending transition is updated with its truncated return.
+        """
+        s = self._state_id(self.get_state_key(state))
+        s2 = self._state_id(self.get_state_key(next_state))
+        a = self._action_id(action)
+        self._legal[s, a] = True
+        self._dirty[s] = True
+        window = self._n_step_window
+        window.append((s, a, reward))
+
+        if done:
+            ret = 0.0
+            for ps, pa, pr in reversed(window):
+                ret = pr + self.gamma * ret
+                self._q[ps, pa] += self.lr * (ret - self._q[ps, pa])
+                self._dirty[ps] = True
+            window.clear()
+        elif len(window) >= n:
+            ret = self._max_q(s2)
+            for _, _, pr in reversed(window):
+                ret = pr + self.gamma * ret
+            ps, pa, _ = window.popleft()
+            self._q[ps, pa] += self.lr * (ret - self._q[ps, pa])
+            self._dirty[ps] = True
+
+    def learn_lambda(self, state, action, reward, next_state, done, lam=0.8, greedy=True,
+                     trace_min=1e-3):
+        """
+        Watkins' Q(lambda) with replacing traces.
+
+        Traces are stored sparsely as {(state_id, action_id): e} and pruned once
+        they decay below `trace_min`, so each update touches only the handful of
+        pairs visited recently. Pass `greedy=False` when `action` was exploratory
+        (see is_greedy): older traces are then cut before the update, as Watkins'
+        Q(lambda) requires.
+        """
+        s = self._state_id(self.get_state_key(state))
+        s2 = self._state_id(self.get_state_key(next_state))
+        a = self._action_id(action)
+        self._legal[s, a] = True
+        self._dirty[s] = True
+
+        if not greedy:
+            self._traces.clear()
+        self._traces[(s, a)] = 1.0
+
+        target = reward if done else reward + self.gamma * self._max_q(s2)
+        delta = target - self._q[s, a]
+
+        pairs = np.fromiter((k for pair in self._traces for k in pair), dtype=np.int64,
+                            count=2 * len(self._traces)).reshape(-1, 2)
+        e = np.fromiter(self._traces.values(), dtype=np.float64, count=len(self._traces))
+        self._q[pairs[:, 0], pairs[:, 1]] += self.lr * delta * e
+        self._dirty[pairs[:, 0]] = True
+
+        if done:
+            self._traces.clear()
+            return
+        decay = self.gamma * lam
+        self._traces = {k: v * decay for k, v in self._traces.items() if v * decay >= trace_min}
+
+    def enable_replay(self, capacity=50000, prioritized=False, alpha=0.6, beta=0.4, seed=None):
+        """Attach a replay memory; transitions are then stored with `remember` and trained with `learn_batch`."""
+        self.replay = ReplayBuffer(capacity, prioritized=prioritized, alpha=alpha, beta=beta, seed=seed)
+        return self.replay
+
+    def remember(self, state, action, reward, next_state, done):
+        if self.replay is None:
+            raise RuntimeError("Replay is not enabled; call enable_replay() first")
+        s = self._state_id(self.get_state_key(state))
+        s2 = self._state_id(self.get_state_key(next_state))
+        a = self._action_id(action)
+        self._legal[s, a] = True
+        self._dirty[s] = True
+        self.replay.add(s, a, reward, s2, done)
+
+    def learn_batch(self, batch_size=32) -> Optional[float]:
+        """
+        Sample a minibatch from replay and apply vectorized TD updates.
+        Returns the mean absolute TD error, or None if replay is still empty.
+        """
+        if self.replay is None or len(self.replay) == 0:
+            return None
+        idx, s, a, r, s2, done, weights = self.replay.sample(batch_size)
+
+        target = r + self.gamma * self._max_q(s2) * ~done
+        td = target - self._q[s, a]
+        # np.add.at accumulates correctly when a (state, action) pair repeats in the batch
+        np.add.at(self._q, (s, a), self.lr * weights * td)
+        self._dirty[s] = True
+
+        self.replay.update_priorities(idx, td)
+        return float(np.abs(td).mean())
 
 def save_agent(agent, filename='qtable.pkl'):
     with open(filename, 'wb') as f:
-        pickle.dump(agent.q_table, f)
+        pickle.dump(agent.export_q_table(), f)
 
 def load_agent(filename='qtable.pkl', actions=None):
     if actions is None:
@@ -46,5 +344,17 @@ def load_agent(filename='qtable.pkl', actions=None):
         raise RuntimeError(f"Failed to load agent from {filename}: {e}")
 
     agent = QLearningAgent(actions=actions)
-    agent.q_table = q_table
+    agent.load_q_table(migrate_q_table(q_table))
     return agent
+
+def migrate_q_table(q_table):
+    """Re-key tables saved with the old tuple(sorted(state.items())) keys; int keys pass through."""
+    if all(isinstance(key, int) for key in q_table):
+        return q_table
+    migrated = {}
+    for key, row in q_table.items():
+        new_key = encode_state(dict(key)) if isinstance(key, tuple) else key
+        merged = migrated.setdefault(new_key, {})
+        for action, value in row.items():
+            merged.setdefault(action, value)
+    return migrated
@@ -0,0 +1,121 @@
+"""
+Fixed-width integer keys for battle states.
+
+Training (`QLearningAgent.get_state_key`), the league snapshots and every
+serving path (/predict_move(s), /battle/simulate, /play) key the Q-table with
+`encode_state`, so the same battle always maps to the same key no matter
+whether it arrived as tuples from `observe()` or as JSON lists.
+
+The input is an `observe()`-style mapping; missing fields take their
+defaults (full HP, "none" status, no types, no moves). The key is a
+non-negative int below 2**64, laid out from the least significant bit:
+
+    bits  0-7    p1_hp  round(ratio * 255)
+    bits  8-15   p2_hp  round(ratio * 255)
+    bits 16-18   p1_status  index in STATUSES (7 = unknown)
+    bits 19-21   p2_status
+    bits 22-31   p1_types   two 5-bit slots, 1 + index in TYPES (0 = empty,
+    bits 32-41   p2_types   31 = unknown), smaller id in the low slot
+    bits 42-63   p1_moves   CRC32 of the sorted, comma-joined move names,
+                            masked to 22 bits (0 = no moves)
+
+HP ratios of Pokémon with max HP <= 255 never collide. Move sets share a
+22-bit hash, so two different sets collide with probability ~2**-22.
+"""
+import zlib
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Mapping, Tuple
+
+from ai.features import STATUSES, TYPES
+
+HP_LEVELS = 255
+UNKNOWN_STATUS = 7
+UNKNOWN_TYPE = 31
+MOVES_BITS = 22
+
+_STATUS_IDS: Dict[str, int] = {s: i for i, s in enumerate(STATUSES)}
+_TYPE_IDS: Dict[str, int] = {t: i + 1 for i, t in enumerate(TYPES)}
+# Field encodings come from client-supplied values (/predict_move(s)), so only
+# the known status vocabulary is a plain dict; type tuples and move sets go
+# through bounded LRU caches
+_STATUS_KEYS: Dict[Any, int] = {None: 0, "": 0, **_STATUS_IDS}
+FIELD_CACHE_SIZE = 4096
+
+
+def _status(value: Any) -> int:
+    try:
+        return _STATUS_KEYS[value]
+    except (KeyError, TypeError):
+        pass
+    name = value[0] if isinstance(value, (list, tuple)) and value else value
+    return _STATUS_IDS.get(str(name).lower(), UNKNOWN_STATUS) if name else 0
+
+@lru_cache(maxsize=FIELD_CACHE_SIZE)
+def _types_bits(key: Tuple[str, ...]) -> int:
+    ids = sorted(_TYPE_IDS.get(str(t).lower(), UNKNOWN_TYPE) for t in key)[:2]
+    ids += [0] * (2 - len(ids))
+    return ids[0] | ids[1] << 5
+
+def _types(values: Iterable[str]) -> int:
+    return _types_bits(tuple(values or ()))
+
+@lru_cache(maxsize=FIELD_CACHE_SIZE)
+def _moves_bits(key: Tuple[str, ...]) -> int:
+    if not key:
+        return 0
+    text = ",".join(sorted(m.lower() for m in key))
+    return zlib.crc32(text.encode()) & ((1 << MOVES_BITS) - 1)
+
+def moves_hash(moves: Iterable[str]) -> int:
+    """22-bit hash of a move set, independent of order."""
+    return _moves_bits(tuple(moves or ()))
+
+def encode_state(state: Mapping[str, Any]) -> int:
+    """Pack a battle state into its 64-bit key (layout in the module docstring)."""
+    get = state.get
+    p1_hp = int(get("p1_hp", 1.0) * HP_LEVELS + 0.5)
+    p2_hp = int(get("p2_hp", 1.0) * HP_LEVELS + 0.5)
+    if not 0 <= p1_hp <= HP_LEVELS:
+        p1_hp = 0 if p1_hp < 0 else HP_LEVELS
+    if not 0 <= p2_hp <= HP_LEVELS:
+        p2_hp = 0 if p2_hp < 0 else HP_LEVELS
+    try:
+        # Fast path: known statuses and tuple fields (lists are unhashable and fall through)
+        fields = (_STATUS_KEYS[get("p1_status")] << 16 | _STATUS_KEYS[get("p2_status")] << 19
+                  | _types_bits(get("p1_types", ())) << 22 | _types_bits(get("p2_types", ())) << 32
+                  | _moves_bits(get("p1_moves", ())) << 42)
+    except (KeyError, TypeError):
+        fields = (_status(get("p1_status")) << 16 | _status(get("p2_status")) << 19
+                  | _types(get("p1_types")) << 22 | _types(get("p2_types")) << 32
+                  | moves_hash(get("p1_moves")) << 42)
+    return p1_hp | p2_hp << 8 | fields
+
+def decode_state(key: int) -> Dict[str, Any]:
+    """Inverse of `encode_state` up to quantization; moves come back as their hash."""
+    def types(bits: int):
+        return tuple(TYPES[i - 1] if i != UNKNOWN_TYPE else "unknown"
+                     for i in (bits & 31, bits >> 5 & 31) if i)
+
+    def status(i: int):
+        return STATUSES[i] if i < len(STATUSES) else "unknown"
+
+    return {
+        "p1_hp": (key & 0xFF) / HP_LEVELS,
+        "p2_hp": (key >> 8 & 0xFF) / HP_LEVELS,
+        "p1_status": status(key >> 16 & 7),
+        "p2_status": status(key >> 19 & 7),
+        "p1_types": types(key >> 22 & 0x3FF),
+        "p2_types": types(key >> 32 & 0x3FF),
+        "p1_moves_hash": key >> 42,
+    }
+
+def encoder_config() -> Dict[str, Any]:
+    """Everything a stored key depends on; artifacts keyed with `encode_state` carry a copy."""
+    return {
+        "name": "state_encoder",
+        "version": 1,
+        "hp_levels": HP_LEVELS,
+        "moves_bits": MOVES_BITS,
+        "statuses": list(STATUSES),
+        "types": list(TYPES),
+    }
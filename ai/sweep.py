@@ -0,0 +1,190 @@
+"""
+Hyperparameter sweeps for the Q-learning agent.
+
+Trials are drawn from a grid or random search space and run concurrently in
+a process pool, each with its own seed. A trial is stopped early once its
+rolling win rate is still below `prune_below` after `prune_after` episodes.
+Results go to a CSV and, when a user id is given, to
+`TrainingSession.hyperparameters` (one row per trial).
+
+Search spaces are JSON objects. A list is a set of choices; an object
+{"low": .., "high": .., "log": bool} is a continuous range (random mode only):
+
+    {"learning_rate": {"low": 0.01, "high": 0.5, "log": true},
+     "discount_factor": [0.8, 0.9, 0.99],
+     "epsilon_decay": [0.99, 0.995, 0.999]}
+
+Usage:
+    python -m ai.sweep --mode random --trials 16 --workers 4 --episodes 3000
+"""
+import argparse
+import csv
+import itertools
+import json
+import math
+import random
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
+# Hyperparameters consumed by QLearningAgent; everything else goes to train_agent
+AGENT_PARAMS = ("learning_rate", "discount_factor", "epsilon")
+
+DEFAULT_SPACE: Dict[str, Any] = {
+    "learning_rate": [0.05, 0.1, 0.2, 0.4],
+    "discount_factor": [0.8, 0.9, 0.99],
+    "epsilon": [0.0, 0.1, 0.2],
+    "epsilon_decay": [0.99, 0.995, 0.999],
+    "min_epsilon": [0.05, 0.1],
+}
+
+CSV_FIELDS = ["trial", "seed", "hyperparameters", "episodes", "win_rate", "final_win_rate",
+              "final_epsilon", "elapsed_seconds", "pruned"]
+
+
+def grid_trials(space: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Every combination of the choice lists in `space`."""
+    for name, values in space.items():
+        if not isinstance(values, list):
+            raise ValueError(f"Grid search needs a list of values for '{name}'")
+    names = list(space)
+    return [dict(zip(names, combo)) for combo in itertools.product(*(space[n] for n in names))]
+
+def random_trials(space: Dict[str, Any], n_trials: int, seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    """`n_trials` independent samples from `space`."""
+    rng = random.Random(seed)
+    trials = []
+    for _ in range(n_trials):
+        params = {}
+        for name, spec in space.items():
+            if isinstance(spec, list):
+                params[name] = rng.choice(spec)
+            elif spec.get("log"):
+                params[name] = math.exp(rng.uniform(math.log(spec["low"]), math.log(spec["high"])))
+            else:
+                params[name] = rng.uniform(spec["low"], spec["high"])
+        trials.append(params)
+    return trials
+
+def run_trial(trial: int, params: Dict[str, Any], episodes: int, seed: int,
+              prune_after: int, prune_below: float, window: int) -> Dict[str, Any]:
+    """Worker entry point: train one agent with `params`, pruning it if it falls behind."""
+    from ai.rl_agent import QLearningAgent
+    from train import p1_info, train_agent
+
+    agent = QLearningAgent(actions=p1_info["available_moves"],
+                           **{k: v for k, v in params.items() if k in AGENT_PARAMS})
+    pruned = []
+
+    def on_episode_end(episode, agent, metrics):
+        done = episode + 1
+        if prune_after and done >= prune_after and done % window == 0 \
+                and metrics.rolling_win_rate(window) < prune_below:
+            pruned.append(done)
+            return True
+        return False
+
+    metrics = train_agent(episodes=episodes, log_every=window, seed=seed, save_path=None, agent=agent,
+                          on_episode_end=on_episode_end,
+                          **{k: v for k, v in params.items() if k not in AGENT_PARAMS})
+    n = metrics.count
+    return {
+        "trial": trial,
+        "seed": seed,
+        "hyperparameters": params,
+        "episodes": n,
+        "win_rate": metrics.win_rate,
+        "final_win_rate": metrics.rolling_win_rate(window),
+        "final_epsilon": float(metrics.epsilons[n - 1]) if n else None,
+        "elapsed_seconds": metrics.elapsed_seconds,
+        "pruned": bool(pruned),
+    }
+
+def run_sweep(trials: List[Dict[str, Any]], episodes: int = 3000, workers: int = 1, seed: int = 0,
+              prune_after: int = 500, prune_below: float = 0.3, window: int = 100,
+              verbose: bool = False) -> List[Dict[str, Any]]:
+    """Run every trial (trial i gets seed `seed + i`); results are sorted best-first by final rolling win rate."""
+    args = [(i, params, episodes, seed + i, prune_after, prune_below, window) for i, params in enumerate(trials)]
+    results = []
+    if workers <= 1:
+        for a in args:
+            results.append(run_trial(*a))
+            if verbose:
+                _print_result(results[-1])
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run_trial, *a) for a in args]
+            for future in as_completed(futures):
+                results.append(future.result())
+                if verbose:
+                    _print_result(results[-1])
+    return sorted(results, key=lambda r: r["final_win_rate"], reverse=True)
+
+def write_csv(results: List[Dict[str, Any]], filename: str):
+    with open(filename, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for r in results:
+            writer.writerow({**r, "hyperparameters": json.dumps(r["hyperparameters"], sort_keys=True)})
+
+def save_sessions(results: List[Dict[str, Any]], user_id: int, sweep_id: str):
+    """One TrainingSession row per trial, tagged with the sweep id as model_version."""
+    from database import models
+    from database.crud import create_training_session
+    from database.database import SessionLocal, engine
+
+    models.Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        for r in results:
+            create_training_session(
+                db, user_id=user_id, episodes=r["episodes"], win_rate=r["win_rate"],
+                final_epsilon=r["final_epsilon"] or 0.0, training_time_seconds=r["elapsed_seconds"],
+                hyperparameters=json.dumps({**r["hyperparameters"], "seed": r["seed"], "pruned": r["pruned"]},
+                                           sort_keys=True),
+                model_version=f"sweep-{sweep_id}-trial-{r['trial']}",
+            )
+    finally:
+        db.close()
+
+def _print_result(r: Dict[str, Any]):
+    flag = " (pruned)" if r["pruned"] else ""
+    print(f"trial {r['trial']:>3}: {r['episodes']:>6} episodes, final win rate {r['final_win_rate']:.2%}"
+          f"{flag} {json.dumps(r['hyperparameters'], sort_keys=True)}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--space", default=None, help="JSON file with the search space (defaults to DEFAULT_SPACE)")
+    parser.add_argument("--mode", choices=("grid", "random"), default="random")
+    parser.add_argument("--trials", type=int, default=16, help="Number of trials in random mode")
+    parser.add_argument("--episodes", type=int, default=3000, help="Episode budget per trial")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--prune-after", type=int, default=500, help="Episodes before a trial can be pruned (0 disables)")
+    parser.add_argument("--prune-below", type=float, default=0.3, help="Prune trials whose rolling win rate is below this")
+    parser.add_argument("--window", type=int, default=100, help="Rolling win rate window")
+    parser.add_argument("--output", default="sweep.csv")
+    parser.add_argument("--user-id", type=int, default=None, help="Also store each trial as a TrainingSession of this user")
+    args = parser.parse_args()
+
+    space = DEFAULT_SPACE
+    if args.space:
+        with open(args.space, "r") as f:
+            space = json.load(f)
+    trials = grid_trials(space) if args.mode == "grid" else random_trials(space, args.trials, args.seed)
+
+    started = time.perf_counter()
+    results = run_sweep(trials, episodes=args.episodes, workers=args.workers, seed=args.seed,
+                        prune_after=args.prune_after, prune_below=args.prune_below,
+                        window=args.window, verbose=True)
+    elapsed = time.perf_counter() - started
+    write_csv(results, args.output)
+    print(f"{len(results)} trials in {elapsed:.1f}s ({sum(r['pruned'] for r in results)} pruned), "
+          f"results in {args.output}")
+    if results:
+        print(f"Best: {json.dumps(results[0]['hyperparameters'], sort_keys=True)} "
+              f"final win rate {results[0]['final_win_rate']:.2%}")
+    if args.user_id is not None:
+        save_sessions(results, args.user_id, sweep_id=uuid.uuid4().hex[:8])
+        print(f"Saved {len(results)} training sessions for user {args.user_id}")
@@ -1,26 +1,55 @@
-from fastapi import APIRouter
-from fastapi.responses import JSONResponse
+import uuid
+from pathlib import Path
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import JSONResponse, FileResponse
 from train import train_agent 
 from typing import Tuple, Dict, List
+import config
 from models.battle import PokemonBattleState
 from ai.ai_selection import select_ai_pokemon
 from models.pokemon import get_pokemon_data
 
 router = APIRouter()
 
+METRICS_FILES = {"csv": "metrics.csv", "npz": "series.npz"}
+
 @router.post("/train")
-def train_rl_agent():
-    # Handle all 3 return values from train_agent
-    episode_rewards, epsilon_history, win_count = train_agent()
+def train_rl_agent(
+    episodes: int = Query(100000, ge=1, description="Number of training episodes"),
+    max_points: int = Query(200, ge=10, le=5000, description="Max points per downsampled series"),
+):
+    # Full series go to disk; the response only carries a downsampled summary
+    run_id = str(uuid.uuid4())
+    metrics = train_agent(episodes=episodes, metrics_dir=str(Path(config.TRAINING_RUNS_DIR) / run_id))
+    summary = metrics.summary(max_points=max_points)
     return {
         "message": "Training completed",
-        "total_episodes": len(episode_rewards),
-        "win_rate": win_count / len(episode_rewards) if episode_rewards else 0,
-        "final_win_count": win_count,
-        "episode_rewards": episode_rewards,
-        "epsilon_history": epsilon_history
+        "run_id": run_id,
+        "total_episodes": summary["total_episodes"],
+        "win_rate": summary["win_rate"],
+        "final_win_count": summary["win_count"],
+        "summary": summary,
+        "metrics_url": f"/ai/train/{run_id}/metrics?format=npz",
+        "aggregates_url": f"/ai/train/{run_id}/metrics?format=csv",
     }
 
+@router.get("/train/{run_id}/metrics")
+def get_training_metrics(
+    run_id: str,
+    format: str = Query("npz", description="'npz' for the full series, 'csv' for rolling aggregates"),
+):
+    """Download the full metrics of a training run."""
+    if format not in METRICS_FILES:
+        raise HTTPException(status_code=400, detail=f"Unknown format '{format}'")
+    try:
+        uuid.UUID(run_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Training run not found.")
+    path = Path(config.TRAINING_RUNS_DIR) / run_id / METRICS_FILES[format]
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Training run not found.")
+    return FileResponse(path, filename=f"{run_id}-{path.name}")
+
 # Stores active battles
 battles: Dict[str, Dict[str, dict]] = {}
 
@@ -74,7 +103,7 @@ def apply_moves(battle_id: str, player_move: str, ai_move: str) -> Tuple[Pokemon
     return player, ai, turn_log
 
 @router.post("/ai_move")
-async def get_ai_move(data: dict):
+def get_ai_move(data: dict):
     # Get player pokemon data to extract types
     player_pokemon = get_pokemon_data(data['player_pokemon']['name'])
     
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException
 from typing import Dict, Any, List
 import random
+import httpx
 from models.battle import PokemonBattleState  
+from services.circuit_breaker import CircuitOpenError
 from services.data_fetcher import fetch_pokemon_data
 from services.battle_simulator import BattleSimulator
+from ai.battle_env import observe
 import dependencies 
 
 router = APIRouter()
@@ -37,10 +40,14 @@ def filter_damaging_moves(moves, simulator, player):
 async def simulate_battle_with_ai(
     pokemon1: str = Query(..., description="Name of the first Pokémon"),
     pokemon2: str = Query(..., description="Name of the second Pokémon"),
+    client: httpx.AsyncClient = Depends(dependencies.get_http_client),
 ):
     # Fetch Pokémon data asynchronously
-    p1_info_raw = await fetch_pokemon_data(pokemon1)
-    p2_info_raw = await fetch_pokemon_data(pokemon2)
+    try:
+        p1_info_raw = await fetch_pokemon_data(pokemon1, client)
+        p2_info_raw = await fetch_pokemon_data(pokemon2, client)
+    except CircuitOpenError:
+        raise HTTPException(status_code=503, detail="PokéAPI is unavailable")
 
     if not p1_info_raw or not p2_info_raw:
         raise HTTPException(status_code=404, detail="One or both Pokémon not found")
@@ -66,31 +73,20 @@ async def simulate_battle_with_ai(
         print("AI agent for player 2 not loaded; using random moves.")
 
     for turn in range(max_turns):
-        # Prepare state for AI (expand as needed)
-        state_for_ai = {
-            "p1_hp": simulator.p1.hp,
-            "p1_status": simulator.p1.status,
-            "p2_hp": simulator.p2.hp,
-            "p2_status": simulator.p2.status,
-            # Add more features your AI needs
-        }
+        # Each side sees the battle from its own perspective, as in training
+        p1_state = observe(simulator, "p1")
+        p2_state = observe(simulator, "p2")
 
         # Filter damaging moves for both players
         p1_moves = filter_damaging_moves(simulator.p1.available_moves, simulator, 'p1')
         p2_moves = filter_damaging_moves(simulator.p2.available_moves, simulator, 'p2')
 
-        # Player 1 move
-        p1_move = agent1.choose_action(state_for_ai)
-        if p1_move not in p1_moves:
-            p1_move = random.choice(p1_moves)
-
-        # Player 2 move
-        if agent2:
-            p2_move = agent2.choose_action(state_for_ai)
-            if p2_move not in p2_moves:
-                p2_move = random.choice(p2_moves)
+        # Both moves in one batched lookup when the same agent plays both sides
+        if agent2 is agent1:
+            p1_move, p2_move = agent1.choose_actions([p1_state, p2_state], legal_moves=[p1_moves, p2_moves])
         else:
-            p2_move = random.choice(p2_moves)
+            p1_move = agent1.choose_actions([p1_state], legal_moves=[p1_moves])[0]
+            p2_move = agent2.choose_actions([p2_state], legal_moves=[p2_moves])[0] if agent2 else random.choice(p2_moves)
 
         # Execute turn
         damage_done, damage_taken = simulator.execute_turn_with_moves(p1_move, p2_move)
@@ -10,10 +10,11 @@ from pydantic import BaseModel, Field
 import database.models as models
 from database.auth import get_current_user
 from ai.rl_agent import QLearningAgent
+from ai.battle_env import observe
 from dependencies import get_agent
-from api import ai
 from models.battle import PokemonBattleState
 from services.battle_simulator import BattleSimulator
+from services.battle_sessions import battle_sessions
 from database.auth import get_current_user
 
 router = APIRouter()
@@ -38,7 +39,7 @@ TYPE_EFFECTIVENESS: Dict[str, Dict[str, float]] = {
     "normal":  {},
 }
 
-# move_name -> (type, base_power)
+# move_name -> {"type", "power", "accuracy", "crit_rate", ...}
 MOVE_BOOK: Dict[str, Dict[str, Any]] = {
     # Water moves
     "water gun": {"type": "water", "power": 40, "accuracy": 1.0, "crit_rate": 0.0625},
@@ -202,7 +203,8 @@ def choose_ai_move_epsilon_greedy(
 
     best_move, best_score = None, float("-inf")
     for m in legal:
-        mtype, mpower = MOVE_BOOK.get(m, ("normal", 40))
+        move = MOVE_BOOK.get(m, {"type": "normal", "power": 40})
+        mtype, mpower = move["type"], move["power"]
         score = mpower * type_multiplier(mtype, opp_types)
 
         # STAB: same-type attack bonus
@@ -218,34 +220,8 @@ def choose_ai_move_epsilon_greedy(
 
     return best_move or random.choice(legal)
 
-
-def canonicalize_state(state: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Make a dict stable for hashing by the agent's Q-table keys by turning lists/dicts into tuples.
-    Added error handling for non-comparable values.
-    """
-    out: Dict[str, Any] = {}
-    for k, v in state.items():
-        try:
-            if isinstance(v, list):
-                out[k] = tuple(v)
-            elif isinstance(v, dict):
-                # Only sort if all values are comparable
-                try:
-                    out[k] = tuple(sorted(v.items()))
-                except TypeError:
-                    # If values aren't comparable, just use items() without sorting
-                    out[k] = tuple(v.items())
-            else:
-                out[k] = v
-        except (TypeError, ValueError):
-            # If anything fails, convert to string as fallback
-            out[k] = str(v)
-    return out
-
 from ai.rl_agent import QLearningAgent
 from dependencies import get_agent
-from api import ai
 from models.battle import PokemonBattleState
 from services.battle_simulator import BattleSimulator
 from database.auth import get_current_user
@@ -276,6 +252,8 @@ async def create_battle(
         "ai": ai_state.dict(),
         "user_id": current_user.id,  # Use current_user.id instead of user_id string
     }
+    # Live simulator for the moves to come
+    battle_sessions.start(battle_id, battles[battle_id])
 
     return {
         "battle_id": battle_id,
@@ -304,71 +282,59 @@ def make_move(
     if current.get("user_id") != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied to this battle.")
     
-    # Load current battle state and create simulator BEFORE checking if fainted
-    battle_data = battles[battle_id]
-    
-    # Build simulator from current state snapshot
-    sim = BattleSimulator(battle_data["player"], battle_data["ai"])
-    
-    # Now get the state objects from the simulator
-    player_state = sim.p1
-    ai_state = sim.p2
-    
-    # Check if they're fainted
-    if player_state.is_fainted() or ai_state.is_fainted():
-        winner = "ai" if player_state.is_fainted() else "player"
+    # A finished battle answers from its snapshot, without a simulator
+    if current["player"]["hp"] <= 0 or current["ai"]["hp"] <= 0:
+        winner = "ai" if current["player"]["hp"] <= 0 else "player"
         return {"message": "Battle already ended.", "winner": winner}
 
-    # Ensure RL agent has valid moves matching available moves
-    sim_legal = sim.p2.available_moves or ["tackle"]
-    if sim_legal:
-        # Update agent actions to match current legal moves
-        agent.actions = sim_legal
-
-    # RL proposal (unused if HEURISTIC_WEIGHT==1, but kept for future toggling)
-    rl_choice = None
-    try:
-        rl_state = canonicalize_state(sim.p2.dict())
-        rl_choice = agent.choose_action(rl_state)
-        if rl_choice not in sim_legal and sim_legal:
-            rl_choice = random.choice(sim_legal)
-    except Exception:
-        if sim_legal:
-            rl_choice = random.choice(sim_legal)
-
-    # Heuristic proposal (deterministic with epsilon=0)
-    heuristic_choice = choose_ai_move_epsilon_greedy(sim.p2, sim.p1.types, epsilon=HEURISTIC_EPSILON)
-
-    # Blend: with HEURISTIC_WEIGHT=1.0 this always selects heuristic_choice
-    if random.random() < HEURISTIC_WEIGHT or rl_choice is None:
-        ai_move = heuristic_choice
-        policy = "heuristic"
-    else:
-        ai_move = rl_choice
-        policy = "rl"
-
-    # Use the proper execute_turn method that returns structured log
-    try:
-        turn_log = sim.execute_turn(player_move, ai_move)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Battle execution error: {e}")
-
-    # Pull back updated states from simulator
-    player_state = sim.p1
-    ai_state = sim.p2
-
-    # Persist - FIX: Use 'battles' not 'ai.battles'
-    battles[battle_id] = {
-        "user_id": current_user.id,  # Keep user_id for ownership
-        "player": player_state.dict(),
-        "ai": ai_state.dict(),
-    }
+    # Live simulator of this battle, rehydrated from the snapshot if it was evicted
+    session = battle_sessions.get(battle_id, current)
+    with session.lock:
+        sim = session.sim
+
+        # Check if they're fainted (a concurrent move may just have ended it)
+        if sim.p1.is_fainted() or sim.p2.is_fainted():
+            winner = "ai" if sim.p1.is_fainted() else "player"
+            return {"message": "Battle already ended.", "winner": winner}
+
+        # RL proposal restricted to the legal moves (only computed when the blend can select it)
+        sim_legal = sim.p2.available_moves or ["tackle"]
+        rl_choice = None
+        if HEURISTIC_WEIGHT < 1.0:
+            try:
+                rl_choice = agent.choose_actions([observe(sim, "p2")], legal_moves=[sim_legal])[0]
+            except Exception:
+                rl_choice = random.choice(sim_legal)
+
+        # Heuristic proposal (deterministic with epsilon=0)
+        heuristic_choice = choose_ai_move_epsilon_greedy(sim.p2, sim.p1.types, epsilon=HEURISTIC_EPSILON)
+
+        # Blend: with HEURISTIC_WEIGHT=1.0 this always selects heuristic_choice
+        if random.random() < HEURISTIC_WEIGHT or rl_choice is None:
+            ai_move = heuristic_choice
+            policy = "heuristic"
+        else:
+            ai_move = rl_choice
+            policy = "rl"
+
+        # Use the proper execute_turn method that returns structured log
+        try:
+            turn_log = sim.execute_turn(player_move, ai_move)
+        except Exception as e:
+            battle_sessions.end(battle_id)  # half-applied turn: rehydrate from the last snapshot
+            raise HTTPException(status_code=500, detail=f"Battle execution error: {e}")
+
+        # Persist the snapshot (with turn count and history) the session is rehydrated from
+        snapshot = session.snapshot()
+        battles[battle_id] = snapshot
+        if sim.get_winner():
+            battle_sessions.end(battle_id)
 
     return {
         "battle_id": battle_id,
         "turn_log": turn_log,
-        "player": player_state.dict(),
-        "ai": ai_state.dict(),
+        "player": snapshot["player"],
+        "ai": snapshot["ai"],
         "ai_reasoning": {
             "policy": policy,
             "epsilon": HEURISTIC_EPSILON,
@@ -1,118 +1,129 @@
-from fastapi import APIRouter, HTTPException, Query
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query
 import httpx
+import config
+from dependencies import get_http_client
+from services.circuit_breaker import CircuitOpenError
+from services.data_fetcher import (fetch_evolution, fetch_json, fetch_pokemon_record, revalidation_stats,
+                                   upstream_breaker, upstream_flights)
+from services.evolution_cache import EvolutionNotFound, evolution_cache
+from services.name_index import dex_entries, name_index
+from services.type_index import MAX_TYPES_PER_POKEMON, TooManyTypes, TypeNotFound, fetch_type_members, type_index
+from services.pokemon_cache import pokemon_cache
 
 router = APIRouter()
 
-POKEAPI_BASE_URL = "https://pokeapi.co/api/v2"
-
 async def fetch_evolution_chain(client: httpx.AsyncClient, name: str):
-    # Step 1: Get species data
-    species_resp = await client.get(f"{POKEAPI_BASE_URL}/pokemon-species/{name.lower()}")
-    if species_resp.status_code != 200:
-        raise HTTPException(status_code=404, detail=f"Species not found for {name}")
-    species_data = species_resp.json()
-
-    # Step 2: Get evolution chain URL
-    evo_chain_url = species_data.get("evolution_chain", {}).get("url")
-    if not evo_chain_url:
-        return None
-
-    evo_resp = await client.get(evo_chain_url)
-    if evo_resp.status_code != 200:
-        raise HTTPException(status_code=404, detail="Evolution chain not found")
-    evo_chain_data = evo_resp.json().get("chain")
-
-    # Step 3: Parse evolution chain recursively
-    def parse_chain(chain_node):
-        evo_list = []
-
-        evo_details_list = chain_node.get("evolution_details", [])
-        if evo_details_list and isinstance(evo_details_list, list):
-            details = evo_details_list[0]
-            min_level = details.get("min_level")
-            trigger = details.get("trigger", {}).get("name") if details.get("trigger") else None
-        else:
-            min_level = None
-            trigger = None
-
-        evo_list.append({
-            "species": chain_node["species"]["name"],
-            "min_level": min_level,
-            "trigger": trigger
-        })
-
-        for evo in chain_node.get("evolves_to", []):
-            evo_list.extend(parse_chain(evo))
-
-        return evo_list
-
-    return parse_chain(evo_chain_data)
+    # Species -> chain id index and parsed chains are cached (services/evolution_cache.py),
+    # so a family costs at most one chain request per TTL
+    try:
+        entry = await fetch_evolution(name, client)
+    except EvolutionNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return entry["parsed"] if entry else None
+
+async def fetch_index_entry(client: httpx.AsyncClient, p_name: str, including_evolution: bool,
+                            limit: asyncio.Semaphore, timeout: float):
+    """
+    One /pokemon/index row, or None if its details could not be fetched within
+    `timeout`. A failed evolution lookup only blanks `evolution_chain`.
+    """
+    async with limit:
+        try:
+            record = await asyncio.wait_for(fetch_pokemon_record(p_name, client), timeout)
+        except (asyncio.TimeoutError, httpx.HTTPError, CircuitOpenError):
+            return None
+        if record is None:
+            return None
+        entry = dict(record)
+        # Optionally include evolution chain
+        if including_evolution:
+            try:
+                entry["evolution_chain"] = await asyncio.wait_for(fetch_evolution_chain(client, p_name), timeout)
+            except (HTTPException, asyncio.TimeoutError, httpx.HTTPError, CircuitOpenError):
+                entry["evolution_chain"] = None
+        return entry
 
 @router.get("/index")
 async def pokemon_index(
-    type: str = Query(None, description="Filter by Pokémon type"),
+    type: str = Query(None, description=f"Filter by Pokémon type; comma-separated types (at most {MAX_TYPES_PER_POKEMON}) must all match"),
     name: str = Query(None, description="Search Pokémon by name (partial match)"),
+    match: str = Query("substring", pattern="^(substring|prefix)$", description="How `name` matches: substring or prefix"),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=50, description="Number of results per page"),
-    including_evolution: bool = Query(False, alias="including_evolution", description="Include evolution chain info")
+    including_evolution: bool = Query(False, alias="including_evolution", description="Include evolution chain info"),
+    client: httpx.AsyncClient = Depends(get_http_client),
 ):
-    async with httpx.AsyncClient() as client:
-        # Step 1: Get Pokémon list based on type or all
-        if type:
-            type_resp = await client.get(f"{POKEAPI_BASE_URL}/type/{type.lower()}")
-            if type_resp.status_code != 200:
-                raise HTTPException(status_code=404, detail=f"Type '{type}' not found")
-            data = type_resp.json()
-            pokemon_list = [p["pokemon"]["name"] for p in data["pokemon"]]
+    # Step 1: Get Pokémon list based on type or all
+    type_names = list(dict.fromkeys(t.strip().lower() for t in type.split(",") if t.strip())) if type else []
+    if type_names:
+        # Type membership index (services/type_index.py): each type fetched once per TTL
+        try:
+            pokemon_list = await fetch_type_members(type_names, client)
+        except TooManyTypes as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except TypeNotFound as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        except CircuitOpenError:
+            raise HTTPException(status_code=503, detail="PokéAPI is unavailable")
+    elif name_index.ready:
+        # Local name index (services/name_index.py): no upstream call, already filtered
+        pokemon_list = name_index.search(name, match)
+    else:
+        # Index not built yet (first start): list upstream once and seed the index with it
+        try:
+            status, all_data = await fetch_json(f"{config.POKEAPI_BASE_URL}/pokemon?limit=2000", client)
+        except CircuitOpenError:
+            raise HTTPException(status_code=503, detail="PokéAPI is unavailable")
+        if status != 200:
+            raise HTTPException(status_code=500, detail="Failed to get Pokémon list")
+        name_index.replace(dex_entries(all_data["results"]))
+        pokemon_list = name_index.search(name, match)
+
+    # Step 2: Filter a type listing by name if provided (case-insensitive)
+    if type_names and name:
+        query = name.lower()
+        if match == "prefix":
+            pokemon_list = [p for p in pokemon_list if p.lower().startswith(query)]
         else:
-            all_resp = await client.get(f"{POKEAPI_BASE_URL}/pokemon?limit=2000")
-            if all_resp.status_code != 200:
-                raise HTTPException(status_code=500, detail="Failed to get Pokémon list")
-            all_data = all_resp.json()
-            pokemon_list = [p["name"] for p in all_data["results"]]
-
-        # Step 2: Filter by name if provided (case-insensitive partial match)
-        if name:
-            pokemon_list = [p for p in pokemon_list if name.lower() in p.lower()]
-
-        total_count = len(pokemon_list)
-
-        # Step 3: Pagination bounds
-        max_page = max(1, (total_count + page_size - 1) // page_size)
-        if page > max_page:
-            page = max_page
-
-        start = (page - 1) * page_size
-        end = start + page_size
-        paginated_list = pokemon_list[start:end]
-
-        results = []
-        # Step 4: Fetch full details for each Pokémon on current page
-        for p_name in paginated_list:
-            p_resp = await client.get(f"{POKEAPI_BASE_URL}/pokemon/{p_name}")
-            if p_resp.status_code != 200:
-                continue  # skip failed
-            p_data = p_resp.json()
-            entry = {
-                "name": p_data["name"],
-                "types": [t["type"]["name"] for t in p_data["types"]],
-                "abilities": [a["ability"]["name"] for a in p_data["abilities"]],
-                "stats": {s["stat"]["name"]: s["base_stat"] for s in p_data["stats"]},
-                "moves": [m["move"]["name"] for m in p_data["moves"]],
-            }
-            # Optionally include evolution chain
-            if including_evolution:
-                try:
-                    evolution_chain = await fetch_evolution_chain(client, p_name)
-                    entry["evolution_chain"] = evolution_chain
-                except HTTPException:
-                    entry["evolution_chain"] = None
-
-            results.append(entry)
-
-        return {
-            "count": total_count,
-            "page": page,
-            "page_size": page_size,
-            "results": results
-        }
+            pokemon_list = [p for p in pokemon_list if query in p.lower()]
+
+    total_count = len(pokemon_list)
+
+    # Step 3: Pagination bounds
+    max_page = max(1, (total_count + page_size - 1) // page_size)
+    if page > max_page:
+        page = max_page
+
+    start = (page - 1) * page_size
+    end = start + page_size
+    paginated_list = pokemon_list[start:end]
+
+    # Step 4: Fetch full details for the whole page concurrently, at most
+    # INDEX_FETCH_CONCURRENCY Pokémon at a time; gather keeps the page order
+    limit = asyncio.Semaphore(config.INDEX_FETCH_CONCURRENCY)
+    entries = await asyncio.gather(*(
+        fetch_index_entry(client, p_name, including_evolution, limit, config.INDEX_ITEM_TIMEOUT)
+        for p_name in paginated_list
+    ))
+    results = [entry for entry in entries if entry is not None]
+    failed = [p_name for p_name, entry in zip(paginated_list, entries) if entry is None]
+
+    return {
+        "count": total_count,
+        "page": page,
+        "page_size": page_size,
+        "results": results,
+        "partial": bool(failed),
+        "failed": failed
+    }
+
+@router.get("/cache")
+def pokemon_cache_stats():
+    """
+    Hit / miss counters of the Pokémon data, evolution and type caches, stale
+    revalidations, upstream request coalescing and the upstream circuit breaker.
+    """
+    return {**pokemon_cache.stats(), "evolution": evolution_cache.stats(), "types": type_index.stats(),
+            "revalidation": revalidation_stats, "single_flight": upstream_flights.stats(),
+            "circuit_breaker": upstream_breaker.stats()}
@@ -0,0 +1,132 @@
+"""
+Shared helpers for the benchmark suites: timing with warmup, percentile
+summaries, JSON result files and baseline comparison.
+
+Baseline files live in benchmarks/baselines/<suite>.json:
+
+    {
+      "environment": {...},            # where the baseline was recorded
+      "default_threshold": 0.25,       # allowed relative slowdown
+      "thresholds": {"name": 0.4},     # optional per-benchmark overrides
+      "results": {"name": {...}, ...}  # a previous result file's "results"
+    }
+
+Numbers are machine dependent: record the baseline on the machine that runs
+the comparison (`--update-baseline`).
+"""
+import gc
+import json
+import platform
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+DEFAULT_THRESHOLD = 0.25
+
+
+def measure(fn: Callable[[], Any], repeats: int = 30, warmup: int = 3, number: int = 1,
+            setup: Optional[Callable[[], Any]] = None) -> List[float]:
+    """
+    Seconds per call of `fn`, one sample per repeat (each the mean of `number`
+    calls). `setup` runs untimed before every repeat. As in `timeit`, the
+    garbage collector is off while a sample is timed.
+    """
+    for _ in range(warmup):
+        if setup is not None:
+            setup()
+        fn()
+    samples = []
+    enabled = gc.isenabled()
+    try:
+        for _ in range(repeats):
+            if setup is not None:
+                setup()
+            gc.collect()
+            gc.disable()
+            started = time.perf_counter()
+            for _ in range(number):
+                fn()
+            samples.append((time.perf_counter() - started) / number)
+            if enabled:
+                gc.enable()
+    finally:
+        if enabled:
+            gc.enable()
+    return samples
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Median / p90 / p99 / mean in microseconds."""
+    us = np.asarray(samples) * 1e6
+    return {
+        "median_us": float(np.median(us)),
+        "p90_us": float(np.percentile(us, 90)),
+        "p99_us": float(np.percentile(us, 99)),
+        "mean_us": float(us.mean()),
+        "samples": len(samples),
+    }
+
+def environment() -> Dict[str, Any]:
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "numpy": np.__version__,
+    }
+
+def write_json(path: str, data: Dict[str, Any]):
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+def baseline_path(suite: str) -> Path:
+    return BASELINE_DIR / f"{suite}.json"
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    p = Path(path)
+    if not p.exists():
+        return None
+    with open(p, "r") as f:
+        return json.load(f)
+
+def update_baseline(path: str, results: Dict[str, Any], default_threshold: float = DEFAULT_THRESHOLD):
+    """Store `results` as the new baseline, keeping any per-benchmark thresholds already configured."""
+    old = load_baseline(path) or {}
+    write_json(path, {
+        "environment": environment(),
+        "default_threshold": old.get("default_threshold", default_threshold),
+        "thresholds": old.get("thresholds", {}),
+        "results": results,
+    })
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any], metric: str,
+            higher_is_better: bool, threshold: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    One row per benchmark present in both. `ratio` is current / baseline and
+    a row regresses when it is worse than the baseline by more than its
+    threshold (`threshold` overrides the file's thresholds when given).
+    """
+    rows = []
+    for name, current in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None or metric not in base or not base[metric]:
+            continue
+        limit = threshold if threshold is not None else \
+            baseline.get("thresholds", {}).get(name, baseline.get("default_threshold", DEFAULT_THRESHOLD))
+        ratio = current[metric] / base[metric]
+        worse = (1 - ratio) if higher_is_better else (ratio - 1)
+        rows.append({"name": name, "baseline": base[metric], "current": current[metric],
+                     "ratio": ratio, "threshold": limit, "regressed": worse > limit})
+    return rows
+
+def print_comparison(rows: List[Dict[str, Any]], metric: str):
+    if not rows:
+        print("No baseline entries to compare against.")
+        return
+    print(f"\n{'benchmark':<32}{'baseline':>12}{'current':>12}{'ratio':>8}  {metric}")
+    for r in rows:
+        flag = f"  REGRESSION (>{r['threshold']:.0%})" if r["regressed"] else ""
+        print(f"{r['name']:<32}{r['baseline']:>12.2f}{r['current']:>12.2f}{r['ratio']:>8.2f}{flag}")
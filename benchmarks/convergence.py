@@ -0,0 +1,134 @@
+"""
+Convergence benchmark: episodes needed to reach a target greedy win rate
+with the one-step, n-step and Q(lambda) update rules on the default
+charizard vs blastoise matchup.
+
+Before the runs, Q(lambda)'s traces are checked: a greedy step (including a
+first visit or a tie on an untouched row) keeps the earlier traces, an
+exploratory one cuts them. Exit code is 1 if that check fails.
+
+Usage:
+    python -m benchmarks.convergence --target 0.6 --seeds 0 1 2
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from ai.battle_env import PokemonBattleEnv
+from ai.rl_agent import QLearningAgent
+from train import train_agent, p1_info, p2_info
+
+VARIANTS: Dict[str, Dict[str, Any]] = {
+    "one_step": {"update": "one_step"},
+    "n_step_3": {"update": "n_step", "n_step": 3},
+    "lambda_0.8": {"update": "lambda", "lam": 0.8},
+    "replay": {"update": "one_step", "replay": True},
+}
+
+def greedy_win_rate(agent: QLearningAgent, env: PokemonBattleEnv, episodes: int) -> float:
+    """Play `episodes` battles with exploration switched off."""
+    saved_epsilon, agent.epsilon = agent.epsilon, 0.0
+    wins = 0
+    try:
+        for _ in range(episodes):
+            state, done, steps, total = env.reset(), False, 0, 0.0
+            while not done and steps < 100:
+                state, reward, done, _ = env.step(agent.choose_action(state))
+                total += reward
+                steps += 1
+            wins += total > 0
+    finally:
+        agent.epsilon = saved_epsilon
+    return wins / episodes
+
+def trace_checks(check):
+    """learn_lambda on three hand-built states s0 -> s1 -> s2 with is_greedy deciding `greedy`."""
+    states = [{"my_hp": hp, "opp_hp": 100} for hp in (100, 80, 60)]
+    agent = QLearningAgent(["tackle", "ember"])
+    s0, s1, s2 = states
+    first = agent.is_greedy(s0, "tackle")
+    agent.learn_lambda(s0, "tackle", 0.0, s1, False, greedy=first)
+    tie = agent.is_greedy(s1, "ember")
+    agent.learn_lambda(s1, "ember", 1.0, s2, False, greedy=tie)
+    kept = len(agent._traces)
+    q = agent.export_q_table()
+    check("traces kept", first and tie and kept == 2 and q[agent.get_state_key(s0)]["tackle"] > 0,
+          f"first visit greedy={first}, tie greedy={tie}, {kept} traces after two greedy steps, "
+          f"reward credited to the first step: {q[agent.get_state_key(s0)]['tackle']:.3f}")
+
+    agent.learn_lambda(s2, "tackle", 1.0, s0, False, greedy=agent.is_greedy(s2, "tackle"))
+    explored = agent.is_greedy(s2, "ember")
+    agent.learn_lambda(s2, "ember", 0.0, s1, False, greedy=explored)
+    check("traces cut", not explored and len(agent._traces) == 1,
+          f"a worse action is exploratory ({not explored}), {len(agent._traces)} trace left")
+
+def run_variant(name: str, seed: int, target: float, max_episodes: int,
+                eval_every: int, eval_episodes: int) -> Dict[str, Any]:
+    eval_env = PokemonBattleEnv(p1_info, p2_info)
+    reached: List[Optional[int]] = [None]
+    steps = [0]
+
+    def check(episode, agent, metrics):
+        if (episode + 1) % eval_every:
+            return False
+        if greedy_win_rate(agent, eval_env, eval_episodes) >= target:
+            reached[0] = episode + 1
+            steps[0] = int(metrics.steps[:metrics.count].sum())
+            return True
+        return False
+
+    started = time.perf_counter()
+    metrics = train_agent(episodes=max_episodes, log_every=max_episodes, seed=seed,
+                          save_path=None, on_episode_end=check, **VARIANTS[name])
+    return {
+        "variant": name,
+        "seed": seed,
+        "episodes_to_target": reached[0],
+        "env_steps_to_target": steps[0] if reached[0] else int(metrics.steps[:metrics.count].sum()),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", type=float, default=0.6, help="Greedy win rate to reach")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0, 1, 2])
+    parser.add_argument("--max-episodes", type=int, default=5000)
+    parser.add_argument("--eval-every", type=int, default=100)
+    parser.add_argument("--eval-episodes", type=int, default=200)
+    parser.add_argument("--variants", nargs="+", choices=sorted(VARIANTS), default=list(VARIANTS))
+    parser.add_argument("--output", help="Write raw results as JSON to this path")
+    args = parser.parse_args()
+
+    failures = []
+
+    def check(label: str, ok: bool, detail: str):
+        print(f"  {'ok  ' if ok else 'FAIL'} {label}: {detail}")
+        if not ok:
+            failures.append(label)
+
+    trace_checks(check)
+    if failures:
+        print(f"\n{len(failures)} check(s) failed: {', '.join(failures)}")
+        sys.exit(1)
+
+    results = [run_variant(v, seed, args.target, args.max_episodes, args.eval_every, args.eval_episodes)
+               for v in args.variants for seed in args.seeds]
+
+    print(f"{'variant':<12} {'reached':>8} {'median episodes':>16} {'median steps':>13} {'seconds':>8}")
+    for v in args.variants:
+        rows = [r for r in results if r["variant"] == v]
+        hit = [r for r in rows if r["episodes_to_target"] is not None]
+        med_eps = statistics.median(r["episodes_to_target"] for r in hit) if hit else float("nan")
+        med_steps = statistics.median(r["env_steps_to_target"] for r in hit) if hit else float("nan")
+        secs = sum(r["seconds"] for r in rows)
+        print(f"{v:<12} {len(hit):>4}/{len(rows):<3} {med_eps:>16} {med_steps:>13} {secs:>8.1f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"target": args.target, "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
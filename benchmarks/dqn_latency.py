@@ -0,0 +1,74 @@
+"""
+CPU inference latency of the DQN agent at several batch sizes.
+
+Featurization and the forward pass are timed separately so it is clear
+which one dominates at each batch size.
+
+Usage:
+    python -m benchmarks.dqn_latency --batch-sizes 1 64 1024 --repeats 50
+"""
+import argparse
+import random
+import statistics
+import time
+
+import torch
+
+from ai.battle_env import PokemonBattleEnv
+from ai.dqn_agent import DQNAgent
+from train import p1_info, p2_info
+
+def sample_states(n: int, seed: int = 0):
+    """Collect `n` realistic states by playing random moves."""
+    random.seed(seed)
+    env = PokemonBattleEnv(p1_info, p2_info)
+    states = []
+    state = env.reset()
+    while len(states) < n:
+        states.append(state)
+        state, _, done, _ = env.step(random.choice(p1_info["available_moves"]))
+        if done:
+            state = env.reset()
+    return states
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 64, 1024])
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=None, help="torch.set_num_threads value")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    agent = DQNAgent(actions=p1_info["available_moves"], epsilon=0.0, seed=0)
+    states = sample_states(max(args.batch_sizes))
+
+    print(f"torch {torch.__version__}, threads={torch.get_num_threads()}, feature_dim={agent.featurizer.dim}")
+    print(f"{'batch':>6} {'featurize ms':>13} {'forward ms':>11} {'p50 total ms':>13} {'p95 total ms':>13} {'us/state':>9}")
+    for batch_size in args.batch_sizes:
+        batch = states[:batch_size]
+        feat_times, fwd_times, totals = [], [], []
+        for i in range(args.warmup + args.repeats):
+            t0 = time.perf_counter()
+            features = torch.from_numpy(agent.featurizer.encode_batch(batch, agent.actions))
+            t1 = time.perf_counter()
+            with torch.inference_mode():
+                agent.policy_net(features)
+            t2 = time.perf_counter()
+            agent.choose_actions(batch)
+            t3 = time.perf_counter()
+            if i >= args.warmup:
+                feat_times.append((t1 - t0) * 1e3)
+                fwd_times.append((t2 - t1) * 1e3)
+                totals.append((t3 - t2) * 1e3)
+        p50 = statistics.median(totals)
+        print(f"{batch_size:>6} {statistics.median(feat_times):>13.3f} {statistics.median(fwd_times):>11.3f} "
+              f"{p50:>13.3f} {percentile(totals, 95):>13.3f} {p50 * 1e3 / batch_size:>9.1f}")
+
+if __name__ == "__main__":
+    main()
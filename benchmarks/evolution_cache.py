@@ -0,0 +1,85 @@
+"""
+Evolution chain cache (services/evolution_cache.py) against the local stub
+PokéAPI (benchmarks/stub_pokeapi.py), whose Pokémon come in families of three.
+
+  - index cold   /pokemon/index?including_evolution=true, one chain request per family
+  - index warm   the same page again, no species or chain requests
+  - members      fetch_species_data family by family, later members skip the species request
+  - parse        parse_chain on every request vs the cached parsed chain
+
+Exit code is 1 if any check fails.
+
+Usage:
+    python -m benchmarks.evolution_cache --families 10 --delay 0.01
+"""
+import argparse
+import asyncio
+import sys
+
+import config
+from benchmarks.common import measure, summarize
+from benchmarks.stub_pokeapi import StubPokeAPI, temporary_cache_db
+from services.data_fetcher import fetch_species_data
+from services.evolution_cache import evolution_cache, parse_chain
+from services.http_client import create_http_client
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--families", type=int, default=10, help="Families on the page (3 Pokémon each)")
+    parser.add_argument("--delay", type=float, default=0.01, help="Stub upstream latency in seconds")
+    args = parser.parse_args()
+
+    from api.pokemon import pokemon_index
+
+    failures = []
+
+    def check(label: str, ok: bool, detail: str):
+        print(f"  {'ok  ' if ok else 'FAIL'} {label}: {detail}")
+        if not ok:
+            failures.append(label)
+
+    pokemon = 3 * args.families
+
+    async def scenarios(stub: StubPokeAPI):
+        async with create_http_client() as client:
+            async def page():
+                return await pokemon_index(type=None, name=None, page=1, page_size=min(pokemon, 50),
+                                           including_evolution=True, client=client)
+
+            stub.reset_counts()
+            cold = await page()
+            chains, species = stub.requests["evolution-chain"], stub.requests["pokemon-species"]
+            check("index cold", chains == args.families and all(r["evolution_chain"] for r in cold["results"]),
+                  f"{chains} chain / {species} species requests for {pokemon} Pokémon in {args.families} families")
+
+            stub.reset_counts()
+            warm = await page()
+            chains, species = stub.requests["evolution-chain"], stub.requests["pokemon-species"]
+            check("index warm", chains == species == 0 and warm["results"] == cold["results"],
+                  f"{chains} chain / {species} species requests")
+
+            evolution_cache.clear()
+            stub.reset_counts()
+            for name in stub.names:
+                await fetch_species_data(name, client)
+            chains, species = stub.requests["evolution-chain"], stub.requests["pokemon-species"]
+            check("members", chains == species == args.families,
+                  f"{chains} chain / {species} species requests for {pokemon} sequential lookups")
+
+    with temporary_cache_db(), StubPokeAPI(pokemon=pokemon, delay=args.delay) as stub:
+        config.POKEAPI_BASE_URL = stub.base_url
+        asyncio.run(scenarios(stub))
+        chain, first = stub.chain(1)["chain"], stub.names[0]
+
+    rebuilt = summarize(measure(lambda: parse_chain(chain), number=1000))
+    cached = summarize(measure(lambda: evolution_cache.get(first), number=1000))
+    print(f"\nparse_chain {rebuilt['median_us']:.2f} us vs cached lookup {cached['median_us']:.2f} us per call")
+    print(f"evolution cache: {evolution_cache.stats()}")
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed: {', '.join(failures)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Upstream request latency: a new `httpx.AsyncClient` per request (the old
+fetch code) vs the shared pooled client from services/http_client.py,
+against the local stub PokéAPI (benchmarks/stub_pokeapi.py).
+
+Each mode fetches /pokemon/{name} for every stub Pokémon, sequentially and
+then `--concurrency` requests at a time, and reports per-request p50/p99
+and requests/s. The stub speaks plain HTTP/1.1, so the shared client's
+savings here are connection setup only; against pokeapi.co it also skips
+the DNS lookup and TLS handshake per request.
+
+Usage:
+    python -m benchmarks.http_client --pokemon 200 --concurrency 10
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+
+import httpx
+
+from benchmarks.common import summarize
+from benchmarks.stub_pokeapi import StubPokeAPI
+from services.http_client import create_http_client, http2_available
+
+
+async def timed_get(client: httpx.AsyncClient, url: str, samples: List[float]):
+    started = time.perf_counter()
+    resp = await client.get(url)
+    resp.raise_for_status()
+    samples.append(time.perf_counter() - started)
+
+async def per_call(url: str, samples: List[float]):
+    """Client construction (SSL context, pool) is part of the cost the old code paid per request."""
+    started = time.perf_counter()
+    async with httpx.AsyncClient() as client:
+        resp = await client.get(url)
+        resp.raise_for_status()
+    samples.append(time.perf_counter() - started)
+
+async def run(mode: str, urls: List[str], concurrency: int) -> dict:
+    samples: List[float] = []
+    shared = create_http_client() if mode == "shared" else None
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one(url):
+        async with limit:
+            if shared is None:
+                await per_call(url, samples)
+            else:
+                await timed_get(shared, url, samples)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(u) for u in urls))
+    elapsed = time.perf_counter() - started
+    if shared is not None:
+        await shared.aclose()
+    return {**summarize(samples), "requests_per_second": len(urls) / elapsed}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pokemon", type=int, default=200, help="Requests per run")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--delay", type=float, default=0.0, help="Stub upstream latency in seconds")
+    args = parser.parse_args()
+
+    print(f"HTTP/2 available: {http2_available()} (the stub serves HTTP/1.1)")
+    with StubPokeAPI(pokemon=args.pokemon, delay=args.delay) as stub:
+        urls = [f"{stub.base_url}/pokemon/{n}" for n in stub.names]
+        print(f"{'mode':<10}{'concurrency':>12}{'p50 ms':>10}{'p99 ms':>10}{'req/s':>10}")
+        for concurrency in (1, args.concurrency):
+            for mode in ("per_call", "shared"):
+                r = asyncio.run(run(mode, urls, concurrency))
+                print(f"{mode:<10}{concurrency:>12}{r['median_us'] / 1e3:>10.2f}{r['p99_us'] / 1e3:>10.2f}"
+                      f"{r['requests_per_second']:>10.0f}")
+
+if __name__ == "__main__":
+    main()
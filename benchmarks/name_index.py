@@ -0,0 +1,97 @@
+"""
+Local Pokémon name index (services/name_index.py).
+
+  - search     prefix, short substring and long substring queries against a
+               linear scan of the name list, at several synthetic dex sizes;
+               results must be identical
+  - index      /pokemon/index?name=... with a ready index makes no upstream
+               list request (stub PokéAPI, benchmarks/stub_pokeapi.py)
+  - persist    refresh_name_index fills the `pokemon_names` table and a fresh
+               index loads the same entries back
+
+Exit code is 1 if any check fails.
+
+Usage:
+    python -m benchmarks.name_index --sizes 1000 10000 100000
+"""
+import argparse
+import asyncio
+import random
+import string
+import sys
+
+import config
+from benchmarks.common import measure, summarize
+from benchmarks.stub_pokeapi import StubPokeAPI, temporary_cache_db
+from services.http_client import create_http_client
+from services.name_index import NameIndex, name_index, refresh_name_index
+from services.pokemon_cache import pokemon_cache
+
+QUERIES = [("prefix", "prefix", "char"), ("substring", "short", "ar"), ("substring", "long", "izar")]
+
+
+def synthetic_names(size: int, seed: int = 0):
+    rng = random.Random(seed)
+    names = {"charmander", "charmeleon", "charizard", "pikachu", "wartortle"}
+    while len(names) < size:
+        names.add("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 11))))
+    return list(enumerate(sorted(names), start=1))
+
+def linear(names, query, match):
+    if match == "prefix":
+        return [n for n in names if n.startswith(query)]
+    return [n for n in names if query in n]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--number", type=int, default=20, help="Searches per sample")
+    args = parser.parse_args()
+
+    from api.pokemon import pokemon_index
+
+    failures = []
+
+    def check(label: str, ok: bool, detail: str):
+        print(f"  {'ok  ' if ok else 'FAIL'} {label}: {detail}")
+        if not ok:
+            failures.append(label)
+
+    print(f"{'size':>8}  {'query':<10}{'matches':>8}{'index us':>12}{'scan us':>12}{'speedup':>9}")
+    for size in args.sizes:
+        entries = synthetic_names(size)
+        index = NameIndex(entries)
+        names = [name for _, name in entries]
+        for match, label, query in QUERIES:
+            expected = linear(names, query, match)
+            if index.search(query, match) != expected:
+                check(f"search {size} {label}", False, "index and scan disagree")
+            fast = summarize(measure(lambda: index.search(query, match), number=args.number))
+            scan = summarize(measure(lambda: linear(names, query, match), number=args.number))
+            print(f"{size:>8}  {label:<10}{len(expected):>8}{fast['median_us']:>12.1f}{scan['median_us']:>12.1f}"
+                  f"{scan['median_us'] / fast['median_us']:>8.1f}x")
+
+    async def scenarios(stub: StubPokeAPI):
+        session_factory = pokemon_cache.session_factory  # the temporary database
+        async with create_http_client() as client:
+            stub.reset_counts()
+            ok = await refresh_name_index(name_index, client, session_factory)
+            check("persist", ok and NameIndex().load(session_factory) == len(stub.names) == len(name_index),
+                  f"{len(name_index)} names indexed, {stub.requests['list']} list request")
+
+            stub.reset_counts()
+            page = await pokemon_index(type=None, name="0001", match="substring", page=1, page_size=10,
+                                       including_evolution=False, client=client)
+            check("index", stub.requests["list"] == 0 and page["count"] == 1,
+                  f"{stub.requests['list']} list requests, {page['count']} match")
+
+    with temporary_cache_db(), StubPokeAPI(pokemon=30) as stub:
+        config.POKEAPI_BASE_URL = stub.base_url
+        asyncio.run(scenarios(stub))
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed: {', '.join(failures)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Offline dex bundle (database/import_dex.py, services/offline_dex.py).
+
+Writes the stub PokéAPI's resources (benchmarks/stub_pokeapi.py) as a dump in
+the PokeAPI/api-data layout, then:
+
+  - import     the directory, a .tar.gz and a .zip import the same resources;
+               list pages and sub-resources are skipped; peak Python memory
+               during an import follows `--batch`, well under the dump size
+  - offline    with OFFLINE_MODE, /pokemon/index (plain, name, type, two types,
+               evolutions), fetch_pokemon_data and get_pokemon_data return what
+               they returned online, with 0 requests to the stub
+
+Exit code is 1 if any check fails.
+
+Usage:
+    python -m benchmarks.offline_dex --pokemon 600 --batch 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tarfile
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import config
+from benchmarks.stub_pokeapi import MOVES, TYPES, StubPokeAPI, temporary_cache_db
+from database.import_dex import import_bundle
+from models.pokemon import get_pokemon_data
+from services.data_fetcher import fetch_pokemon_data
+from services.evolution_cache import evolution_cache
+from services.http_client import create_http_client
+from services.name_index import name_index
+from services.offline_dex import offline_dex
+from services.pokemon_cache import pokemon_cache
+from services.type_index import type_index
+
+
+def write_dump(stub: StubPokeAPI, root: Path) -> int:
+    """The stub's resources as api/v2/<kind>/<key>/index.json files; returns the dump size in bytes."""
+    def write(kind, key, payload):
+        path = root / "api" / "v2" / kind / str(key) / "index.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(payload))
+
+    count = stub.count
+    write("pokemon", "", {"count": count, "results": []})  # list page: skipped
+    for i in range(1, count + 1):
+        write("pokemon", i, stub.pokemon(i))
+        write("pokemon", f"{i}/encounters", [])  # sub-resource: skipped
+        write("pokemon-species", i, {**stub.species(i), "id": i})
+    for chain_id in range(1, (count + 2) // 3 + 1):
+        write("evolution-chain", chain_id, stub.chain(chain_id))
+    for k, t in enumerate(TYPES, start=1):
+        write("type", k, {"id": k, **stub.type_members(t)})
+    for k, m in enumerate(MOVES, start=1):
+        write("move", k, {"id": k, "name": m.replace(" ", "-"), "type": {"name": TYPES[k % len(TYPES)]},
+                          "power": 40 + 5 * k, "accuracy": 100, "pp": 20, "damage_class": {"name": "physical"}})
+    return sum(f.stat().st_size for f in root.rglob("*.json"))
+
+def clear_indexes():
+    pokemon_cache.clear()
+    evolution_cache.clear()
+    type_index.clear()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pokemon", type=int, default=600, help="Pokémon in the stub and the dump")
+    parser.add_argument("--batch", type=int, default=50, help="Import batch for the memory check")
+    args = parser.parse_args()
+
+    from api.pokemon import pokemon_index
+
+    failures = []
+
+    def check(label: str, ok: bool, detail: str):
+        print(f"  {'ok  ' if ok else 'FAIL'} {label}: {detail}")
+        if not ok:
+            failures.append(label)
+
+    queries = [dict(type=None, name=None), dict(type=None, name="001"), dict(type="grass", name=None),
+               dict(type="grass,fighting", name=None)]
+
+    async def snapshot(stub: StubPokeAPI):
+        async with create_http_client() as client:
+            pages = [await pokemon_index(**q, match="substring", page=1, page_size=12, including_evolution=True,
+                                         client=client) for q in queries]
+            records = [await fetch_pokemon_data(n, client) for n in stub.names[:5]]
+        return pages, records
+
+    with temporary_cache_db(), StubPokeAPI(pokemon=args.pokemon) as stub, tempfile.TemporaryDirectory() as tmp:
+        config.POKEAPI_BASE_URL = stub.base_url
+        offline_dex.session_factory = pokemon_cache.session_factory  # the temporary database
+        dump = Path(tmp) / "dump"
+        size = write_dump(stub, dump)
+        resources = 2 * args.pokemon + (args.pokemon + 2) // 3 + len(TYPES) + len(MOVES)
+
+        started = time.perf_counter()
+        counts = import_bundle(str(dump), offline_dex.session_factory)
+        elapsed = time.perf_counter() - started
+        imported = sum(n for kind, n in counts.items() if kind != "skipped")
+        check("import dir", imported == resources and not counts["skipped"],
+              f"{imported}/{resources} resources in {elapsed:.2f}s ({imported / elapsed:.0f}/s)")
+
+        tracemalloc.start()
+        import_bundle(str(dump), offline_dex.session_factory, batch=args.batch)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        check("import memory", peak < size / 2,
+              f"peak {peak / 1024:.0f} KiB at --batch {args.batch} for a {size / 1024:.0f} KiB dump")
+
+        with tarfile.open(Path(tmp) / "dump.tar.gz", "w:gz") as archive:
+            archive.add(dump, arcname="data")
+        archive_zip = shutil.make_archive(os.path.join(tmp, "dump"), "zip", dump)
+        for label, path in (("import tar", Path(tmp) / "dump.tar.gz"), ("import zip", archive_zip)):
+            again = import_bundle(str(path), offline_dex.session_factory)
+            check(label, again == counts, f"{sum(again.values())} resources")
+        check("bundle", offline_dex.counts()["dex_pokemon"] == args.pokemon, str(offline_dex.counts()))
+
+        online = asyncio.run(snapshot(stub))
+        online_info = get_pokemon_data(stub.names[0])
+
+        config.OFFLINE_MODE = True
+        try:
+            clear_indexes()
+            name_index.replace(offline_dex.names())  # what the lifespan does offline
+            stub.reset_counts()
+            offline = asyncio.run(snapshot(stub))
+            offline_info = get_pokemon_data(stub.names[0])
+            upstream = sum(stub.requests.values())
+        finally:
+            config.OFFLINE_MODE = False
+            clear_indexes()
+        check("offline index", offline[0] == online[0],
+              f"{len(queries)} /pokemon/index queries, {sum(p['count'] for p in offline[0])} rows matched")
+        check("offline data", offline[1] == online[1] and offline_info == online_info, "fetch / get_pokemon_data")
+        check("offline upstream", upstream == 0, f"{upstream} stub requests")
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed: {', '.join(failures)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Live /play battle sessions (services/battle_sessions.py) through the
+`create_battle` / `make_move` route functions of api/play.py.
+
+  - per move   latency of `make_move` with the live session vs with the session
+               rehydrated on every move (session TTL 0: what a simulator rebuild
+               per move costs), next to `execute_turn` alone
+  - replay     the same seeded battles played both ways end with identical
+               turn logs and states; the snapshot keeps turn count, battle
+               history and max HP across moves
+  - bounded    with a small cache, sessions beyond its size are evicted and
+               their battles carry on after rehydration
+
+Exit code is 1 if any check fails.
+
+Usage:
+    python -m benchmarks.play_sessions --battles 200
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+from ai.rl_agent import QLearningAgent
+from api.play import PlayerPokemonIn, battles, create_battle, make_move
+from benchmarks.common import summarize
+from services.battle_sessions import battle_sessions
+from services.battle_simulator import BattleSimulator
+
+PLAYER = {"name": "pikachu", "types": ["electric"], "hp": 160, "attack": 55, "defense": 40, "speed": 90,
+          "available_moves": ["thunder shock", "quick attack", "tackle", "thunderbolt"]}
+
+
+def strip_ids(responses):
+    return [[{k: v for k, v in r.items() if k != "battle_id"} for r in battle] for battle in responses]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--battles", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cache-size", type=int, default=8, help="Session cache size for the eviction check")
+    args = parser.parse_args()
+
+    failures = []
+
+    def check(label: str, ok: bool, detail: str):
+        print(f"  {'ok  ' if ok else 'FAIL'} {label}: {detail}")
+        if not ok:
+            failures.append(label)
+
+    user = SimpleNamespace(id=1)
+    agent = QLearningAgent(PLAYER["available_moves"])
+    player = PlayerPokemonIn(**PLAYER)
+    ttl, maxsize = battle_sessions.sessions.ttl, battle_sessions.sessions.maxsize
+
+    def new_battle() -> str:
+        return asyncio.run(create_battle(player=player, current_user=user, agent=agent))["battle_id"]
+
+    def play(battle_ids, seed):
+        """Play every battle to the end, round-robin; returns per-move seconds and the responses."""
+        random.seed(seed)
+        samples, responses = [], {battle_id: [] for battle_id in battle_ids}
+        live = list(battle_ids)
+        while live:
+            for battle_id in list(live):
+                move = PLAYER["available_moves"][len(responses[battle_id]) % len(PLAYER["available_moves"])]
+                started = time.perf_counter()
+                response = make_move(battle_id, player_move=move, current_user=user, agent=agent)
+                samples.append(time.perf_counter() - started)
+                if "turn_log" not in response:
+                    live.remove(battle_id)
+                else:
+                    responses[battle_id].append(response)
+        return samples, responses
+
+    def run(rehydrate_every_move: bool):
+        battles.clear()
+        battle_sessions.clear()
+        battle_sessions.sessions.ttl = 0 if rehydrate_every_move else ttl
+        random.seed(args.seed)
+        ids = [new_battle() for _ in range(args.battles)]
+        try:
+            samples, responses = play(ids, args.seed)
+        finally:
+            battle_sessions.sessions.ttl = ttl
+        return summarize(samples), [responses[i] for i in ids], [battles[i] for i in ids], battle_sessions.stats()
+
+    try:
+        rebuilt, rebuilt_responses, rebuilt_final, rebuilt_stats = run(rehydrate_every_move=True)
+        live, live_responses, live_final, live_stats = run(rehydrate_every_move=False)
+
+        snapshot = live_final[0]
+        sim = BattleSimulator(snapshot["player"], snapshot["ai"])
+        sim.load_battle_state({"p1": snapshot["player"], "p2": snapshot["ai"]})
+        turn_samples = []
+        for _ in range(2000):
+            sim.reset_battle()
+            started = time.perf_counter()
+            sim.execute_turn(PLAYER["available_moves"][0], sim.p2.available_moves[0])
+            turn_samples.append(time.perf_counter() - started)
+        turn = summarize(turn_samples)
+
+        moves = sum(len(r) for r in live_responses)
+        print(f"{args.battles} battles, {moves} moves")
+        for label, r in (("rehydrate", rebuilt), ("live", live), ("turn only", turn)):
+            print(f"{label:<10} p50 {r['median_us']:8.1f} us  p99 {r['p99_us']:8.1f} us")
+        print(f"sessions   rehydrate {rebuilt_stats}\n           live      {live_stats}")
+        check("per move", live["median_us"] < rebuilt["median_us"] and live_stats["rehydrated"] == 0,
+              f"{rebuilt['median_us'] / live['median_us']:.1f}x faster than rehydrating every move, "
+              f"{live['median_us'] - turn['median_us']:.1f} us above the turn itself")
+
+        check("replay", strip_ids(live_responses) == strip_ids(rebuilt_responses) and live_final == rebuilt_final,
+              f"{moves} moves identical live and rehydrated")
+        lengths = [len(r) for r in live_responses]
+        # execute_turn leaves out of the history a turn ended by the first attacker's knockout
+        check("continuity", all(f["turn_count"] == n and n - 1 <= len(f["battle_history"]) <= n
+                                and [h["turn"] for h in f["battle_history"]] == list(range(1, len(f["battle_history"]) + 1))
+                                for f, n in zip(live_final, lengths))
+              and all(f["player"]["max_hp"] == PLAYER["hp"] for f in live_final),
+              f"turn count and history kept over up to {max(lengths)} turns, max HP {PLAYER['hp']}")
+        check("ended", len(battle_sessions.sessions) == 0, f"{len(battle_sessions.sessions)} sessions left after the battles ended")
+
+        battles.clear()
+        battle_sessions.clear()
+        battle_sessions.sessions.maxsize = args.cache_size
+        ids = [new_battle() for _ in range(3 * args.cache_size)]
+        stats = battle_sessions.stats()
+        _, responses = play(ids, args.seed)
+        after = battle_sessions.stats()
+        final = [battles[i] for i in ids]
+        check("bounded", stats["size"] <= args.cache_size and stats["evictions"] == 2 * args.cache_size
+              and after["rehydrated"] > 0 and all(f["turn_count"] == len(responses[i]) for i, f in zip(ids, final)),
+              f"{stats['size']} sessions for {len(ids)} battles, {after['rehydrated']} rehydrated")
+    finally:
+        battle_sessions.sessions.ttl, battle_sessions.sessions.maxsize = ttl, maxsize
+        battles.clear()
+        battle_sessions.clear()
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed: {', '.join(failures)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
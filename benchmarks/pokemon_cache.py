@@ -0,0 +1,98 @@
+"""
+Pokémon data cache against a local stub PokéAPI (benchmarks/stub_pokeapi.py).
+
+Fetches a set of Pokémon through each cached path and checks how many
+requests reach the stub:
+  - cold       fetch_pokemon_data, every name goes upstream once
+  - memory     the same names again, served from the in-process LRU
+  - database   memory tier cleared, get_pokemon_data served from pokemon_cache
+  - expired    TTL and max staleness forced to 0, every name goes upstream again
+  - index      /pokemon/index pages, detail requests served from the cache
+
+The SQLite tier lives in a temporary database. Exit code is 1 if any
+check fails.
+
+Usage:
+    python -m benchmarks.pokemon_cache --pokemon 100 --delay 0.005
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+import config
+from benchmarks.stub_pokeapi import StubPokeAPI, temporary_cache_db
+from services.http_client import create_http_client
+from services.pokemon_cache import pokemon_cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pokemon", type=int, default=100, help="Distinct Pokémon fetched per phase")
+    parser.add_argument("--delay", type=float, default=0.005, help="Stub upstream latency in seconds")
+    args = parser.parse_args()
+
+    from api.pokemon import pokemon_index
+    from models.pokemon import get_pokemon_data
+    from services.data_fetcher import fetch_pokemon_data
+
+    failures = []
+
+    def check(label: str, ok: bool, detail: str):
+        print(f"  {'ok  ' if ok else 'FAIL'} {label}: {detail}")
+        if not ok:
+            failures.append(label)
+
+    with temporary_cache_db(), StubPokeAPI(pokemon=args.pokemon, delay=args.delay) as stub:
+        config.POKEAPI_BASE_URL = stub.base_url
+        names = stub.names
+        ttl, max_stale = pokemon_cache.ttl, pokemon_cache.max_stale
+
+        async def fetch_all():
+            return [await fetch_pokemon_data(n) for n in names]
+
+        def phase(label: str, fn):
+            stub.reset_counts()
+            started = time.perf_counter()
+            result = fn()
+            elapsed = time.perf_counter() - started
+            upstream = stub.requests["pokemon"]
+            print(f"{label:<10}{elapsed / len(names) * 1e3:>10.3f} ms/pokemon{upstream:>8} upstream requests")
+            return result, upstream
+
+        print(f"{len(names)} Pokémon, stub latency {args.delay * 1e3:.1f} ms")
+        cold, upstream = phase("cold", lambda: asyncio.run(fetch_all()))
+        check("cold", upstream == len(names) and all(cold), f"{upstream} upstream for {len(names)} names")
+
+        warm, upstream = phase("memory", lambda: asyncio.run(fetch_all()))
+        check("memory", upstream == 0 and warm == cold, f"{upstream} upstream, {pokemon_cache.memory.hits} memory hits")
+
+        pokemon_cache.memory.clear()
+        from_db, upstream = phase("database", lambda: [get_pokemon_data(n) for n in names])
+        check("database", upstream == 0 and from_db == cold, f"{upstream} upstream, {pokemon_cache.db_hits} db hits")
+
+        pokemon_cache.memory.clear()
+        pokemon_cache.ttl = pokemon_cache.max_stale = 0  # past max staleness too (see benchmarks/stale_cache.py)
+        _, upstream = phase("expired", lambda: asyncio.run(fetch_all()))
+        pokemon_cache.ttl, pokemon_cache.max_stale = ttl, max_stale
+        check("expired", upstream == len(names), f"{upstream} upstream after expiry")
+
+        page_size = min(50, len(names))
+
+        async def index_page():
+            async with create_http_client() as client:
+                return await pokemon_index(type=None, name=None, page=1, page_size=page_size,
+                                           including_evolution=False, client=client)
+
+        page, upstream = phase("index", lambda: asyncio.run(index_page()))
+        check("index", upstream == 0 and len(page["results"]) == page_size,
+              f"{upstream} detail requests for a page of {page_size}")
+
+        print(f"\ncache stats: {pokemon_cache.stats()}")
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed: {', '.join(failures)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
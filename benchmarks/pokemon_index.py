@@ -0,0 +1,66 @@
+"""
+/pokemon/index page latency against a slow local stub PokéAPI
+(benchmarks/stub_pokeapi.py), sequential vs concurrent page fetches.
+
+The Pokémon cache is bypassed (TTL 0) so every row goes upstream. Each
+configuration is timed over `--repeats` pages; latency is also shown in
+upstream round trips (page latency / stub delay). Sequential fetching costs
+about page_size (x3 with evolutions) round trips, concurrent fetching about
+ceil(page_size / concurrency). The stub shares the CPU with the client, so
+keep the delay well above the per-request CPU cost (a few ms) to see the
+round-trip effect.
+
+Usage:
+    python -m benchmarks.pokemon_index --delay 0.1 --page-size 50 --concurrency 50 --repeats 3
+"""
+import argparse
+import asyncio
+import time
+
+import config
+from benchmarks.common import summarize
+from benchmarks.stub_pokeapi import StubPokeAPI, temporary_cache_db
+from services.http_client import create_http_client
+from services.pokemon_cache import pokemon_cache
+
+
+async def page_latencies(page_size: int, including_evolution: bool, repeats: int):
+    from api.pokemon import pokemon_index
+
+    samples, rows = [], 0
+    async with create_http_client() as client:
+        for i in range(repeats):
+            pokemon_cache.memory.clear()
+            started = time.perf_counter()
+            page = await pokemon_index(type=None, name=None, page=i + 1, page_size=page_size,
+                                       including_evolution=including_evolution, client=client)
+            samples.append(time.perf_counter() - started)
+            rows += len(page["results"])
+    return samples, rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--delay", type=float, default=0.1, help="Stub upstream latency in seconds")
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=None, help="Default: INDEX_FETCH_CONCURRENCY")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    concurrency = args.concurrency or config.INDEX_FETCH_CONCURRENCY
+    ttl, max_stale = pokemon_cache.ttl, pokemon_cache.max_stale
+    pokemon_cache.ttl = pokemon_cache.max_stale = 0
+    with temporary_cache_db(), StubPokeAPI(pokemon=args.page_size * args.repeats, delay=args.delay) as stub:
+        config.POKEAPI_BASE_URL = stub.base_url
+        print(f"page size {args.page_size}, stub delay {args.delay * 1e3:.0f} ms")
+        print(f"{'evolution':<11}{'concurrency':>12}{'p50 ms':>10}{'p99 ms':>10}{'round trips':>13}{'rows':>7}")
+        for including_evolution in (False, True):
+            for limit in (1, concurrency):
+                config.INDEX_FETCH_CONCURRENCY = limit
+                samples, rows = asyncio.run(page_latencies(args.page_size, including_evolution, args.repeats))
+                r = summarize(samples)
+                print(f"{str(including_evolution):<11}{limit:>12}{r['median_us'] / 1e3:>10.1f}"
+                      f"{r['p99_us'] / 1e3:>10.1f}{r['median_us'] / 1e6 / args.delay:>13.1f}{rows:>7}")
+    pokemon_cache.ttl, pokemon_cache.max_stale = ttl, max_stale
+
+if __name__ == "__main__":
+    main()
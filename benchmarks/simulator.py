@@ -0,0 +1,111 @@
+"""
+Micro- and macro-benchmarks of services/battle_simulator.py.
+
+Every benchmark reseeds `random` before each timed sample and restores the
+battle (`reset_battle`) so all samples do the same work:
+  - type_effectiveness  calculate_type_effectiveness, one dual-type lookup
+  - damage              calculate_damage, STAB + type chart + crit/variance
+  - perform_move        perform_move, accuracy, damage and secondary effects
+  - execute_turn        execute_turn from full HP (incl. the reset)
+  - battle_outcome      simulate_battle_outcome over fixed 50-move sequences
+  - construction        BattleSimulator(p1, p2): battle states and default moves;
+                        type_chart() and move_database() are already built
+
+The median time per call is compared against benchmarks/baselines/simulator.json
+(per-benchmark thresholds in its "thresholds"); the exit code is 1 on a regression.
+
+Usage:
+    python -m benchmarks.simulator --output runs/bench/simulator.json
+    python -m benchmarks.simulator --only damage execute_turn --repeats 50
+    python -m benchmarks.simulator --update-baseline
+"""
+import argparse
+import random
+import sys
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from benchmarks.common import (baseline_path, compare, environment, load_baseline, measure, print_comparison,
+                               summarize, update_baseline, write_json)
+from services.battle_simulator import BattleSimulator
+from train import p1_info, p2_info
+
+# name -> (fn, setup, calls per sample)
+Case = Tuple[Callable[[], Any], Optional[Callable[[], Any]], int]
+
+
+def build_cases(seed: int) -> Dict[str, Case]:
+    sim = BattleSimulator(p1_info, p2_info)
+    p1_move, p2_move = p1_info["available_moves"][0], p2_info["available_moves"][2]
+    rng = random.Random(seed)
+    p1_moves = [rng.choice(p1_info["available_moves"]) for _ in range(50)]
+    p2_moves = [rng.choice(p2_info["available_moves"]) for _ in range(50)]
+
+    def fresh():
+        random.seed(seed)
+        sim.reset_battle()
+
+    def turn():
+        sim.reset_battle()
+        sim.execute_turn(p1_move, p2_move)
+
+    def move():
+        sim.p2.hp = sim.p2.max_hp
+        sim.perform_move(sim.p1, sim.p2, p1_move, [], can_flinch=True)
+
+    return {
+        "type_effectiveness": (lambda: sim.calculate_type_effectiveness("water", sim.p1.types), fresh, 1000),
+        "damage": (lambda: sim.calculate_damage(sim.p1, sim.p2, p1_move), fresh, 1000),
+        "perform_move": (move, fresh, 200),
+        "execute_turn": (turn, fresh, 100),
+        "battle_outcome": (lambda: sim.simulate_battle_outcome(p1_moves, p2_moves, max_turns=50), fresh, 10),
+        "construction": (lambda: BattleSimulator(p1_info, p2_info), fresh, 10),
+    }
+
+def run(names, seed: int, repeats: int, warmup: int) -> Dict[str, Dict[str, float]]:
+    cases = build_cases(seed)
+    results = {}
+    for name in names:
+        fn, setup, number = cases[name]
+        results[name] = summarize(measure(fn, repeats=repeats, warmup=warmup, number=number, setup=setup))
+        results[name]["calls_per_sample"] = number
+    return results
+
+def main():
+    names = list(build_cases(0))
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", choices=names, default=names, help="Benchmarks to run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=30, help="Timed samples per benchmark")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed samples per benchmark")
+    parser.add_argument("--output", default=None, help="Write the result JSON here")
+    parser.add_argument("--baseline", default=str(baseline_path("simulator")))
+    parser.add_argument("--threshold", type=float, default=None, help="Allowed relative slowdown (overrides the baseline's)")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline")
+    args = parser.parse_args()
+
+    results = run(args.only, args.seed, args.repeats, args.warmup)
+
+    print(f"{'benchmark':<22}{'median us':>12}{'p90 us':>12}{'p99 us':>12}")
+    for name, r in results.items():
+        print(f"{name:<22}{r['median_us']:>12.2f}{r['p90_us']:>12.2f}{r['p99_us']:>12.2f}")
+
+    if args.output:
+        write_json(args.output, {"suite": "simulator", "environment": environment(),
+                                 "config": {"seed": args.seed, "repeats": args.repeats, "warmup": args.warmup},
+                                 "results": results})
+    if args.update_baseline:
+        update_baseline(args.baseline, results, default_threshold=0.5)
+        print(f"\nBaseline updated: {args.baseline}")
+        return
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline to create one.")
+        return
+    rows = compare(results, baseline, "median_us", higher_is_better=False, threshold=args.threshold)
+    print_comparison(rows, "median us")
+    if any(r["regressed"] for r in rows):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Upstream request coalescing (services/single_flight.py) under a traffic spike,
+against the local stub PokéAPI (benchmarks/stub_pokeapi.py).
+
+  - spike      `--callers` concurrent fetch_pokemon_data calls spread over
+               `--popular` names, cold cache; plain concurrent GETs of the same
+               URLs are shown for comparison
+  - not found  concurrent lookups of a missing Pokémon share one 404
+  - error      concurrent fetches from a closed port all see the one ConnectError
+  - cancel     one cancelled waiter leaves the others' result intact; when
+               every waiter is cancelled the shared fetch is cancelled too
+
+Exit code is 1 if any check fails.
+
+Usage:
+    python -m benchmarks.single_flight --callers 200 --popular 5 --delay 0.05
+"""
+import argparse
+import asyncio
+import socket
+import sys
+import time
+
+import httpx
+
+import config
+from benchmarks.common import summarize
+from benchmarks.stub_pokeapi import StubPokeAPI, temporary_cache_db
+from services.data_fetcher import fetch_json, fetch_pokemon_data, upstream_flights
+from services.http_client import create_http_client
+
+
+async def timed(coro, samples):
+    started = time.perf_counter()
+    result = await coro
+    samples.append(time.perf_counter() - started)
+    return result
+
+def closed_port_url() -> str:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    return f"http://127.0.0.1:{port}/api/v2/pokemon/nobody"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--callers", type=int, default=200)
+    parser.add_argument("--popular", type=int, default=5, help="Distinct Pokémon the callers ask for")
+    parser.add_argument("--delay", type=float, default=0.05, help="Stub upstream latency in seconds")
+    args = parser.parse_args()
+
+    failures = []
+
+    def check(label: str, ok: bool, detail: str):
+        print(f"  {'ok  ' if ok else 'FAIL'} {label}: {detail}")
+        if not ok:
+            failures.append(label)
+
+    async def scenarios(stub: StubPokeAPI):
+        names = [stub.names[i % args.popular] for i in range(args.callers)]
+        async with create_http_client() as client:
+            # Plain concurrent GETs: every caller goes upstream
+            stub.reset_counts()
+            samples = []
+            await asyncio.gather(*(timed(client.get(f"{stub.base_url}/pokemon/{n}"), samples) for n in names))
+            plain = summarize(samples)
+            print(f"{'plain':<12}{stub.requests['pokemon']:>6} upstream  p50 {plain['median_us'] / 1e3:7.1f} ms"
+                  f"  p99 {plain['p99_us'] / 1e3:7.1f} ms")
+
+            stub.reset_counts()
+            samples = []
+            results = await asyncio.gather(*(timed(fetch_pokemon_data(n, client), samples) for n in names))
+            flight = summarize(samples)
+            upstream = stub.requests["pokemon"]
+            print(f"{'coalesced':<12}{upstream:>6} upstream  p50 {flight['median_us'] / 1e3:7.1f} ms"
+                  f"  p99 {flight['p99_us'] / 1e3:7.1f} ms")
+            check("spike", upstream == args.popular and all(results),
+                  f"{upstream} upstream requests for {args.callers} callers over {args.popular} names")
+
+            stub.reset_counts()
+            missing = await asyncio.gather(*(fetch_pokemon_data("missingno", client) for _ in range(50)))
+            check("not found", stub.requests["pokemon"] == 1 and not any(missing),
+                  f"{stub.requests['pokemon']} upstream request, {sum(r is None for r in missing)}/50 got None")
+
+            url = closed_port_url()
+            errors = await asyncio.gather(*(fetch_json(url, client) for _ in range(20)), return_exceptions=True)
+            check("error", all(isinstance(e, httpx.ConnectError) for e in errors),
+                  f"{sum(isinstance(e, httpx.ConnectError) for e in errors)}/20 callers saw ConnectError")
+
+            stub.reset_counts()
+            url = f"{stub.base_url}/pokemon-species/{stub.names[0]}"
+            waiters = [asyncio.ensure_future(fetch_json(url, client)) for _ in range(3)]
+            await asyncio.sleep(args.delay / 4)
+            waiters[0].cancel()
+            done = await asyncio.gather(*waiters, return_exceptions=True)
+            check("cancel one", isinstance(done[0], asyncio.CancelledError) and done[1][0] == done[2][0] == 200
+                  and stub.requests["pokemon-species"] == 1, "other waiters got the shared 200")
+
+            waiters = [asyncio.ensure_future(fetch_json(url, client)) for _ in range(3)]
+            await asyncio.sleep(args.delay / 4)
+            for w in waiters:
+                w.cancel()
+            await asyncio.gather(*waiters, return_exceptions=True)
+            await asyncio.sleep(0)
+            check("cancel all", len(upstream_flights) == 0 and all(w.cancelled() for w in waiters),
+                  f"{len(upstream_flights)} flights left in flight")
+
+    with temporary_cache_db(), StubPokeAPI(pokemon=max(args.popular, 3), delay=args.delay) as stub:
+        config.POKEAPI_BASE_URL = stub.base_url
+        print(f"{args.callers} callers, {args.popular} names, stub latency {args.delay * 1e3:.0f} ms")
+        asyncio.run(scenarios(stub))
+        print(f"\nsingle flight: {upstream_flights.stats()}")
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed: {', '.join(failures)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Stale-while-revalidate Pokémon data and the upstream circuit breaker
+(services/pokemon_cache.py, services/data_fetcher.py,
+services/circuit_breaker.py) against the stub PokéAPI
+(benchmarks/stub_pokeapi.py). Every phase starts from records past their TTL.
+
+  - blocking   stale records not servable (max staleness 0): every lookup
+               waits for upstream; shown for comparison
+  - stale      stale records are served at cache speed and each is refreshed
+               once in the background
+  - stale sync get_pokemon_data serves a stale record without waiting on a
+               slow upstream; repeated lookups share one background refresh
+  - slow       upstream slower than the slow-call limit: lookups stay fast and
+               the breaker opens once UPSTREAM_BREAKER_FAILURES refreshes failed
+  - outage     upstream answering 503: stale records are still served, async
+               and sync (get_pokemon_data); with the breaker open, refreshes
+               are skipped and a cold miss fails fast with CircuitOpenError
+  - max stale  past the max staleness bound a record is not served
+  - recovery   after the reset timeout one trial refresh closes the breaker
+
+Exit code is 1 if any check fails.
+
+Usage:
+    python -m benchmarks.stale_cache --pokemon 50 --delay 0.05
+"""
+import argparse
+import asyncio
+import sys
+import time
+from concurrent.futures import wait
+
+import config
+from benchmarks.common import summarize
+from benchmarks.stub_pokeapi import StubPokeAPI, temporary_cache_db
+from models.pokemon import get_pokemon_data
+from services.circuit_breaker import OPEN, CircuitOpenError
+from services.data_fetcher import (fetch_pokemon_record, revalidation_stats, revalidations, sync_revalidations,
+                                   upstream_breaker)
+from services.http_client import create_http_client
+from services.pokemon_cache import pokemon_cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pokemon", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=0.05, help="Stub upstream latency in seconds")
+    args = parser.parse_args()
+
+    failures = []
+
+    def check(label: str, ok: bool, detail: str):
+        print(f"  {'ok  ' if ok else 'FAIL'} {label}: {detail}")
+        if not ok:
+            failures.append(label)
+
+    def report(label: str, samples, upstream: int):
+        r = summarize(samples)
+        print(f"{label:<10} p50 {r['median_us'] / 1e3:7.2f} ms  p99 {r['p99_us'] / 1e3:7.2f} ms"
+              f"  {upstream:>4} upstream requests")
+        return r
+
+    ttl, max_stale = pokemon_cache.ttl, pokemon_cache.max_stale
+    slow_call, reset_timeout = upstream_breaker.slow_call_seconds, upstream_breaker.reset_timeout
+
+    async def scenarios(stub: StubPokeAPI):
+        names = stub.names
+
+        async def lookups(client):
+            samples, records = [], []
+            for name in names:
+                started = time.perf_counter()
+                records.append(await fetch_pokemon_record(name, client))
+                samples.append(time.perf_counter() - started)
+            return samples, records
+
+        async def settle():
+            while revalidations:
+                await asyncio.gather(*list(revalidations.values()), return_exceptions=True)
+
+        def go_stale():
+            pokemon_cache.memory.clear()  # reloaded from the table with the TTL below
+            pokemon_cache.ttl = 0
+
+        async with create_http_client() as client:
+            _, cached = await lookups(client)
+
+            go_stale()
+            pokemon_cache.max_stale = 0
+            stub.reset_counts()
+            samples, _ = await lookups(client)
+            blocking = report("blocking", samples, stub.requests["pokemon"])
+            pokemon_cache.max_stale = max_stale
+
+            go_stale()
+            stub.reset_counts()
+            samples, records = await lookups(client)
+            stale = report("stale", samples, stub.requests["pokemon"])
+            await settle()
+            check("stale", records == cached and stale["median_us"] < blocking["median_us"] / 5
+                  and stub.requests["pokemon"] == len(names) == revalidation_stats["refreshed"],
+                  f"{stub.requests['pokemon']} background refreshes, {revalidation_stats}")
+
+            go_stale()
+            stub.reset_counts()
+            stub.delay = 10 * args.delay
+            samples, infos = [], []
+            for _ in range(5):
+                started = time.perf_counter()
+                infos.append(await asyncio.to_thread(get_pokemon_data, names[0]))
+                samples.append(time.perf_counter() - started)
+            while sync_revalidations:
+                wait(list(sync_revalidations.values()))
+            stub.delay = args.delay
+            stale_sync = report("stale sync", samples, stub.requests["pokemon"])
+            check("stale sync", all(info.name == names[0] for info in infos) and stub.requests["pokemon"] == 1
+                  and stale_sync["p99_us"] < args.delay * 1e6,
+                  f"p99 {stale_sync['p99_us'] / 1e3:.2f} ms with a {10 * args.delay * 1e3:.0f} ms upstream, "
+                  f"{stub.requests['pokemon']} background refresh for {len(infos)} lookups")
+
+            go_stale()
+            stub.reset_counts()
+            upstream_breaker.reset()
+            upstream_breaker.slow_call_seconds = args.delay
+            stub.delay = 3 * args.delay
+            samples, records = await lookups(client)
+            slow = report("slow", samples, stub.requests["pokemon"])
+            await settle()
+            check("slow", records == cached and upstream_breaker.state == OPEN
+                  and slow["p99_us"] < stub.delay * 1e6 / 2,
+                  f"breaker {upstream_breaker.stats()}")
+            stub.delay, upstream_breaker.slow_call_seconds = args.delay, slow_call
+
+            go_stale()
+            stub.reset_counts()
+            upstream_breaker.reset()
+            stub.fail = True
+            samples, records = await lookups(client)
+            outage = report("outage", samples, stub.requests["pokemon"])
+            await settle()
+            opened_after = stub.requests["pokemon"]
+            skipped = revalidation_stats["skipped_open"]
+            samples, again = await lookups(client)
+            report("open", samples, stub.requests["pokemon"] - opened_after)
+            check("outage", records == again == cached and upstream_breaker.state == OPEN
+                  and outage["p99_us"] < blocking["median_us"] and stub.requests["pokemon"] == opened_after
+                  and revalidation_stats["skipped_open"] - skipped == len(names),
+                  f"{opened_after} failed refreshes opened the breaker, then "
+                  f"{stub.requests['pokemon'] - opened_after} upstream requests")
+
+            info = await asyncio.to_thread(get_pokemon_data, names[0])
+            check("outage sync", info.name == names[0], "get_pokemon_data served the stale record")
+
+            started = time.perf_counter()
+            try:
+                await fetch_pokemon_record("stubmon-9999", client)
+                error = None
+            except CircuitOpenError as e:
+                error = e
+            elapsed = time.perf_counter() - started
+            check("fail fast", error is not None and elapsed < args.delay,
+                  f"cold miss raised {type(error).__name__} in {elapsed * 1e3:.2f} ms")
+
+            pokemon_cache.memory.clear()
+            pokemon_cache.max_stale = 0
+            try:
+                beyond = await fetch_pokemon_record(names[0], client)
+            except CircuitOpenError:
+                beyond = None
+            pokemon_cache.max_stale = max_stale
+            check("max stale", beyond is None, "record past max staleness not served")
+
+            stub.fail = False
+            upstream_breaker.reset_timeout = args.delay
+            await asyncio.sleep(args.delay * 1.5)
+            go_stale()
+            await fetch_pokemon_record(names[0], client)
+            await settle()
+            check("recovery", upstream_breaker.state != OPEN and upstream_breaker.failures == 0,
+                  f"breaker {upstream_breaker.stats()}")
+
+    try:
+        with temporary_cache_db(), StubPokeAPI(pokemon=args.pokemon, delay=args.delay) as stub:
+            config.POKEAPI_BASE_URL = stub.base_url
+            print(f"{args.pokemon} Pokémon, stub latency {args.delay * 1e3:.0f} ms")
+            asyncio.run(scenarios(stub))
+    finally:
+        pokemon_cache.ttl, pokemon_cache.max_stale = ttl, max_stale
+        upstream_breaker.slow_call_seconds, upstream_breaker.reset_timeout = slow_call, reset_timeout
+        upstream_breaker.reset()
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed: {', '.join(failures)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+State-key cost: the old tuple(sorted(state.items())) keys vs the packed
+integer keys of ai/state_encoder.py.
+
+For both schemes this times building the key, building key + Q-table dict
+lookup, and reports the memory of the keys and the pickled table size.
+
+Usage:
+    python -m benchmarks.state_key --states 20000 --repeats 5
+"""
+import argparse
+import pickle
+import random
+import sys
+import time
+
+from ai.battle_env import PokemonBattleEnv
+from ai.state_encoder import encode_state
+from train import p1_info, p2_info
+
+def sample_states(n: int, seed: int = 0):
+    """Collect `n` realistic states by playing random moves."""
+    random.seed(seed)
+    env = PokemonBattleEnv(p1_info, p2_info)
+    states = []
+    state = env.reset()
+    while len(states) < n:
+        states.append(state)
+        state, _, done, _ = env.step(random.choice(p1_info["available_moves"]))
+        if done:
+            state = env.reset()
+    return states
+
+def tuple_key(state):
+    return tuple(sorted(state.items()))
+
+def deep_size(obj) -> int:
+    if isinstance(obj, tuple):
+        return sys.getsizeof(obj) + sum(deep_size(x) for x in obj)
+    return sys.getsizeof(obj)
+
+def best_time(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--states", type=int, default=20000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    states = sample_states(args.states)
+    # JSON clients send lists; the encoder must give them the same key as tuples
+    json_states = [{k: list(v) if isinstance(v, tuple) else v for k, v in s.items()} for s in states]
+    assert all(encode_state(a) == encode_state(b) for a, b in zip(states, json_states))
+
+    print(f"{len(states)} states, {len({tuple_key(s) for s in states})} distinct")
+    print(f"{'scheme':<10}{'key ns':>10}{'key+lookup ns':>16}{'key bytes':>12}{'pickle KiB':>12}")
+    for name, key_fn in (("tuple", tuple_key), ("int64", encode_state)):
+        table = {key_fn(s): {"ember": 0.0, "slash": 0.0} for s in states}
+        key_time = best_time(lambda: [key_fn(s) for s in states], args.repeats)
+        lookup_time = best_time(lambda: [table.get(key_fn(s)) for s in states], args.repeats)
+        key_bytes = sum(deep_size(k) for k in table) / len(table)
+        pickled = len(pickle.dumps(table, protocol=pickle.HIGHEST_PROTOCOL)) / 1024
+        print(f"{name:<10}{key_time / len(states) * 1e9:>10.0f}{lookup_time / len(states) * 1e9:>16.0f}"
+              f"{key_bytes:>12.0f}{pickled:>12.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Local stand-in for the parts of PokéAPI the app uses, for offline benchmarks.
+
+Serves synthetic, deterministic data over HTTP from a background thread:
+    /api/v2/pokemon?limit=N           /api/v2/pokemon/{name|id}
+    /api/v2/pokemon-species/{name}    /api/v2/evolution-chain/{id}/
+    /api/v2/type/{type}
+
+Pokémon come in families of three that share one evolution chain. Every
+response can be delayed by `delay` seconds to model upstream latency, `fail`
+turns every response into a 503 to model an outage, and `requests` counts the
+requests served per endpoint.
+
+Usage:
+    with StubPokeAPI(pokemon=150, delay=0.02) as stub:
+        config.POKEAPI_BASE_URL = stub.base_url
+        ...
+        print(stub.requests["pokemon"])
+"""
+import json
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+from urllib.parse import urlparse
+
+TYPES = ["normal", "fire", "water", "grass", "electric", "ice", "fighting", "poison", "ground",
+         "flying", "psychic", "bug", "rock", "ghost", "dragon", "dark", "steel", "fairy"]
+MOVES = ["tackle", "ember", "water gun", "vine whip", "thunder shock", "quick attack", "bite", "slash",
+         "wing attack", "psychic", "earthquake", "ice beam", "hyper beam", "body slam", "sludge bomb"]
+STATS = ["hp", "attack", "defense", "special-attack", "special-defense", "speed"]
+
+
+def pokemon_name(i: int) -> str:
+    return f"stubmon-{i:04d}"
+
+@contextmanager
+def temporary_cache_db() -> Iterator[None]:
+    """Point the shared Pokémon cache at an empty SQLite file for the duration, with a cleared memory tier."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from database.database import Base
+    from services.pokemon_cache import pokemon_cache
+
+    previous = pokemon_cache.session_factory
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'cache.db'}", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        pokemon_cache.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        pokemon_cache.clear()
+        try:
+            yield
+        finally:
+            pokemon_cache.session_factory = previous
+            pokemon_cache.clear()
+            engine.dispose()
+
+
+class StubPokeAPI:
+    def __init__(self, pokemon: int = 150, delay: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        self.count = pokemon
+        self.delay = delay
+        self.fail = False
+        self.requests: Counter = Counter()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/v2"
+
+    @property
+    def names(self):
+        return [pokemon_name(i) for i in range(1, self.count + 1)]
+
+    def start(self) -> "StubPokeAPI":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubPokeAPI":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reset_counts(self):
+        with self._lock:
+            self.requests.clear()
+
+    # -- synthetic payloads ------------------------------------------------
+
+    def _index(self, name: str) -> Optional[int]:
+        if name.isdigit():
+            i = int(name)
+        elif name.startswith("stubmon-") and name[8:].isdigit():
+            i = int(name[8:])
+        else:
+            return None
+        return i if 1 <= i <= self.count else None
+
+    def pokemon(self, i: int) -> Dict[str, Any]:
+        types = [TYPES[i % len(TYPES)]] + ([TYPES[(i * 5 + 9) % len(TYPES)]] if i % 3 == 0 else [])  # every third dual-typed
+        return {
+            "id": i,
+            "name": pokemon_name(i),
+            "types": [{"slot": s + 1, "type": {"name": t}} for s, t in enumerate(dict.fromkeys(types))],
+            "abilities": [{"ability": {"name": f"ability-{i % 20}"}}],
+            "stats": [{"stat": {"name": s}, "base_stat": 40 + (i * (k + 3)) % 80} for k, s in enumerate(STATS)],
+            "moves": [{"move": {"name": MOVES[(i + k) % len(MOVES)]}} for k in range(20)],
+        }
+
+    def species(self, i: int) -> Dict[str, Any]:
+        return {"name": pokemon_name(i),
+                "evolution_chain": {"url": f"{self.base_url}/evolution-chain/{(i - 1) // 3 + 1}/"}}
+
+    def chain(self, chain_id: int) -> Optional[Dict[str, Any]]:
+        members = [i for i in range(3 * chain_id - 2, 3 * chain_id + 1) if i <= self.count]
+        if not members:
+            return None
+        node = None
+        for depth, i in reversed(list(enumerate(members))):
+            details = [{"min_level": 16 * depth, "trigger": {"name": "level-up"}}] if depth else []
+            node = {"species": {"name": pokemon_name(i)}, "evolution_details": details,
+                    "evolves_to": [node] if node else []}
+        return {"id": chain_id, "chain": node}
+
+    def type_members(self, type_name: str) -> Optional[Dict[str, Any]]:
+        if type_name not in TYPES:
+            return None
+        members = [i for i in range(1, self.count + 1)
+                   if type_name in (t["type"]["name"] for t in self.pokemon(i)["types"])]
+        return {"name": type_name, "pokemon": [
+            {"pokemon": {"name": pokemon_name(i), "url": f"{self.base_url}/pokemon/{i}/"}} for i in members]}
+
+    def route(self, path: str, query: str):
+        parts = [p for p in path.split("/") if p][2:]  # drop "api/v2"
+        if parts == ["pokemon"]:
+            limit = self.count
+            for item in query.split("&"):
+                if item.startswith("limit="):
+                    limit = int(item[6:])
+            return "list", {"count": self.count, "results": [
+                {"name": pokemon_name(i), "url": f"{self.base_url}/pokemon/{i}/"}
+                for i in range(1, min(limit, self.count) + 1)]}
+        if len(parts) != 2:
+            return "unknown", None
+        kind, key = parts
+        if kind == "pokemon":
+            i = self._index(key)
+            return kind, self.pokemon(i) if i else None
+        if kind == "pokemon-species":
+            i = self._index(key)
+            return kind, self.species(i) if i else None
+        if kind == "evolution-chain":
+            return kind, self.chain(int(key)) if key.isdigit() else None
+        if kind == "type":
+            return kind, self.type_members(key)
+        return "unknown", None
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # headers and body are separate writes on a keep-alive socket
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                kind, payload = stub.route(url.path, url.query)
+                with stub._lock:
+                    stub.requests[kind] += 1
+                if stub.delay:
+                    time.sleep(stub.delay)
+                if stub.fail:
+                    status, payload = 503, {"detail": "Service unavailable"}
+                else:
+                    status = 200 if payload is not None else 404
+                body = json.dumps(payload if payload is not None else {"detail": "Not found"}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client gave up (cancelled request)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
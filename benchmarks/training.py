@@ -0,0 +1,194 @@
+"""
+Training throughput benchmark with a per-phase breakdown.
+
+Each workload (update rule) is run twice with a fixed seed:
+  - through `train_agent` unmodified, for episodes/s and steps/s
+  - through an instrumented copy of its loop that times every phase
+    (env reset, action choice, opponent move, simulator turn, observation,
+    reward, learning update, metrics bookkeeping) and, in a third pass under
+    tracemalloc, the peak and net allocations of each phase
+
+Results go to a JSON file; episodes/s is compared against
+benchmarks/baselines/training.json and the exit code is 1 on a regression.
+
+Usage:
+    python -m benchmarks.training --episodes 1000 --output runs/bench/training.json
+    python -m benchmarks.training --update-baseline
+"""
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict
+
+import numpy as np
+
+from ai.battle_env import PokemonBattleEnv, compute_reward
+from ai.metrics import TrainingMetrics
+from ai.rl_agent import QLearningAgent
+from benchmarks.common import (baseline_path, compare, environment, load_baseline, print_comparison,
+                               update_baseline, write_json)
+from train import p1_info, p2_info, train_agent
+
+WORKLOADS: Dict[str, Dict[str, Any]] = {
+    "one_step": {"update": "one_step"},
+    "n_step": {"update": "n_step", "n_step": 3},
+    "lambda": {"update": "lambda", "lam": 0.8},
+    "replay": {"update": "one_step", "replay": True},
+}
+PHASES = ("reset", "act", "opponent", "turn", "observe", "reward", "learn", "metrics")
+MAX_STEPS = 100
+
+
+def throughput(workload: str, episodes: int, seed: int) -> Dict[str, float]:
+    started = time.perf_counter()
+    metrics = train_agent(episodes=episodes, log_every=episodes, seed=seed, save_path=None, **WORKLOADS[workload])
+    elapsed = time.perf_counter() - started
+    steps = int(metrics.steps[:metrics.count].sum())
+    return {"seconds": elapsed, "episodes": metrics.count, "steps": steps}
+
+def phase_breakdown(workload: str, episodes: int, seed: int, track_alloc: bool = False) -> Dict[str, Dict[str, float]]:
+    """
+    The `train_agent` loop with `env.step` unrolled so each phase can be timed.
+    With `track_alloc`, per-phase tracemalloc peak / net bytes are recorded
+    instead (timings from that pass are inflated and not used).
+    """
+    options = WORKLOADS[workload]
+    random.seed(seed)
+    np.random.seed(seed)
+    env = PokemonBattleEnv(p1_info, p2_info)
+    agent = QLearningAgent(actions=env.simulator.p1.available_moves)
+    if options.get("replay"):
+        agent.enable_replay(seed=seed)
+    metrics = TrainingMetrics(episodes, log_every=episodes)
+    update = options["update"]
+
+    seconds = dict.fromkeys(PHASES, 0.0)
+    peak = dict.fromkeys(PHASES, 0)
+    net = dict.fromkeys(PHASES, 0)
+    clock = time.perf_counter
+    last = [0.0, 0]
+
+    def mark(phase: str):
+        now = clock()
+        seconds[phase] += now - last[0]
+        if track_alloc:
+            current, high = tracemalloc.get_traced_memory()
+            peak[phase] = max(peak[phase], high - last[1])
+            net[phase] += current - last[1]
+            tracemalloc.reset_peak()
+            last[1] = current
+        last[0] = clock()
+
+    if track_alloc:
+        tracemalloc.start()
+        last[1] = tracemalloc.get_traced_memory()[0]
+    epsilon = 1.0
+    last[0] = clock()
+    for _ in range(episodes):
+        state = env.reset()
+        agent.begin_episode()
+        mark("reset")
+        done, total_reward, step_count = False, 0.0, 0
+        while not done and step_count < MAX_STEPS:
+            if random.random() < epsilon:
+                action = random.choice(agent.actions)
+            else:
+                action = agent.choose_action(state)
+            greedy = update == "lambda" and agent.is_greedy(state, action)
+            mark("act")
+            p2_move = random.choice(env.simulator.p2.available_moves)
+            mark("opponent")
+            damage_done, damage_taken = env.simulator.execute_turn_with_moves(action, p2_move)
+            mark("turn")
+            next_state = env.get_state()
+            mark("observe")
+            reward, done = compute_reward(env.simulator, damage_done, damage_taken)
+            mark("reward")
+            if options.get("replay"):
+                agent.remember(state, action, reward, next_state, done)
+                for _ in range(4):
+                    agent.learn_batch(32)
+            elif update == "n_step":
+                agent.learn_n_step(state, action, reward, next_state, done, n=options["n_step"])
+            elif update == "lambda":
+                agent.learn_lambda(state, action, reward, next_state, done, lam=options["lam"], greedy=greedy)
+            else:
+                agent.learn(state, action, reward, next_state)
+            mark("learn")
+            state = next_state
+            total_reward += reward
+            step_count += 1
+        epsilon = max(0.1, epsilon * 0.995)
+        metrics.record(total_reward, epsilon, step_count, total_reward > 0)
+        mark("metrics")
+    if track_alloc:
+        tracemalloc.stop()
+
+    steps = max(1, int(metrics.steps[:metrics.count].sum()))
+    total = sum(seconds.values()) or 1.0
+    if track_alloc:
+        return {p: {"alloc_peak_kib": peak[p] / 1024, "alloc_net_kib": net[p] / 1024} for p in PHASES}
+    return {p: {"seconds": seconds[p], "share": seconds[p] / total, "us_per_step": seconds[p] / steps * 1e6}
+            for p in PHASES}
+
+def run_workload(workload: str, episodes: int, seed: int, repeats: int) -> Dict[str, Any]:
+    throughput(workload, max(1, episodes // 10), seed)  # warmup
+    runs = [throughput(workload, episodes, seed) for _ in range(repeats)]
+    seconds = min(r["seconds"] for r in runs)
+    phases = phase_breakdown(workload, episodes, seed)
+    allocs = phase_breakdown(workload, episodes, seed, track_alloc=True)
+    for p in PHASES:
+        phases[p].update(allocs[p])
+    return {
+        "episodes": runs[0]["episodes"],
+        "steps": runs[0]["steps"],
+        "seconds": seconds,
+        "episodes_per_second": runs[0]["episodes"] / seconds,
+        "steps_per_second": runs[0]["steps"] / seconds,
+        "phases": phases,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workloads", nargs="+", choices=sorted(WORKLOADS), default=list(WORKLOADS))
+    parser.add_argument("--episodes", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=5, help="Throughput runs per workload (the fastest is kept)")
+    parser.add_argument("--output", default=None, help="Write the result JSON here")
+    parser.add_argument("--baseline", default=str(baseline_path("training")))
+    parser.add_argument("--threshold", type=float, default=None, help="Allowed relative slowdown (overrides the baseline's)")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline")
+    args = parser.parse_args()
+
+    results = {w: run_workload(w, args.episodes, args.seed, args.repeats) for w in args.workloads}
+
+    for name, r in results.items():
+        print(f"\n{name}: {r['episodes_per_second']:.0f} episodes/s, {r['steps_per_second']:.0f} steps/s "
+              f"({r['episodes']} episodes, {r['steps']} steps)")
+        print(f"  {'phase':<10}{'share':>8}{'us/step':>10}{'peak KiB':>10}{'net KiB':>10}")
+        for phase, p in r["phases"].items():
+            print(f"  {phase:<10}{p['share']:>8.1%}{p['us_per_step']:>10.1f}"
+                  f"{p['alloc_peak_kib']:>10.1f}{p['alloc_net_kib']:>10.1f}")
+
+    if args.output:
+        write_json(args.output, {"suite": "training", "environment": environment(),
+                                 "config": {"episodes": args.episodes, "seed": args.seed, "repeats": args.repeats},
+                                 "results": results})
+    if args.update_baseline:
+        update_baseline(args.baseline, results, default_threshold=0.35)
+        print(f"\nBaseline updated: {args.baseline}")
+        return
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline to create one.")
+        return
+    rows = compare(results, baseline, "episodes_per_second", higher_is_better=True, threshold=args.threshold)
+    print_comparison(rows, "episodes/s")
+    if any(r["regressed"] for r in rows):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Type membership index (services/type_index.py).
+
+  - cold       /pokemon/index?type=... fetches the type once
+  - warm       the same listing again, no type request
+  - and        a two-type filter fetches only the new type and lists exactly
+               the Pokémon having both (checked against the stub's own types)
+  - fan-out    three or more distinct types are a 400, known or not, with no
+               type request
+  - unknown    an unknown type is a 404
+  - intersect  bitmap AND vs set intersection vs the old list filter, on
+               synthetic dexes of several sizes
+
+Exit code is 1 if any check fails.
+
+Usage:
+    python -m benchmarks.type_index --pokemon 180 --sizes 1000 10000 100000
+"""
+import argparse
+import asyncio
+import random
+import sys
+
+from fastapi import HTTPException
+
+import config
+from benchmarks.common import measure, summarize
+from benchmarks.stub_pokeapi import TYPES, StubPokeAPI, temporary_cache_db
+from services.http_client import create_http_client
+from services.type_index import TypeIndex, type_index
+
+
+def synthetic_types(size: int, seed: int = 0):
+    """{type: PokéAPI-style member list} for `size` Pokémon, a third of them dual-typed."""
+    rng = random.Random(seed)
+    members = {t: [] for t in TYPES}
+    for i in range(1, size + 1):
+        for t in set(rng.sample(TYPES, 2 if i % 3 == 0 else 1)):
+            members[t].append({"pokemon": {"name": f"mon-{i}", "url": f"https://pokeapi.co/api/v2/pokemon/{i}/"}})
+    return members
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pokemon", type=int, default=180, help="Pokémon served by the stub")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--number", type=int, default=20, help="Queries per sample")
+    args = parser.parse_args()
+
+    from api.pokemon import pokemon_index
+
+    failures = []
+
+    def check(label: str, ok: bool, detail: str):
+        print(f"  {'ok  ' if ok else 'FAIL'} {label}: {detail}")
+        if not ok:
+            failures.append(label)
+
+    async def scenarios(stub: StubPokeAPI):
+        def having(*types):
+            return [stub.pokemon(i)["name"] for i in range(1, stub.count + 1)
+                    if set(types) <= {t["type"]["name"] for t in stub.pokemon(i)["types"]}]
+
+        first, second = (t["type"]["name"] for t in stub.pokemon(3)["types"])  # a dual-typed stub Pokémon
+        async with create_http_client() as client:
+            async def listing(type_filter):
+                page = await pokemon_index(type=type_filter, name=None, match="substring", page=1, page_size=1,
+                                           including_evolution=False, client=client)
+                return page["count"]
+
+            stub.reset_counts()
+            count = await listing(first)
+            check("cold", stub.requests["type"] == 1 and count == len(having(first)),
+                  f"{stub.requests['type']} type request, {count} {first} Pokémon")
+
+            stub.reset_counts()
+            count = await listing(first.upper())
+            check("warm", stub.requests["type"] == 0, f"{stub.requests['type']} type requests")
+
+            stub.reset_counts()
+            count = await listing(f"{first}, {second}")
+            expected = having(first, second)
+            check("and", stub.requests["type"] == 1 and count == len(expected) > 0,
+                  f"{stub.requests['type']} type request, {count} {first}+{second} Pokémon (expected {len(expected)})")
+
+            stub.reset_counts()
+            third = next(t for t in TYPES if t not in (first, second))
+            statuses = []
+            for types in ([first, second, third, first], [first, second, "shadow"]):
+                try:
+                    await listing(",".join(types))
+                    statuses.append(200)
+                except HTTPException as e:
+                    statuses.append(e.status_code)
+            check("fan-out", stub.requests["type"] == 0 and statuses == [400, 400],
+                  f"statuses {statuses} for three known / two known and one unknown type, "
+                  f"{stub.requests['type']} type requests")
+
+            try:
+                await listing("shadow")
+                status = 200
+            except HTTPException as e:
+                status = e.status_code
+            check("unknown", status == 404, f"status {status}")
+
+    type_index.clear()
+    with temporary_cache_db(), StubPokeAPI(pokemon=args.pokemon) as stub:
+        config.POKEAPI_BASE_URL = stub.base_url
+        asyncio.run(scenarios(stub))
+    print(f"type index: {type_index.stats()}")
+
+    print(f"\n{'size':>8}{'matches':>9}{'bitmap us':>12}{'set us':>10}{'list us':>11}")
+    for size in args.sizes:
+        members = synthetic_types(size)
+        index = TypeIndex()
+        fire, flying = index.put("fire", members["fire"]), index.put("flying", members["flying"])
+        fire_names = [m["pokemon"]["name"] for m in members["fire"]]
+        flying_names = [m["pokemon"]["name"] for m in members["flying"]]
+        result = index.members([fire, flying])
+        flying_set = set(flying_names)
+        if sorted(result) != sorted(n for n in fire_names if n in flying_set):
+            check(f"intersect {size}", False, "bitmap and list filter disagree")
+        bitmap = summarize(measure(lambda: index.members([fire, flying]), number=args.number))
+        sets = summarize(measure(lambda: set(fire_names) & set(flying_names), number=args.number))
+        scan = summarize(measure(lambda: [n for n in fire_names if n in flying_names], repeats=3, warmup=0))
+        print(f"{size:>8}{len(result):>9}{bitmap['median_us']:>12.1f}{sets['median_us']:>10.1f}{scan['median_us']:>11.1f}")
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed: {', '.join(failures)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Startup warm-up (services/warmup.py) against the stub PokéAPI
+(benchmarks/stub_pokeapi.py), with a temporary battles table in which a few
+stub Pokémon are battled far more often than the rest.
+
+  - hot set    the WARMUP_TOP_BATTLED most-battled Pokémon are picked from the
+               battles table, after AI_POKEMON_POOL and WARMUP_POKEMON
+  - warm-up    not ready before, ready after; hot Pokémon are fetched
+               WARMUP_CONCURRENCY at a time (the AI roster is not in the stub
+               and counts as failed)
+  - first hit  first lookup of each hot Pokémon, cold start vs after warm-up:
+               0 upstream requests once warmed up
+  - engine     BattleSimulator construction, building the type chart and move
+               database (what every construction paid before) vs shared
+  - timeout    a warm-up slower than WARMUP_TIMEOUT_SECONDS still ends ready
+
+Exit code is 1 if any check fails.
+
+Usage:
+    python -m benchmarks.warmup --pokemon 60 --delay 0.05
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import config
+from benchmarks.common import measure, summarize
+from benchmarks.stub_pokeapi import StubPokeAPI, temporary_cache_db
+from database.models import Battle
+from services.battle_simulator import BattleSimulator, move_database, type_chart
+from services.data_fetcher import fetch_pokemon_record
+from services.http_client import create_http_client
+from services.pokemon_cache import pokemon_cache
+from services.warmup import hot_pokemon, most_battled, warmup
+from train import p1_info, p2_info
+
+
+def seed_battles(session_factory, names, top_n: int) -> list:
+    """Mirror battles in which names[i] (i < top_n) fights (top_n - i) * 10 times and every other name once; returns the top names."""
+    now = datetime.now(timezone.utc)
+    rows = []
+    for i, name in enumerate(names):
+        for _ in range((top_n - i) * 10 if i < top_n else 1):
+            rows.append(Battle(id=str(uuid.uuid4()), user_id=1, status="completed",
+                               player_pokemon=json.dumps({"name": name}), ai_pokemon=json.dumps(name),
+                               created_at=now - timedelta(seconds=len(rows))))
+    with session_factory() as db:
+        db.add_all(rows)
+        db.commit()
+    return names[:top_n]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pokemon", type=int, default=60, help="Pokémon in the stub")
+    parser.add_argument("--delay", type=float, default=0.05, help="Stub upstream latency in seconds")
+    parser.add_argument("--top", type=int, default=5, help="WARMUP_TOP_BATTLED")
+    args = parser.parse_args()
+
+    from api.play import AI_POKEMON_POOL
+
+    failures = []
+
+    def check(label: str, ok: bool, detail: str):
+        print(f"  {'ok  ' if ok else 'FAIL'} {label}: {detail}")
+        if not ok:
+            failures.append(label)
+
+    saved = (config.WARMUP_POKEMON, config.WARMUP_TOP_BATTLED, config.WARMUP_BATTLE_SCAN, config.WARMUP_TIMEOUT_SECONDS)
+
+    async def first_hits(names, client):
+        samples = []
+        for name in names:
+            started = time.perf_counter()
+            await fetch_pokemon_record(name, client)
+            samples.append(time.perf_counter() - started)
+        return summarize(samples)
+
+    async def scenarios(stub: StubPokeAPI, hot):
+        async with create_http_client() as client:
+            stub.reset_counts()
+            cold = await first_hits(hot, client)
+            cold_upstream = stub.requests["pokemon"]
+
+            pokemon_cache.clear()
+            warmup.reset()
+            ready_before = warmup.ready
+            await warmup.run(client, pokemon_cache.session_factory)
+            status = warmup.status()
+            check("warm-up", not ready_before and warmup.ready and not warmup.timed_out
+                  and status["pokemon"]["loaded"] == len(hot)
+                  and status["pokemon"]["failed"] == len(AI_POKEMON_POOL), f"{status}")
+            serial = len(hot) * args.delay
+            check("concurrency", status["steps"]["pokemon"] < serial / 2,
+                  f"{len(hot)} Pokémon in {status['steps']['pokemon'] * 1e3:.0f} ms "
+                  f"({serial * 1e3:.0f} ms one at a time, {config.WARMUP_CONCURRENCY} at a time)")
+
+            stub.reset_counts()
+            warm = await first_hits(hot, client)
+            for label, r, upstream in (("cold", cold, cold_upstream), ("warm", warm, stub.requests["pokemon"])):
+                print(f"first hit {label:<5} p50 {r['median_us'] / 1e3:7.2f} ms  p99 {r['p99_us'] / 1e3:7.2f} ms"
+                      f"  {upstream:>4} upstream requests")
+            check("first hit", stub.requests["pokemon"] == 0 and warm["p99_us"] < cold["median_us"] / 5,
+                  f"p50 {cold['median_us'] / 1e3:.2f} ms -> {warm['median_us'] / 1e3:.2f} ms")
+
+            pokemon_cache.clear()
+            warmup.reset()
+            config.WARMUP_TIMEOUT_SECONDS = args.delay / 2
+            stub.delay = 10 * args.delay
+            await warmup.run(client, pokemon_cache.session_factory)
+            stub.delay = args.delay
+            check("timeout", warmup.ready and warmup.timed_out, f"ready after {warmup.steps['total'] * 1e3:.0f} ms")
+
+    try:
+        with temporary_cache_db(), StubPokeAPI(pokemon=args.pokemon, delay=args.delay) as stub:
+            config.POKEAPI_BASE_URL = stub.base_url
+            config.WARMUP_POKEMON = stub.names[-2:]
+            config.WARMUP_TOP_BATTLED, config.WARMUP_BATTLE_SCAN = args.top, 100_000
+            top = seed_battles(pokemon_cache.session_factory, stub.names[:-2], args.top)
+
+            picked = most_battled(pokemon_cache.session_factory, args.top, config.WARMUP_BATTLE_SCAN)
+            hot = hot_pokemon(pokemon_cache.session_factory)
+            pool = [p["name"] for p in AI_POKEMON_POOL]
+            check("hot set", picked == top and hot == pool + config.WARMUP_POKEMON + top,
+                  f"{len(hot)} Pokémon, most battled {picked}")
+            hot = [name for name in hot if name not in pool]  # the ones the stub serves
+            print(f"{args.pokemon} Pokémon, stub latency {args.delay * 1e3:.0f} ms, {len(hot)} hot")
+            asyncio.run(scenarios(stub, hot))
+    finally:
+        config.WARMUP_POKEMON, config.WARMUP_TOP_BATTLED, config.WARMUP_BATTLE_SCAN, config.WARMUP_TIMEOUT_SECONDS = saved
+
+    def cold_construction():
+        type_chart.cache_clear()
+        move_database.cache_clear()
+        BattleSimulator(p1_info, p2_info)
+
+    cold = summarize(measure(cold_construction, repeats=30, number=10))
+    shared = summarize(measure(lambda: BattleSimulator(p1_info, p2_info), repeats=30, number=10))
+    print(f"construction  building registries {cold['median_us']:8.1f} us  shared {shared['median_us']:8.1f} us")
+    check("engine", shared["median_us"] < cold["median_us"] / 2,
+          f"{cold['median_us'] / shared['median_us']:.1f}x faster with shared registries")
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed: {', '.join(failures)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
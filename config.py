@@ -7,3 +7,39 @@ SECRET_KEY = os.getenv("SECRET_KEY", "fallbacksecret")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60))
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./test.db")
+TRAINING_RUNS_DIR = os.getenv("TRAINING_RUNS_DIR", "runs")
+ROSTER_PATH = os.getenv("ROSTER_PATH")  # optional JSON list of extra Pokémon for roster training
+POLICY_TABLE_PATH = os.getenv("POLICY_TABLE_PATH", "policy_table.npz")  # distilled serving policy, preferred over qtable.pkl
+POKEAPI_BASE_URL = os.getenv("POKEAPI_BASE_URL", "https://pokeapi.co/api/v2")
+POKEMON_CACHE_SIZE = int(os.getenv("POKEMON_CACHE_SIZE", 2048))  # in-process LRU entries
+POKEMON_CACHE_TTL_SECONDS = int(os.getenv("POKEMON_CACHE_TTL_SECONDS", 86400))  # memory and pokemon_cache table
+POKEMON_CACHE_MAX_STALE_SECONDS = int(os.getenv("POKEMON_CACHE_MAX_STALE_SECONDS", 604800))  # past the TTL, served while refreshed in the background
+# Shared upstream HTTP client (services/http_client.py)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", 100))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", 20))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", 30))  # seconds an idle connection is kept
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", 10))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 5))
+HTTP2 = os.getenv("HTTP2", "true").lower() in ("1", "true", "yes")  # used when the h2 package is installed
+INDEX_FETCH_CONCURRENCY = int(os.getenv("INDEX_FETCH_CONCURRENCY", 10))  # concurrent Pokémon fetched per /pokemon/index page
+INDEX_ITEM_TIMEOUT = float(os.getenv("INDEX_ITEM_TIMEOUT", 5))  # seconds per detail / evolution fetch before the row is skipped
+# Upstream circuit breaker (services/circuit_breaker.py)
+UPSTREAM_BREAKER_FAILURES = int(os.getenv("UPSTREAM_BREAKER_FAILURES", 5))  # consecutive failures that open it
+UPSTREAM_BREAKER_RESET_SECONDS = float(os.getenv("UPSTREAM_BREAKER_RESET_SECONDS", 30))  # open time before a trial call
+UPSTREAM_SLOW_CALL_SECONDS = float(os.getenv("UPSTREAM_SLOW_CALL_SECONDS", 2))  # slower responses count as failures
+EVOLUTION_CACHE_SIZE = int(os.getenv("EVOLUTION_CACHE_SIZE", 1024))  # evolution chains kept in memory
+EVOLUTION_CACHE_TTL_SECONDS = int(os.getenv("EVOLUTION_CACHE_TTL_SECONDS", 86400))
+NAME_INDEX_REFRESH_SECONDS = int(os.getenv("NAME_INDEX_REFRESH_SECONDS", 86400))  # age before the local name index is refetched
+NAME_INDEX_RETRY_SECONDS = int(os.getenv("NAME_INDEX_RETRY_SECONDS", 300))  # wait after a failed refresh
+TYPE_INDEX_TTL_SECONDS = int(os.getenv("TYPE_INDEX_TTL_SECONDS", 86400))  # age before a type's member list is refetched
+OFFLINE_MODE = os.getenv("OFFLINE_MODE", "false").lower() in ("1", "true", "yes")  # serve Pokémon data only from the imported dex bundle (database/import_dex.py)
+# Startup warm-up (services/warmup.py); /health answers 503 until it is done
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() in ("1", "true", "yes")
+WARMUP_BACKGROUND = os.getenv("WARMUP_BACKGROUND", "true").lower() in ("1", "true", "yes")  # false: startup waits for it
+WARMUP_POKEMON = [n.strip().lower() for n in os.getenv("WARMUP_POKEMON", "").split(",") if n.strip()]  # preloaded besides AI_POKEMON_POOL
+WARMUP_TOP_BATTLED = int(os.getenv("WARMUP_TOP_BATTLED", 20))  # most-battled Pokémon preloaded from the battles table
+WARMUP_BATTLE_SCAN = int(os.getenv("WARMUP_BATTLE_SCAN", 5000))  # most recent battles counted for that
+WARMUP_CONCURRENCY = int(os.getenv("WARMUP_CONCURRENCY", 8))  # Pokémon fetched at a time
+WARMUP_TIMEOUT_SECONDS = float(os.getenv("WARMUP_TIMEOUT_SECONDS", 60))  # ready after this even if preloading is unfinished
+PLAY_SESSION_CACHE_SIZE = int(os.getenv("PLAY_SESSION_CACHE_SIZE", 1024))  # live /play battles kept in memory (services/battle_sessions.py)
+PLAY_SESSION_TTL_SECONDS = int(os.getenv("PLAY_SESSION_TTL_SECONDS", 1800))  # idle time before a live battle is dropped and later rehydrated
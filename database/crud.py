@@ -10,3 +10,20 @@ def create_user(db: Session, username: str, password_hash: str):
     db.commit()
     db.refresh(user)
     return user
+
+def create_training_session(db: Session, user_id: int, episodes: int, win_rate: float,
+                            final_epsilon: float, training_time_seconds: float,
+                            hyperparameters: str = None, model_version: str = None):
+    session = models.TrainingSession(
+        user_id=user_id,
+        episodes=episodes,
+        win_rate=win_rate,
+        final_epsilon=final_epsilon,
+        training_time_seconds=training_time_seconds,
+        hyperparameters=hyperparameters,
+        model_version=model_version,
+    )
+    db.add(session)
+    db.commit()
+    db.refresh(session)
+    return session
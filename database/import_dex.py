@@ -0,0 +1,160 @@
+"""
+Offline dex bundle importer.
+
+Stream-parses a local PokéAPI dump, a directory or a .zip / .tar(.gz) archive
+of JSON resources, into the dex_* tables of database/models.py. Resources are
+read and converted one at a time and written every `--batch` resources, so memory
+stays flat whatever the size of the dump; importing again updates rows in place.
+With OFFLINE_MODE set, the app then reads Pokémon data from these tables only
+(services/offline_dex.py).
+
+A resource is `<kind>/<key>/index.json` (the PokeAPI/api-data layout, e.g.
+api/v2/pokemon/25/index.json) or `<kind>/<key>.json`, where kind is one of
+pokemon, pokemon-species, evolution-chain, type or move. List pages and other
+sub-resources (encounters, ...) are skipped.
+
+Usage:
+    python -m database.import_dex path/to/api-data/data
+    python -m database.import_dex pokeapi-dump.tar.gz --batch 1000
+"""
+import argparse
+import json
+import os
+import tarfile
+import time
+import zipfile
+from collections import Counter, defaultdict
+from pathlib import Path, PurePosixPath
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Tuple, Type
+
+from sqlalchemy import delete, insert
+
+from . import models
+from .database import Base, SessionLocal, engine
+
+KINDS = ("pokemon", "pokemon-species", "evolution-chain", "type", "move")
+
+
+def resource_kind(path: str) -> Optional[str]:
+    """The resource kind of a dump member path, or None if it is not a single resource."""
+    parts = PurePosixPath(path.replace(os.sep, "/")).parts
+    if not parts or not parts[-1].endswith(".json"):
+        return None
+    key_parts = parts[:-1] if parts[-1] == "index.json" else parts[:-1] + (parts[-1][:-5],)
+    if len(key_parts) < 2 or key_parts[-2] not in KINDS:
+        return None
+    return key_parts[-2]
+
+def iter_bundle(path: str) -> Iterator[Tuple[str, str, IO[bytes]]]:
+    """(kind, member path, open file) for every resource in a directory, zip or tar archive, in order."""
+    source = Path(path)
+    if source.is_dir():
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                member = os.path.relpath(os.path.join(root, name), source)
+                kind = resource_kind(member)
+                if kind:
+                    with open(os.path.join(root, name), "rb") as f:
+                        yield kind, member, f
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for info in archive.infolist():
+                kind = resource_kind(info.filename)
+                if kind and not info.is_dir():
+                    with archive.open(info) as f:
+                        yield kind, info.filename, f
+    elif tarfile.is_tarfile(source):
+        with tarfile.open(source, "r|*") as archive:  # streaming mode: members are read in archive order
+            for info in archive:
+                kind = resource_kind(info.name)
+                if kind and info.isfile():
+                    yield kind, info.name, archive.extractfile(info)
+    else:
+        raise ValueError(f"{path} is not a directory, zip or tar archive")
+
+def dex_rows(kind: str, data: Dict[str, Any]) -> List[Tuple[Type[Base], Dict[str, Any]]]:
+    """(table model, row) pairs for one PokéAPI resource."""
+    if kind == "pokemon":
+        from services.pokemon_cache import pokemon_record
+
+        record = pokemon_record(data)
+        return [(models.DexPokemon, {"id": data["id"], "name": record["name"], "types": json.dumps(record["types"]),
+                                     "stats": json.dumps(record["stats"]), "abilities": json.dumps(record["abilities"]),
+                                     "moves": json.dumps(record["moves"])})] + [
+            (models.DexPokemonType, {"pokemon_id": data["id"], "type": t["type"]["name"], "slot": t.get("slot", 1)})
+            for t in data["types"]]
+    if kind == "pokemon-species":
+        from services.evolution_cache import chain_id_from_url
+
+        evo_url = (data.get("evolution_chain") or {}).get("url")
+        return [(models.DexSpecies, {"id": data["id"], "name": data["name"],
+                                     "evolution_chain_id": chain_id_from_url(evo_url) if evo_url else None})]
+    if kind == "evolution-chain":
+        return [(models.DexEvolutionChain, {"id": data["id"], "chain": json.dumps(data["chain"])})]
+    if kind == "type":
+        return [(models.DexType, {"id": data["id"], "name": data["name"]})]
+    if kind == "move":
+        return [(models.DexMove, {"id": data["id"], "name": data["name"], "type": (data.get("type") or {}).get("name"),
+                                  "power": data.get("power"), "accuracy": data.get("accuracy"), "pp": data.get("pp"),
+                                  "damage_class": (data.get("damage_class") or {}).get("name")})]
+    raise ValueError(f"Unknown resource kind '{kind}'")
+
+def _write_batch(db, rows: Dict[Type[Base], List[Dict[str, Any]]]):
+    # A re-imported Pokémon's types are replaced as a whole
+    pokemon_ids = [row["id"] for row in rows.get(models.DexPokemon, ())]
+    if pokemon_ids:
+        db.execute(delete(models.DexPokemonType).where(models.DexPokemonType.pokemon_id.in_(pokemon_ids)))
+    for model, batch in rows.items():
+        db.execute(insert(model).prefix_with("OR REPLACE"), batch)  # SQLite upsert, one executemany per table
+    db.commit()
+    rows.clear()
+
+def import_bundle(path: str, session_factory: Callable[[], Any] = SessionLocal, batch: int = 500) -> Counter:
+    """Import a dump into the dex_* tables; returns resources imported per kind (and `skipped`)."""
+    if batch < 1:
+        raise ValueError(f"batch must be at least 1, got {batch}")
+    counts = Counter()
+    pending: Dict[Type[Base], List[Dict[str, Any]]] = defaultdict(list)
+    with session_factory() as db:
+        resources = 0
+        for kind, member, f in iter_bundle(path):
+            try:
+                rows = dex_rows(kind, json.load(f))
+            except (ValueError, KeyError, TypeError) as e:
+                print(f"Skipping {member}: {e}")
+                counts["skipped"] += 1
+                continue
+            for model, row in rows:
+                pending[model].append(row)
+            counts[kind] += 1
+            resources += 1
+            if resources % batch == 0:
+                _write_batch(db, pending)
+        _write_batch(db, pending)
+    return counts
+
+
+def _batch_size(value: str) -> int:
+    try:
+        batch = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not an integer: '{value}'")
+    if batch < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {batch}")
+    return batch
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="Dump directory, .zip or .tar(.gz) archive")
+    parser.add_argument("--batch", type=_batch_size, default=500, help="Resources per commit")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    started = time.perf_counter()
+    counts = import_bundle(args.path, batch=args.batch)
+    elapsed = time.perf_counter() - started
+    imported = sum(n for kind, n in counts.items() if kind != "skipped")
+    print(f"Imported {imported} resources in {elapsed:.1f}s: "
+          + ", ".join(f"{counts[kind]} {kind}" for kind in KINDS) + f" ({counts['skipped']} skipped)")
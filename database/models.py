@@ -75,6 +75,73 @@ class Pokemon(Base):
     def __repr__(self):
         return f"<Pokemon(id={self.id}, name='{self.name}')>"
 
+class PokemonName(Base):
+    """Local name index of every Pokémon, refreshed from PokéAPI's list (services/name_index.py)."""
+    __tablename__ = "pokemon_names"
+
+    id = Column(Integer, primary_key=True)  # national dex id
+    name = Column(String, unique=True, index=True, nullable=False)
+    refreshed_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f"<PokemonName(id={self.id}, name='{self.name}')>"
+
+class DexPokemon(Base):
+    """Offline dex bundle (database/import_dex.py): one normalized record per Pokémon."""
+    __tablename__ = "dex_pokemon"
+
+    id = Column(Integer, primary_key=True)  # national dex id
+    name = Column(String, unique=True, index=True, nullable=False)
+    types = Column(Text, nullable=False)  # JSON array of types
+    stats = Column(Text, nullable=False)  # JSON object of stats
+    abilities = Column(Text, nullable=False)  # JSON array of abilities
+    moves = Column(Text, nullable=False)  # JSON array of moves
+
+    def __repr__(self):
+        return f"<DexPokemon(id={self.id}, name='{self.name}')>"
+
+class DexPokemonType(Base):
+    """Offline dex bundle: type membership, one row per (Pokémon, type)."""
+    __tablename__ = "dex_pokemon_types"
+
+    pokemon_id = Column(Integer, ForeignKey("dex_pokemon.id"), primary_key=True)
+    type = Column(String, primary_key=True, index=True)
+    slot = Column(Integer, nullable=False, default=1)
+
+class DexSpecies(Base):
+    """Offline dex bundle: species and the evolution chain they belong to."""
+    __tablename__ = "dex_species"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, index=True, nullable=False)
+    evolution_chain_id = Column(Integer, index=True, nullable=True)
+
+class DexEvolutionChain(Base):
+    """Offline dex bundle: raw PokéAPI evolution chains."""
+    __tablename__ = "dex_evolution_chains"
+
+    id = Column(Integer, primary_key=True)
+    chain = Column(Text, nullable=False)  # JSON chain node
+
+class DexType(Base):
+    """Offline dex bundle: types."""
+    __tablename__ = "dex_types"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, index=True, nullable=False)
+
+class DexMove(Base):
+    """Offline dex bundle: moves."""
+    __tablename__ = "dex_moves"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, index=True, nullable=False)
+    type = Column(String, nullable=True)
+    power = Column(Integer, nullable=True)
+    accuracy = Column(Integer, nullable=True)
+    pp = Column(Integer, nullable=True)
+    damage_class = Column(String, nullable=True)
+
 class GameStats(Base):
     """Track overall game statistics."""
     __tablename__ = "game_stats"
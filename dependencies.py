@@ -1,11 +1,19 @@
 from fastapi import HTTPException
+import httpx
 from ai.rl_agent import QLearningAgent
-from typing import Optional
+from ai.policy_table import PolicyTable
+from typing import Optional, Union
 
-# This will hold the global Q-learning agent instance after startup
-agent_instance: Optional[QLearningAgent] = None
+# This will hold the global agent after startup: a distilled PolicyTable if one
+# was exported, otherwise the full Q-learning agent
+agent_instance: Optional[Union[QLearningAgent, PolicyTable]] = None
 
-def get_agent() -> QLearningAgent:
+# Pooled clients for PokéAPI requests, created and closed by main.lifespan;
+# the sync one serves sync code paths run on the threadpool
+http_client: Optional[httpx.AsyncClient] = None
+sync_http_client: Optional[httpx.Client] = None
+
+def get_agent() -> Union[QLearningAgent, PolicyTable]:
     """
     Dependency to retrieve the global AI agent.
     Raises 500 if the agent is not yet loaded.
@@ -14,3 +22,11 @@ def get_agent() -> QLearningAgent:
         raise HTTPException(status_code=500, detail="AI agent not loaded.")
     return agent_instance
 
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Dependency to retrieve the shared upstream HTTP client.
+    Raises 500 if the app was started without its lifespan.
+    """
+    if http_client is None:
+        raise HTTPException(status_code=500, detail="HTTP client not initialized.")
+    return http_client
@@ -0,0 +1,45 @@
+import argparse
+import json
+import random
+
+from services.policy_evaluation import evaluate_policies
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Play seeded battles between policies and report win rates (95% Wilson CI), "
+                    "battle length and per-decision latency. Policy specs: random, heuristic, "
+                    "qtable[:path], dqn[:path], frozen:path, blend:W[:path].")
+    parser.add_argument("policies", nargs="+", help="Policy specs; every pair is evaluated")
+    parser.add_argument("--battles", type=int, default=200, help="Battles per (pair, matchup)")
+    parser.add_argument("--matchups", type=int, default=4, help="Matchups sampled from the training roster")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--batch", type=int, default=1, help="Battles stepped in lockstep (1 = serving latency)")
+    parser.add_argument("--max-turns", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Write the full report as JSON")
+    args = parser.parse_args()
+
+    from ai.curriculum import load_roster
+    from train import p1_info, p2_info
+
+    roster = load_roster()
+    pairs = [(a, b) for a in roster for b in roster if a["name"] != b["name"]]
+    matchups = [(p1_info, p2_info)] + random.Random(args.seed).sample(pairs, min(len(pairs), max(0, args.matchups - 1)))
+
+    report = evaluate_policies(args.policies, matchups, battles=args.battles, workers=args.workers,
+                               seed=args.seed, batch=args.batch, max_turns=args.max_turns)
+
+    print(f"{'policy A':<24}{'policy B':<24}{'A win rate':>12}{'95% CI':>18}{'draws':>8}{'turns':>8}")
+    for r in report["pairs"]:
+        ci = f"[{r['ci95'][0]:.2f}, {r['ci95'][1]:.2f}]"
+        print(f"{r['policy_a']:<24}{r['policy_b']:<24}{r['win_rate']:>12.2%}{ci:>18}"
+              f"{r['draw_rate']:>8.2%}{r['avg_turns']:>8.1f}")
+    print()
+    print(f"{'policy':<24}{'decisions':>10}{'mean us':>10}{'p50 us':>10}{'p95 us':>10}")
+    for spec, lat in report["latency"].items():
+        print(f"{spec:<24}{lat['decisions']:>10}{lat['mean_us']:>10.1f}{lat['p50_us']:>10.1f}{lat['p95_us']:>10.1f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
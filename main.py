@@ -1,4 +1,8 @@
+import os
+import asyncio
 import threading
+import time
+from typing import List
 from fastapi import FastAPI, HTTPException, Depends, status, Body
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
@@ -15,24 +19,66 @@ from database.database import SessionLocal, engine
 
 from api import ai, pokemon, battle, play
 from ai.rl_agent import load_agent
+from ai.policy_table import PolicyTable
+from services.http_client import create_http_client, create_sync_http_client
+from services.name_index import keep_name_index_fresh, name_index
+from services.offline_dex import offline_dex
+from services.warmup import warmup
 import dependencies
 import config
 
 # Thread lock for thread safety
 lock = threading.Lock()
 
+# Upper bound on states per /predict_moves request
+MAX_PREDICT_BATCH = 1024
+
 # Lifespan handler to load AI agent on startup
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # One pooled client for all upstream requests (keep-alive, HTTP/2 when available)
+    dependencies.http_client = create_http_client()
+    dependencies.sync_http_client = create_sync_http_client()
+    # Pokémon name index: last persisted copy now, upstream refresh in the background;
+    # offline, the dex bundle is the whole world and never changes under us
+    name_index_task = None
+    if config.OFFLINE_MODE:
+        name_index.replace(offline_dex.names())
+        print(f"Offline mode: {len(name_index)} Pokémon in the dex bundle.")
+    else:
+        if name_index.load(SessionLocal):
+            print(f"Name index loaded: {len(name_index)} Pokémon.")
+        name_index_task = asyncio.create_task(keep_name_index_fresh(name_index, dependencies.http_client, SessionLocal))
+    started = time.perf_counter()
     try:
-        default_actions = ["tackle", "water gun", "bite", "ember", "wing attack", "slash"]
-        dependencies.agent_instance = load_agent(filename="qtable.pkl", actions=default_actions)
-        print("Q-learning agent loaded with default actions.")
+        if config.POLICY_TABLE_PATH and os.path.exists(config.POLICY_TABLE_PATH):
+            # Distilled argmax table: no float Q-matrix in the serving process
+            dependencies.agent_instance = PolicyTable.load(config.POLICY_TABLE_PATH)
+            print(f"Policy table loaded from {config.POLICY_TABLE_PATH}.")
+        else:
+            default_actions = ["tackle", "water gun", "bite", "ember", "wing attack", "slash"]
+            dependencies.agent_instance = load_agent(filename="qtable.pkl", actions=default_actions)
+            print("Q-learning agent loaded with default actions.")
     except Exception as e:
         print(f"Agent load failed: {e}")
         dependencies.agent_instance = None
+    warmup.record("agent", time.perf_counter() - started)
+    # Engine registries and hot Pokémon; /health reports readiness
+    warmup_task = None
+    if config.WARMUP_ENABLED:
+        warmup_task = asyncio.create_task(warmup.run(dependencies.http_client, SessionLocal))
+        if not config.WARMUP_BACKGROUND:
+            await warmup_task
+    else:
+        warmup.mark_ready()
     yield
     print("Server shutting down...")
+    for task in (name_index_task, warmup_task):
+        if task is not None:
+            task.cancel()
+    await dependencies.http_client.aclose()
+    dependencies.sync_http_client.close()
+    dependencies.http_client = dependencies.sync_http_client = None
 
 # Create FastAPI app with lifespan event
 app = FastAPI(
@@ -88,29 +134,40 @@ def predict_move(state: dict, current_user: models.User = Depends(auth.get_curre
     if agent is None:
         raise HTTPException(status_code=500, detail="AI agent not loaded.")
     try:
-        # Canonicalize state for consistent hashing
-        clean_state = {}
-        for k, v in state.items():
-            if isinstance(v, list):
-                clean_state[k] = tuple(v)
-            elif isinstance(v, dict):
-                clean_state[k] = tuple(sorted(v.items()))
-            else:
-                clean_state[k] = v
-        
-        action = agent.choose_action(clean_state)
+        # Same integer key as training (ai/state_encoder.py), whether lists or tuples
+        action = agent.choose_actions([state])[0]
         return {"action": action, "state_processed": True, "user_id": current_user.id}
     except Exception as e:
         return {"action": "tackle", "error": str(e), "state_processed": False}
 
+@app.post("/predict_moves", tags=["AI"])
+def predict_moves(
+    states: List[dict] = Body(..., embed=True, max_length=MAX_PREDICT_BATCH),
+    greedy: bool = False,
+    current_user: models.User = Depends(auth.get_current_user),
+):
+    """Batch version of /predict_move: one vectorized Q-table lookup for all states."""
+    agent = dependencies.agent_instance
+    if agent is None:
+        raise HTTPException(status_code=500, detail="AI agent not loaded.")
+    try:
+        actions = agent.choose_actions(states, greedy=greedy)
+        return {"actions": actions, "count": len(actions), "state_processed": True, "user_id": current_user.id}
+    except Exception as e:
+        return {"actions": ["tackle"] * len(states), "count": len(states), "error": str(e), "state_processed": False}
+
 # Health check endpoint
 @app.get("/health", tags=["System"])
 def health_check():
-    return {
-        "status": "healthy",
+    # 503 while warming up, so load balancers hold traffic until the first battles are fast
+    content = {
+        "status": "healthy" if warmup.ready else "warming_up",
+        "ready": warmup.ready,
         "ai_agent_loaded": dependencies.agent_instance is not None,
-        "database_connected": True
+        "database_connected": True,
+        "warmup": warmup.status(),
     }
+    return JSONResponse(status_code=200 if warmup.ready else 503, content=content)
 
 # Include routers with proper authentication
 app.include_router(
@@ -1,4 +1,4 @@
-import requests
+import config
 from fastapi import HTTPException
 from pydantic import BaseModel, Field
 from typing import List, Dict, Optional
@@ -20,6 +20,17 @@ class PokemonInfo(BaseModel):
             moves=[m["move"]["name"] for m in data["moves"][:15]],
         )
 
+    @classmethod
+    def from_record(cls, record: dict):
+        """From a normalized cache record (services/pokemon_cache.py)."""
+        return cls(
+            name=record["name"],
+            types=record["types"],
+            abilities=record["abilities"],
+            stats=record["stats"],
+            moves=record["moves"][:15],
+        )
+
 class EvolutionChain(BaseModel):
     chain: dict
 
@@ -29,12 +40,32 @@ class EvolutionChain(BaseModel):
 
 # NEW FUNCTION
 def get_pokemon_data(name: str) -> PokemonInfo:
-    """Fetch Pokémon info from PokéAPI."""
-    url = f"https://pokeapi.co/api/v2/pokemon/{name.lower()}"
-    resp = requests.get(url)
+    """
+    Fetch Pokémon info from the cache, or PokéAPI on a miss (the offline dex
+    bundle in OFFLINE_MODE). A stale record is returned at once and refreshed
+    on a worker thread, as fetch_pokemon_record does for async callers.
+    """
+    from services.data_fetcher import fetch_and_cache_record_sync, revalidate_sync
+    from services.pokemon_cache import pokemon_cache
+
+    if config.OFFLINE_MODE:
+        from services.offline_dex import offline_dex
+
+        record = offline_dex.pokemon(name)
+        if record is None:
+            raise HTTPException(status_code=404, detail=f"Pokémon '{name}' not found.")
+        return PokemonInfo.from_record(record)
 
-    if resp.status_code != 200:
-        raise HTTPException(status_code=resp.status_code, detail=f"Pokémon '{name}' not found.")
+    record, fresh = pokemon_cache.lookup(name)
+    if record is not None:
+        if not fresh:
+            revalidate_sync(name)
+        return PokemonInfo.from_record(record)
 
-    data = resp.json()
-    return PokemonInfo.from_pokeapi(data)
+    # Missing: fetch through the shared upstream circuit breaker
+    status, record = fetch_and_cache_record_sync(name)
+    if status >= 500:
+        raise HTTPException(status_code=503, detail="PokéAPI is unavailable")
+    if record is None:
+        raise HTTPException(status_code=status, detail=f"Pokémon '{name}' not found.")
+    return PokemonInfo.from_record(record)
@@ -0,0 +1,87 @@
+"""
+Live /play battles (api/play.py).
+
+A `BattleSession` keeps a battle's BattleSimulator between moves, with its
+turn count and battle history, so a move costs the turn itself instead of a
+simulator rebuild. Sessions live in a bounded in-process LRU cache with a
+time to live (PLAY_SESSION_CACHE_SIZE, PLAY_SESSION_TTL_SECONDS).
+
+The battle's snapshot in the `battles` store stays the source of truth and is
+rewritten after every move; a session that was evicted or expired is
+rehydrated from it on the next move, turn count and history included.
+"""
+import threading
+from typing import Any, Dict
+
+import config
+from services.battle_simulator import BattleSimulator
+from services.ttl_cache import TTLCache
+
+
+class BattleSession:
+    def __init__(self, battle_id: str, user_id: Any, sim: BattleSimulator):
+        self.battle_id = battle_id
+        self.user_id = user_id
+        self.sim = sim
+        self.lock = threading.Lock()  # one move at a time per battle
+
+    @classmethod
+    def from_snapshot(cls, battle_id: str, snapshot: Dict[str, Any]) -> "BattleSession":
+        """Session for a `battles` snapshot: a new battle, or one rehydrated mid-fight."""
+        sim = BattleSimulator(snapshot["player"], snapshot["ai"])
+        if "turn_count" in snapshot:
+            sim.load_battle_state({"p1": snapshot["player"], "p2": snapshot["ai"],
+                                   "turn_count": snapshot["turn_count"],
+                                   "battle_history": snapshot.get("battle_history", [])})
+        return cls(battle_id, snapshot.get("user_id"), sim)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """The persisted form of the battle, as stored in `battles`."""
+        return {
+            "user_id": self.user_id,
+            "player": self.sim.p1.dict(),
+            "ai": self.sim.p2.dict(),
+            "turn_count": self.sim.turn_count,
+            "battle_history": list(self.sim.battle_history),
+        }
+
+
+class BattleSessionCache:
+    def __init__(self, maxsize: int = 1024, ttl: float = 1800.0):
+        self.sessions = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.created = self.rehydrated = 0
+
+    def start(self, battle_id: str, snapshot: Dict[str, Any]) -> BattleSession:
+        """Open the live session of a new battle."""
+        session = BattleSession.from_snapshot(battle_id, snapshot)
+        self.sessions.set(battle_id, session)
+        self.created += 1
+        return session
+
+    def get(self, battle_id: str, snapshot: Dict[str, Any]) -> BattleSession:
+        """The live session, rehydrated from `snapshot` if it was evicted or has expired."""
+        session = self.sessions.get(battle_id)
+        if session is not None:
+            return session
+        with self._lock:  # concurrent moves on an evicted battle share one rehydrated session
+            session = self.sessions.get(battle_id, count=False)
+            if session is None:
+                session = BattleSession.from_snapshot(battle_id, snapshot)
+                self.sessions.set(battle_id, session)
+                self.rehydrated += 1
+        return session
+
+    def end(self, battle_id: str):
+        """Drop a finished battle's session; its final snapshot stays in `battles`."""
+        self.sessions.pop(battle_id)
+
+    def clear(self):
+        self.sessions.clear()
+        self.created = self.rehydrated = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.sessions.stats(), "created": self.created, "rehydrated": self.rehydrated}
+
+
+battle_sessions = BattleSessionCache(maxsize=config.PLAY_SESSION_CACHE_SIZE, ttl=config.PLAY_SESSION_TTL_SECONDS)
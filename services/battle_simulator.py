@@ -1,27 +1,42 @@
 import random
 import json
+from functools import lru_cache
 from typing import Dict, List, Tuple, Optional, Any
 from pathlib import Path
 from models.battle import PokemonBattleState
 
+TYPE_CHART_PATH = Path(__file__).parent.parent / "data" / "type_chart.json"
+
+# Engine registries: built once per process and shared read-only by every simulator
+@lru_cache(maxsize=None)
+def type_chart() -> Dict[str, Dict[str, float]]:
+    try:
+        with open(TYPE_CHART_PATH, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return BattleSimulator._get_simplified_type_chart()
+
+@lru_cache(maxsize=None)
+def move_database() -> Dict[str, Dict[str, Any]]:
+    return BattleSimulator._get_move_database()
+
+def warm_up_registries():
+    """Build the shared type chart and move database now rather than on the first battle."""
+    type_chart()
+    move_database()
+
 class BattleSimulator:
     """Enhanced battle simulator with comprehensive move effects and status conditions."""
     def __init__(self, p1_info: Dict[str, Any], p2_info: Dict[str, Any], debug: bool = False):
+        self.debug = debug
         self.p1 = PokemonBattleState.from_pokemon_info(p1_info)
         self.p2 = PokemonBattleState.from_pokemon_info(p2_info)
         
-        # Load type chart
-        type_chart_path = Path(__file__).parent.parent / "data" / "type_chart.json"
-        try:
-            with open(type_chart_path, "r") as f:
-                self.type_chart = json.load(f)
-        except FileNotFoundError:
-            if debug:
-                print("Warning: type_chart.json not found, using simplified chart")
-            self.type_chart = self._get_simplified_type_chart()
-
-        # Comprehensive move database
-        self.move_data = self._get_move_database()
+        # Shared type chart and comprehensive move database (see type_chart / move_database)
+        self.type_chart = type_chart()
+        self.move_data = move_database()
+        if debug and not TYPE_CHART_PATH.exists():
+            print("Warning: type_chart.json not found, using simplified chart")
         
         # Set default moves if none provided
         self._set_default_moves()
@@ -45,7 +60,8 @@ class BattleSimulator:
         else:
             print("All moves validated successfully")
 
-    def _get_simplified_type_chart(self) -> Dict[str, Dict[str, float]]:
+    @staticmethod
+    def _get_simplified_type_chart() -> Dict[str, Dict[str, float]]:
         """Simplified type chart as fallback."""
         return {
             "fire": {"grass": 2.0, "water": 0.5, "fire": 0.5, "ice": 2.0, "bug": 2.0, "steel": 2.0},
@@ -97,7 +113,8 @@ class BattleSimulator:
         
         return list(set(default_moves))[:4]
 
-    def _get_move_database(self) -> Dict[str, Dict[str, Any]]:
+    @staticmethod
+    def _get_move_database() -> Dict[str, Dict[str, Any]]:
         """Comprehensive move database with all effects."""
         return {
             # Fire moves
@@ -400,8 +417,9 @@ class BattleSimulator:
         result = {"damage": 0, "flinch": False, "status_inflicted": None}
 
         # Debug logging for move and damage
-        print(f"[DEBUG] {attacker.name} uses {move_name} on {defender.name}")
-        print(f"[DEBUG] Move data: {move}")
+        if self.debug:
+            print(f"[DEBUG] {attacker.name} uses {move_name} on {defender.name}")
+            print(f"[DEBUG] Move data: {move}")
 
         # Check accuracy
         accuracy = move.get("accuracy", 1.0)
@@ -412,7 +430,8 @@ class BattleSimulator:
                 "move": move_name,
                 "message": f"{attacker.name}'s {move_name} missed!"
             })
-            print(f"[DEBUG] {attacker.name}'s {move_name} missed!")
+            if self.debug:
+                print(f"[DEBUG] {attacker.name}'s {move_name} missed!")
             return result
 
         # Handle healing moves
@@ -428,12 +447,14 @@ class BattleSimulator:
                 "heal_amount": actual_heal,
                 "current_hp": attacker.hp
             })
-            print(f"[DEBUG] {attacker.name} healed for {actual_heal}, current HP: {attacker.hp}")
+            if self.debug:
+                print(f"[DEBUG] {attacker.name} healed for {actual_heal}, current HP: {attacker.hp}")
             return result
 
         # Calculate and apply damage
         damage = self.calculate_damage(attacker, defender, move_name)
-        print(f"[DEBUG] Calculated damage: {damage}")
+        if self.debug:
+            print(f"[DEBUG] Calculated damage: {damage}")
         if damage > 0:
             defender.hp = max(0, defender.hp - damage)
             result["damage"] = damage
@@ -459,7 +480,8 @@ class BattleSimulator:
                 "effectiveness": effectiveness,
                 "message": effectiveness_msg
             })
-            print(f"[DEBUG] {defender.name} took {damage} damage, remaining HP: {defender.hp}")
+            if self.debug:
+                print(f"[DEBUG] {defender.name} took {damage} damage, remaining HP: {defender.hp}")
         
         # Apply status effects (only if defender isn't fainted and doesn't have status)
         if defender.hp > 0 and not defender.status:
@@ -622,6 +644,13 @@ class BattleSimulator:
             "winner": self.get_winner()
         }
 
+    def load_battle_state(self, state: Dict[str, Any]):
+        """Restore a state saved with get_battle_state (current and max HP, status, turn count, history)."""
+        self.p1 = PokemonBattleState(**state["p1"])
+        self.p2 = PokemonBattleState(**state["p2"])
+        self.turn_count = state.get("turn_count", 0)
+        self.battle_history = list(state.get("battle_history", []))
+
     def get_valid_moves(self, pokemon: PokemonBattleState) -> List[str]:
         """Get list of valid moves for a Pokémon."""
         return [move for move in pokemon.available_moves if move in self.move_data]
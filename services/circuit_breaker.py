@@ -0,0 +1,98 @@
+"""
+Circuit breaker for upstream (PokéAPI) calls.
+
+After `failure_threshold` consecutive failures, where a call slower than
+`slow_call_seconds` also counts as one, the breaker opens. Calls are then
+refused with `CircuitOpenError` and callers serve stale data instead of
+waiting on a sick upstream. After `reset_timeout` seconds a single trial call
+is let through (half-open): success closes the breaker, failure re-opens it.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Upstream calls are suspended while the breaker is open."""
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, slow_call_seconds: float = 2.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.slow_call_seconds = slow_call_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trial = False
+        self.failures = 0  # consecutive
+        self.opened = self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream now; in half-open state only one trial call at a time."""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._clock() - self._opened_at >= self.reset_timeout and not self._trial:
+                self._state, self._trial = HALF_OPEN, True
+                return True
+            self.rejected += 1
+            return False
+
+    def record(self, ok: bool, seconds: float = 0.0):
+        """Outcome of an allowed call; a successful but slow call counts as a failure."""
+        ok = ok and seconds <= self.slow_call_seconds
+        with self._lock:
+            self._trial = False
+            if ok:
+                self._state, self.failures = CLOSED, 0
+                return
+            self.failures += 1
+            if self._state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self.opened += 1
+                self._state, self._opened_at = OPEN, self._clock()
+
+    async def call(self, fn: Callable[[], Any], failed: Optional[Callable[[Any], bool]] = None) -> Any:
+        """
+        Await `fn()` through the breaker; raises CircuitOpenError without calling
+        it while open. Exceptions, and results for which `failed` is true, count
+        as failures.
+        """
+        if not self.allow():
+            raise CircuitOpenError("Upstream circuit is open")
+        started = self._clock()
+        try:
+            result = await fn()
+        except Exception:
+            self.record(False)
+            raise
+        except BaseException:  # cancelled: only a verdict if it was already too slow
+            elapsed = self._clock() - started
+            if elapsed > self.slow_call_seconds:
+                self.record(False)
+            else:
+                with self._lock:
+                    self._trial = False
+            raise
+        self.record(not (failed and failed(result)), self._clock() - started)
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._state, self._trial = CLOSED, False
+            self.failures = self.opened = self.rejected = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"state": self.state, "failures": self.failures, "opened": self.opened, "rejected": self.rejected}
@@ -1,25 +1,187 @@
+import asyncio
+import threading
+import time
 import httpx
+import config
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
 from models.pokemon import PokemonInfo, EvolutionChain
+from services.circuit_breaker import OPEN, CircuitBreaker
+from services.evolution_cache import EvolutionNotFound, chain_id_from_url, evolution_cache, parse_chain
+from services.http_client import client_or_temporary
+from services.offline_dex import offline_dex
+from services.pokemon_cache import pokemon_cache, pokemon_record
+from services.single_flight import SingleFlight
 
-POKEAPI_BASE = "https://pokeapi.co/api/v2"
+# Identical concurrent upstream requests share one in-flight fetch, keyed by URL
+upstream_flights = SingleFlight()
+# Every upstream GET goes through one breaker, so a sick PokéAPI is detected once for all callers
+upstream_breaker = CircuitBreaker(failure_threshold=config.UPSTREAM_BREAKER_FAILURES,
+                                  reset_timeout=config.UPSTREAM_BREAKER_RESET_SECONDS,
+                                  slow_call_seconds=config.UPSTREAM_SLOW_CALL_SECONDS)
+# Background revalidations of stale Pokémon records, by name; referenced here until done
+revalidations: Dict[str, asyncio.Task] = {}
+revalidation_stats = {"started": 0, "refreshed": 0, "failed": 0, "skipped_open": 0}
+# Same for sync callers (models.pokemon.get_pokemon_data), on worker threads
+sync_revalidations: Dict[str, Future] = {}
+_sync_revalidation_lock = threading.Lock()
+_revalidation_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="pokemon-revalidate")
 
-async def fetch_pokemon_data(name: str) -> PokemonInfo | None:
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(f"{POKEAPI_BASE}/pokemon/{name.lower()}")
-        if resp.status_code != 200:
-            return None
-        data = resp.json()  # No await here
-        return PokemonInfo.from_pokeapi(data)
+async def upstream_get(url: str, client: httpx.AsyncClient | None = None) -> httpx.Response:
+    """GET through the circuit breaker: errors, 5xx and slow responses count against upstream."""
+    async def get():
+        async with client_or_temporary(client) as c:
+            return await c.get(url)
+    return await upstream_breaker.call(get, failed=lambda resp: resp.status_code >= 500)
+
+async def fetch_json(url: str, client: httpx.AsyncClient | None = None) -> Tuple[int, Any]:
+    """
+    (status code, decoded body or None) of a GET, coalesced with identical
+    requests in flight. In OFFLINE_MODE the offline dex bundle answers instead.
+    """
+    async def get():
+        if config.OFFLINE_MODE:
+            return await asyncio.to_thread(offline_dex.payload, url)
+        resp = await upstream_get(url, client)
+        return resp.status_code, resp.json() if resp.status_code == 200 else None
+    return await upstream_flights.do(url, get)
+
+async def fetch_pokemon_record(name: str, client: httpx.AsyncClient | None = None) -> dict | None:
+    """
+    Normalized Pokémon record (the offline dex bundle's in OFFLINE_MODE). A
+    fresh cached record is returned as is, a stale one (within
+    POKEMON_CACHE_MAX_STALE_SECONDS) too while it is revalidated in the
+    background; anything else is fetched from PokéAPI and cached. Raises
+    CircuitOpenError on a miss while upstream is considered down.
+    """
+    if config.OFFLINE_MODE:
+        return await asyncio.to_thread(offline_dex.pokemon, name)
+    record, fresh = await pokemon_cache.alookup(name)
+    if record is not None:
+        if not fresh:
+            revalidate(name, client)
+        return record
+    return await fetch_and_cache_record(name, client)
+
+def revalidate(name: str, client: httpx.AsyncClient | None = None):
+    """Refresh a stale record in a background task, at most one per name; skipped while the breaker is open."""
+    key = name.strip().lower()
+    if key in revalidations:
+        return
+    if upstream_breaker.state == OPEN:
+        revalidation_stats["skipped_open"] += 1
+        return
 
-async def fetch_species_data(name: str) -> EvolutionChain | None:
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(f"{POKEAPI_BASE}/pokemon-species/{name.lower()}")
+    async def refresh():
+        try:
+            ok = await fetch_and_cache_record(name, client) is not None
+        except Exception:  # CircuitOpenError, httpx errors: the stale record stays in place
+            ok = False
+        revalidation_stats["refreshed" if ok else "failed"] += 1
+
+    revalidation_stats["started"] += 1
+    task = asyncio.create_task(refresh())
+    revalidations[key] = task
+    task.add_done_callback(lambda _: revalidations.pop(key, None))
+
+async def fetch_and_cache_record(name: str, client: httpx.AsyncClient | None = None) -> dict | None:
+    """Fetch a Pokémon from PokéAPI and cache it; None if upstream has no such Pokémon."""
+    url = f"{config.POKEAPI_BASE_URL}/pokemon/{name.lower()}"
+
+    async def fetch_and_cache():
+        resp = await upstream_get(url, client)
         if resp.status_code != 200:
             return None
-        species = resp.json()  
-        evo_url = species["evolution_chain"]["url"]
-        evo_resp = await client.get(evo_url)
-        if evo_resp.status_code != 200:
-            return None
-        evo_data = evo_resp.json()  
-        return EvolutionChain.from_pokeapi(evo_data)
+        fetched = pokemon_record(resp.json())
+        await pokemon_cache.aput(fetched, alias=name)
+        return fetched
+    # Coalesced as a whole so concurrent misses also share the cache write
+    return await upstream_flights.do(url, fetch_and_cache)
+
+def fetch_and_cache_record_sync(name: str) -> Tuple[int, Optional[dict]]:
+    """
+    Sync fetch_and_cache_record on the lifespan's sync client (a temporary one
+    outside the app): (upstream status, cached record or None), status 503
+    when upstream is unreachable or the breaker is open.
+    """
+    import dependencies
+    from services.http_client import sync_client_or_temporary
+
+    if not upstream_breaker.allow():
+        return 503, None
+    url = f"{config.POKEAPI_BASE_URL}/pokemon/{name.lower()}"
+    started = time.monotonic()
+    try:
+        with sync_client_or_temporary(dependencies.sync_http_client) as client:
+            resp = client.get(url)
+    except httpx.HTTPError:
+        upstream_breaker.record(False)
+        return 503, None
+    upstream_breaker.record(resp.status_code < 500, time.monotonic() - started)
+    if resp.status_code != 200:
+        return resp.status_code, None
+    record = pokemon_record(resp.json())
+    pokemon_cache.put(record, alias=name)
+    return 200, record
+
+def revalidate_sync(name: str):
+    """revalidate for sync callers: the refresh runs on a worker thread, at most one per name."""
+    key = name.strip().lower()
+    with _sync_revalidation_lock:
+        if key in sync_revalidations:
+            return
+        if upstream_breaker.state == OPEN:
+            revalidation_stats["skipped_open"] += 1
+            return
+        revalidation_stats["started"] += 1
+
+        def refresh():
+            try:
+                ok = fetch_and_cache_record_sync(name)[1] is not None
+            except Exception:  # the stale record stays in place
+                ok = False
+            with _sync_revalidation_lock:
+                revalidation_stats["refreshed" if ok else "failed"] += 1
+                sync_revalidations.pop(key, None)
+
+        sync_revalidations[key] = _revalidation_pool.submit(refresh)
+
+async def fetch_pokemon_data(name: str, client: httpx.AsyncClient | None = None) -> PokemonInfo | None:
+    record = await fetch_pokemon_record(name, client)
+    return PokemonInfo.from_record(record) if record else None
+
+async def fetch_evolution(name: str, client: httpx.AsyncClient | None = None) -> dict | None:
+    """
+    Cached evolution chain entry of `name` ({"id", "chain", "parsed"}), or None
+    if the species has no chain. A family costs at most one chain request per
+    TTL; members indexed from a fetched chain also skip the species request.
+    Raises EvolutionNotFound on upstream 404s.
+    """
+    entry = evolution_cache.get(name)
+    if entry is not None:
+        return entry
+    status, species = await fetch_json(f"{config.POKEAPI_BASE_URL}/pokemon-species/{name.lower()}", client)
+    if status != 200:
+        raise EvolutionNotFound(f"Species not found for {name}")
+    evo_url = (species.get("evolution_chain") or {}).get("url")
+    if not evo_url:
+        return None
+    chain_id = chain_id_from_url(evo_url)
+    entry = evolution_cache.chain(chain_id) if chain_id is not None else None
+    if entry is None:
+        status, evo_data = await fetch_json(evo_url, client)
+        if status != 200:
+            raise EvolutionNotFound("Evolution chain not found")
+        if chain_id is None:  # unrecognized chain URL: usable, but not cacheable
+            chain = evo_data.get("chain", {})
+            return {"id": None, "chain": chain, "parsed": parse_chain(chain)}
+        entry = evolution_cache.put(chain_id, evo_data.get("chain", {}))
+    evolution_cache.index(name, chain_id)
+    return entry
+
+async def fetch_species_data(name: str, client: httpx.AsyncClient | None = None) -> EvolutionChain | None:
+    try:
+        entry = await fetch_evolution(name, client)
+    except EvolutionNotFound:
+        return None
+    return EvolutionChain(chain=entry["chain"]) if entry else None
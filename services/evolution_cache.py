@@ -0,0 +1,87 @@
+"""
+Evolution chain cache.
+
+Every member of a family shares one PokéAPI evolution chain, so chains are
+cached by chain id together with their parsed form, and a species -> chain id
+index lets any family member skip both the species and the chain request.
+When a chain is fetched, all of its members are indexed at once.
+"""
+import re
+from typing import Any, Dict, List, Optional
+
+import config
+from services.ttl_cache import TTLCache
+
+_CHAIN_ID = re.compile(r"/evolution-chain/(\d+)/?$")
+
+
+class EvolutionNotFound(LookupError):
+    """The species or its evolution chain does not exist upstream."""
+
+
+def chain_id_from_url(url: str) -> Optional[int]:
+    match = _CHAIN_ID.search(url)
+    return int(match.group(1)) if match else None
+
+def parse_chain(chain_node: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Flatten a PokéAPI chain into [{"species", "min_level", "trigger"}, ...] in evolution order."""
+    evo_list = []
+
+    evo_details_list = chain_node.get("evolution_details", [])
+    if evo_details_list and isinstance(evo_details_list, list):
+        details = evo_details_list[0]
+        min_level = details.get("min_level")
+        trigger = details.get("trigger", {}).get("name") if details.get("trigger") else None
+    else:
+        min_level = None
+        trigger = None
+
+    evo_list.append({
+        "species": chain_node["species"]["name"],
+        "min_level": min_level,
+        "trigger": trigger
+    })
+
+    for evo in chain_node.get("evolves_to", []):
+        evo_list.extend(parse_chain(evo))
+
+    return evo_list
+
+
+class EvolutionCache:
+    """
+    `chain_ids`: species name -> chain id. `chains`: chain id ->
+    {"id", "chain" (raw PokéAPI node), "parsed" (parse_chain output)}.
+    """
+    def __init__(self, maxsize: int = 1024, ttl: float = 86400.0):
+        self.chain_ids = TTLCache(maxsize=maxsize * 4, ttl=ttl)
+        self.chains = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, species: str) -> Optional[Dict[str, Any]]:
+        """The cached chain entry of `species`, if both the index and the chain are still fresh."""
+        chain_id = self.chain_ids.get(species.lower())
+        return None if chain_id is None else self.chains.get(chain_id)
+
+    def chain(self, chain_id: int) -> Optional[Dict[str, Any]]:
+        return self.chains.get(chain_id)
+
+    def index(self, species: str, chain_id: int):
+        self.chain_ids.set(species.lower(), chain_id)
+
+    def put(self, chain_id: int, chain: Dict[str, Any]) -> Dict[str, Any]:
+        """Parse and store `chain`, indexing every species in it."""
+        entry = {"id": chain_id, "chain": chain, "parsed": parse_chain(chain)}
+        self.chains.set(chain_id, entry)
+        for member in entry["parsed"]:
+            self.index(member["species"], chain_id)
+        return entry
+
+    def clear(self):
+        self.chain_ids.clear()
+        self.chains.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"species_index": self.chain_ids.stats(), "chains": self.chains.stats()}
+
+
+evolution_cache = EvolutionCache(maxsize=config.EVOLUTION_CACHE_SIZE, ttl=config.EVOLUTION_CACHE_TTL_SECONDS)
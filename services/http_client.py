@@ -0,0 +1,58 @@
+"""
+The pooled `httpx.AsyncClient` used for upstream (PokéAPI) requests, and its
+synchronous counterpart for sync code paths (models.pokemon.get_pokemon_data).
+
+`main.lifespan` creates one of each at startup and closes them at shutdown;
+routes receive the async one through `dependencies.get_http_client`. Fetch
+helpers take an optional client and fall back to a short-lived one when called
+outside the app (scripts, diagnostics).
+"""
+import importlib.util
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+
+import httpx
+
+import config
+
+
+def http2_available() -> bool:
+    """HTTP/2 needs the optional `h2` package (`pip install httpx[http2]`)."""
+    return importlib.util.find_spec("h2") is not None
+
+def _client_options() -> Dict[str, Any]:
+    return dict(
+        http2=config.HTTP2 and http2_available(),
+        limits=httpx.Limits(
+            max_connections=config.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=config.HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(config.HTTP_TIMEOUT, connect=config.HTTP_CONNECT_TIMEOUT),
+        headers={"User-Agent": "pokemon-battle-api"},
+    )
+
+def create_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(**_client_options())
+
+def create_sync_http_client() -> httpx.Client:
+    """Same limits and timeouts as the async client; httpx.Client is safe to share across threads."""
+    return httpx.Client(**_client_options())
+
+@asynccontextmanager
+async def client_or_temporary(client: Optional[httpx.AsyncClient] = None) -> AsyncIterator[httpx.AsyncClient]:
+    """Yield `client`, or a temporary client closed on exit when none is given."""
+    if client is not None:
+        yield client
+        return
+    async with create_http_client() as temporary:
+        yield temporary
+
+@contextmanager
+def sync_client_or_temporary(client: Optional[httpx.Client] = None) -> Iterator[httpx.Client]:
+    """Yield `client`, or a temporary sync client closed on exit when none is given."""
+    if client is not None:
+        yield client
+        return
+    with create_sync_http_client() as temporary:
+        yield temporary
@@ -0,0 +1,173 @@
+"""
+Local index of every Pokémon name, so /pokemon/index can list and search
+without downloading PokéAPI's full /pokemon list on each request.
+
+Names are kept in national dex order. Prefix search bisects an alphabetical
+copy; substring search intersects n-gram posting lists (every 1-, 2- and
+3-character substring of each name) and verifies the few candidates, so a
+query touches its matches rather than the whole dex.
+
+The index is persisted in the `pokemon_names` table, loaded at startup and
+refreshed from upstream in the background once older than
+NAME_INDEX_REFRESH_SECONDS.
+"""
+import asyncio
+import bisect
+import re
+from array import array
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.exc import SQLAlchemyError
+
+import config
+from database.models import PokemonName
+
+GRAM = 3
+MATCH_MODES = ("substring", "prefix")
+_DEX_ID = re.compile(r"/pokemon/(\d+)/?$")
+
+
+def _grams(name: str):
+    return {name[i:i + n] for n in range(1, GRAM + 1) for i in range(len(name) - n + 1)}
+
+
+class _Snapshot:
+    """Immutable index state; refreshes build a new one and swap it in."""
+    def __init__(self, entries: Iterable[Tuple[int, str]], refreshed_at: Optional[datetime]):
+        by_name = {name.lower(): dex_id for dex_id, name in entries}
+        pairs = sorted(((dex_id, name) for name, dex_id in by_name.items()))
+        self.ids = [dex_id for dex_id, _ in pairs]
+        self.names = [name for _, name in pairs]
+        self.alpha = sorted(range(len(self.names)), key=self.names.__getitem__)
+        self.alpha_names = [self.names[i] for i in self.alpha]
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for i, name in enumerate(self.names):
+            for gram in _grams(name):
+                postings[gram].append(i)  # appended in dex order, so every posting list is sorted
+        self.postings = {gram: array("I", ids) for gram, ids in postings.items()}
+        self.refreshed_at = refreshed_at
+
+
+class NameIndex:
+    def __init__(self, entries: Iterable[Tuple[int, str]] = (), refreshed_at: Optional[datetime] = None):
+        self._snapshot = _Snapshot(entries, refreshed_at)
+
+    def __len__(self) -> int:
+        return len(self._snapshot.names)
+
+    @property
+    def ready(self) -> bool:
+        return len(self) > 0
+
+    @property
+    def refreshed_at(self) -> Optional[datetime]:
+        return self._snapshot.refreshed_at
+
+    def age(self) -> float:
+        """Seconds since the last refresh (infinite for an empty index)."""
+        refreshed_at = self.refreshed_at
+        if not self.ready or refreshed_at is None:
+            return float("inf")
+        if refreshed_at.tzinfo is None:  # SQLite drops the timezone
+            refreshed_at = refreshed_at.replace(tzinfo=timezone.utc)
+        return (datetime.now(timezone.utc) - refreshed_at).total_seconds()
+
+    def replace(self, entries: Iterable[Tuple[int, str]], refreshed_at: Optional[datetime] = None):
+        self._snapshot = _Snapshot(entries, refreshed_at or datetime.now(timezone.utc))
+
+    def entries(self) -> List[Tuple[int, str]]:
+        snap = self._snapshot
+        return list(zip(snap.ids, snap.names))
+
+    def search(self, query: Optional[str] = None, match: str = "substring") -> List[str]:
+        """Names matching `query` (all names without one), in dex order."""
+        snap = self._snapshot
+        query = (query or "").strip().lower()
+        if not query:
+            return list(snap.names)
+        if match == "prefix":
+            lo = bisect.bisect_left(snap.alpha_names, query)
+            hi = bisect.bisect_left(snap.alpha_names, query + "\uffff", lo)
+            return [snap.names[i] for i in sorted(snap.alpha[lo:hi])]
+        if match != "substring":
+            raise ValueError(f"Unknown match mode '{match}', expected one of {MATCH_MODES}")
+        if len(query) <= GRAM:
+            return [snap.names[i] for i in snap.postings.get(query, ())]
+        lists = sorted((snap.postings.get(query[i:i + GRAM], ()) for i in range(len(query) - GRAM + 1)), key=len)
+        if not lists[0]:
+            return []
+        candidates = set(lists[0])
+        for posting in lists[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return []
+        return [snap.names[i] for i in sorted(candidates) if query in snap.names[i]]
+
+    # -- persistence -------------------------------------------------------
+
+    def load(self, session_factory: Callable[[], Any]) -> int:
+        """Replace the index with the `pokemon_names` table; returns the number of names."""
+        try:
+            with session_factory() as db:
+                rows = db.query(PokemonName.id, PokemonName.name, PokemonName.refreshed_at).all()
+        except SQLAlchemyError as e:
+            print(f"Name index load failed: {getattr(e, 'orig', None) or e}")
+            return 0
+        if rows:
+            self._snapshot = _Snapshot(((r.id, r.name) for r in rows), min(r.refreshed_at for r in rows))
+        return len(rows)
+
+    def save(self, session_factory: Callable[[], Any]):
+        refreshed_at = self.refreshed_at or datetime.now(timezone.utc)
+        try:
+            with session_factory() as db:
+                db.query(PokemonName).delete()
+                db.bulk_save_objects([PokemonName(id=dex_id, name=name, refreshed_at=refreshed_at)
+                                      for dex_id, name in self.entries()])
+                db.commit()
+        except SQLAlchemyError as e:
+            print(f"Name index save failed: {getattr(e, 'orig', None) or e}")
+
+
+def dex_entries(results: Iterable[Dict[str, Any]]) -> List[Tuple[int, str]]:
+    """(dex id, name) pairs from PokéAPI /pokemon list results; ids come from the result URLs."""
+    entries = []
+    for position, result in enumerate(results, start=1):
+        match = _DEX_ID.search(result.get("url", ""))
+        entries.append((int(match.group(1)) if match else position, result["name"]))
+    return entries
+
+async def refresh_name_index(index: NameIndex, client=None, session_factory: Optional[Callable[[], Any]] = None) -> bool:
+    """Rebuild `index` from PokéAPI's full list and persist it; False if upstream failed."""
+    from services.data_fetcher import fetch_json
+
+    status, data = await fetch_json(f"{config.POKEAPI_BASE_URL}/pokemon?limit=100000", client)
+    if status != 200 or not data or not data.get("results"):
+        return False
+    entries = dex_entries(data["results"])
+    await asyncio.to_thread(index.replace, entries)
+    if session_factory is not None:
+        await asyncio.to_thread(index.save, session_factory)
+    return True
+
+async def keep_name_index_fresh(index: NameIndex, client=None, session_factory: Optional[Callable[[], Any]] = None):
+    """Background task: refresh whenever the index is older than NAME_INDEX_REFRESH_SECONDS."""
+    while True:
+        delay = config.NAME_INDEX_REFRESH_SECONDS - index.age()
+        if delay <= 0:
+            delay = config.NAME_INDEX_REFRESH_SECONDS
+            try:
+                ok = await refresh_name_index(index, client, session_factory)
+            except Exception as e:  # keep the task alive through upstream / network errors
+                print(f"Name index refresh failed: {e}")
+                ok = False
+            if ok:
+                print(f"Name index refreshed: {len(index)} Pokémon.")
+            else:
+                delay = config.NAME_INDEX_RETRY_SECONDS
+        await asyncio.sleep(delay)
+
+
+name_index = NameIndex()
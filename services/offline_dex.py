@@ -0,0 +1,121 @@
+"""
+Read side of the offline dex bundle (database/import_dex.py).
+
+With config.OFFLINE_MODE set the app makes no PokéAPI request: Pokémon records
+come from `OfflineDex.pokemon`, and `fetch_json` answers PokéAPI URLs with
+`OfflineDex.payload`, built from the dex_* tables in the shape PokéAPI returns
+(trimmed to the fields the app reads), so the name, type and evolution indexes
+fill from the bundle unchanged. Anything not in the bundle is a 404.
+"""
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import config
+from database.models import DexEvolutionChain, DexMove, DexPokemon, DexPokemonType, DexSpecies, DexType
+
+Record = Dict[str, Any]
+
+
+class OfflineDex:
+    def __init__(self, session_factory: Optional[Callable[[], Any]] = None):
+        self._session_factory = session_factory
+
+    @property
+    def session_factory(self) -> Callable[[], Any]:
+        if self._session_factory is None:
+            from database.database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory
+
+    @session_factory.setter
+    def session_factory(self, factory: Callable[[], Any]):
+        self._session_factory = factory
+
+    def _url(self, kind: str, key: Any) -> str:
+        return f"{config.POKEAPI_BASE_URL}/{kind}/{key}/"
+
+    def pokemon(self, name: str) -> Optional[Record]:
+        """Normalized record (services/pokemon_cache.py shape) by name or dex id."""
+        key = str(name).lower()
+        with self.session_factory() as db:
+            column = DexPokemon.id if key.isdigit() else DexPokemon.name
+            row = db.query(DexPokemon).filter(column == (int(key) if key.isdigit() else key)).first()
+        if row is None:
+            return None
+        return {"name": row.name, "types": json.loads(row.types), "abilities": json.loads(row.abilities),
+                "stats": json.loads(row.stats), "moves": json.loads(row.moves)}
+
+    def names(self) -> List[Tuple[int, str]]:
+        """(dex id, name) of every Pokémon in the bundle, in dex order."""
+        with self.session_factory() as db:
+            return [(r.id, r.name) for r in db.query(DexPokemon.id, DexPokemon.name).order_by(DexPokemon.id)]
+
+    def type_members(self, type_name: str) -> Optional[List[Tuple[int, str]]]:
+        """(dex id, name) of the Pokémon of a type, or None if the bundle has no such type."""
+        with self.session_factory() as db:
+            rows = (db.query(DexPokemon.id, DexPokemon.name)
+                    .join(DexPokemonType, DexPokemonType.pokemon_id == DexPokemon.id)
+                    .filter(DexPokemonType.type == type_name).order_by(DexPokemon.id).all())
+            if not rows and db.query(DexType.id).filter(DexType.name == type_name).first() is None:
+                return None
+        return [(r.id, r.name) for r in rows]
+
+    def move(self, name: str) -> Optional[Dict[str, Any]]:
+        with self.session_factory() as db:
+            row = db.query(DexMove).filter(DexMove.name == name.lower().replace(" ", "-")).first()
+        if row is None:
+            return None
+        return {"name": row.name, "type": row.type, "power": row.power, "accuracy": row.accuracy,
+                "pp": row.pp, "damage_class": row.damage_class}
+
+    def payload(self, url: str) -> Tuple[int, Any]:
+        """(status, PokéAPI-shaped body) for a PokéAPI URL, like `fetch_json` upstream."""
+        parsed = urlparse(url)
+        parts = [p for p in parsed.path[len(urlparse(config.POKEAPI_BASE_URL).path):].split("/") if p]
+        if parts == ["pokemon"]:
+            limit = int(parse_qs(parsed.query).get("limit", ["20"])[0])
+            names = self.names()
+            return 200, {"count": len(names), "results": [
+                {"name": name, "url": self._url("pokemon", dex_id)} for dex_id, name in names[:limit]]}
+        if len(parts) != 2:
+            return 404, None
+        kind, key = parts[0], parts[1].lower()
+        body = None
+        if kind == "pokemon":
+            record = self.pokemon(key)
+            if record is not None:  # back to PokéAPI's nesting, so pokemon_record() round-trips it
+                body = {"name": record["name"],
+                        "types": [{"slot": i + 1, "type": {"name": t}} for i, t in enumerate(record["types"])],
+                        "abilities": [{"ability": {"name": a}} for a in record["abilities"]],
+                        "stats": [{"stat": {"name": s}, "base_stat": v} for s, v in record["stats"].items()],
+                        "moves": [{"move": {"name": m}} for m in record["moves"]]}
+        elif kind == "pokemon-species":
+            with self.session_factory() as db:
+                row = db.query(DexSpecies).filter(DexSpecies.name == key).first()
+            if row is not None:
+                chain_url = self._url("evolution-chain", row.evolution_chain_id) if row.evolution_chain_id else None
+                body = {"id": row.id, "name": row.name, "evolution_chain": {"url": chain_url} if chain_url else None}
+        elif kind == "evolution-chain" and key.isdigit():
+            with self.session_factory() as db:
+                row = db.get(DexEvolutionChain, int(key))
+            if row is not None:
+                body = {"id": row.id, "chain": json.loads(row.chain)}
+        elif kind == "type":
+            members = self.type_members(key)
+            if members is not None:
+                body = {"name": key, "pokemon": [
+                    {"pokemon": {"name": name, "url": self._url("pokemon", dex_id)}} for dex_id, name in members]}
+        elif kind == "move":
+            move = self.move(key)
+            if move is not None:
+                body = {**move, "type": {"name": move["type"]}, "damage_class": {"name": move["damage_class"]}}
+        return (200, body) if body is not None else (404, None)
+
+    def counts(self) -> Dict[str, int]:
+        with self.session_factory() as db:
+            return {model.__tablename__: db.query(model).count()
+                    for model in (DexPokemon, DexSpecies, DexEvolutionChain, DexType, DexMove)}
+
+
+offline_dex = OfflineDex()
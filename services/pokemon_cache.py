@@ -0,0 +1,194 @@
+"""
+Two-tier cache for PokéAPI Pokémon data.
+
+Lookups go to an in-process `TTLCache` first and then to the SQLite
+`pokemon_cache` table, whose rows are valid for `ttl` seconds after their
+`cached_at`. A database hit is promoted to memory; a miss in both tiers is
+left to the caller, which fetches upstream and stores the result with `put`.
+
+For stale-while-revalidate, `lookup` also returns records up to `max_stale`
+seconds past their TTL, flagged as not fresh: the caller serves them and
+refreshes in the background (services/data_fetcher.py). Older records are
+misses, however unhealthy upstream is.
+
+Entries are normalized records, the shape /pokemon/index returns:
+    {"name": str, "types": [...], "abilities": [...], "stats": {...}, "moves": [...]}
+"""
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+import config
+from database.models import Pokemon
+from services.ttl_cache import TTLCache
+
+Record = Dict[str, Any]
+
+
+def pokemon_record(data: Dict[str, Any]) -> Record:
+    """Normalize a raw PokéAPI /pokemon/{name} payload."""
+    return {
+        "name": data["name"],
+        "types": [t["type"]["name"] for t in data["types"]],
+        "abilities": [a["ability"]["name"] for a in data["abilities"]],
+        "stats": {s["stat"]["name"]: s["base_stat"] for s in data["stats"]},
+        "moves": [m["move"]["name"] for m in data["moves"]],
+    }
+
+
+class PokemonCache:
+    def __init__(self, maxsize: int = 2048, ttl: float = 86400.0, max_stale: float = 0.0,
+                 session_factory: Optional[Callable[[], Any]] = None, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._clock = clock
+        # Memory entries are (fresh until, record), kept for ttl + max_stale
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl + max_stale, clock=clock)
+        self._session_factory = session_factory
+        self.db_hits = self.misses = self.db_errors = self.stale_hits = 0
+
+    @property
+    def session_factory(self) -> Callable[[], Any]:
+        if self._session_factory is None:
+            from database.database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory
+
+    @session_factory.setter
+    def session_factory(self, factory: Callable[[], Any]):
+        self._session_factory = factory
+
+    def get(self, name: str) -> Optional[Record]:
+        """A fresh record, or None."""
+        record, fresh = self.lookup(name)
+        return record if fresh else None
+
+    def lookup(self, name: str) -> Tuple[Optional[Record], bool]:
+        """(record, fresh): fresh, stale by at most `max_stale` seconds (fresh False), or (None, False)."""
+        key = name.strip().lower()
+        entry = self.memory.get(key)
+        return self._freshness(entry if entry is not None else self._get_db(key))
+
+    def put(self, record: Record, alias: Optional[str] = None):
+        """Store `record` in both tiers, also under `alias` (e.g. the id or spelling it was requested by)."""
+        self._put_memory(record, alias)
+        self._store(record)
+
+    async def aget(self, name: str) -> Optional[Record]:
+        """`get` for async callers."""
+        record, fresh = await self.alookup(name)
+        return record if fresh else None
+
+    async def alookup(self, name: str) -> Tuple[Optional[Record], bool]:
+        """`lookup` for async callers: memory hits inline, the database tier in a worker thread."""
+        key = name.strip().lower()
+        entry = self.memory.get(key)
+        return self._freshness(entry if entry is not None else await asyncio.to_thread(self._get_db, key))
+
+    async def aput(self, record: Record, alias: Optional[str] = None):
+        """`put` for async callers; the database write runs in a worker thread."""
+        self._put_memory(record, alias)
+        await asyncio.to_thread(self._store, record)
+
+    def clear(self):
+        """Empty the memory tier and reset the counters (database rows are left to expire)."""
+        self.memory.clear()
+        self.db_hits = self.misses = self.db_errors = self.stale_hits = 0
+
+    def stats(self) -> Dict[str, Any]:
+        memory = self.memory.stats()
+        lookups = memory["hits"] + self.db_hits + self.misses
+        return {
+            "memory": memory,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "db_errors": self.db_errors,
+            "stale_hits": self.stale_hits,
+            "hit_rate": (memory["hits"] + self.db_hits) / lookups if lookups else 0.0,
+        }
+
+    def _freshness(self, entry: Optional[Tuple[float, Record]]) -> Tuple[Optional[Record], bool]:
+        if entry is None:
+            return None, False
+        fresh_until, record = entry
+        if self._clock() < fresh_until:
+            return record, True
+        if self._clock() - fresh_until > self.max_stale:  # max_stale lowered since it was stored
+            return None, False
+        self.stale_hits += 1
+        return record, False
+
+    def _get_db(self, key: str) -> Optional[Tuple[float, Record]]:
+        loaded = self._load(key)
+        if loaded is None:
+            self.misses += 1
+            return None
+        record, age = loaded
+        self.db_hits += 1
+        entry = (self._clock() + self.ttl - age, record)
+        self.memory.set(key, entry, ttl=self.ttl + self.max_stale - age)
+        return entry
+
+    def _put_memory(self, record: Record, alias: Optional[str]):
+        entry = (self._clock() + self.ttl, record)
+        self.memory.set(record["name"], entry, ttl=self.ttl + self.max_stale)
+        if alias and alias.strip().lower() != record["name"]:
+            self.memory.set(alias.strip().lower(), entry, ttl=self.ttl + self.max_stale)
+
+    def _load(self, name: str) -> Optional[Tuple[Record, float]]:
+        """(record, age in seconds) of a stored row no older than ttl + max_stale."""
+        try:
+            with self.session_factory() as db:
+                row = db.query(Pokemon).filter(Pokemon.name == name).first()
+        except SQLAlchemyError as e:
+            self.db_errors += 1
+            print(f"Pokémon cache read failed: {getattr(e, 'orig', None) or e}")
+            return None
+        if row is None or row.cached_at is None:
+            return None
+        cached_at = row.cached_at
+        if cached_at.tzinfo is None:  # SQLite drops the timezone
+            cached_at = cached_at.replace(tzinfo=timezone.utc)
+        age = (datetime.now(timezone.utc) - cached_at).total_seconds()
+        if age > self.ttl + self.max_stale:
+            return None
+        return {
+            "name": row.name,
+            "types": json.loads(row.types),
+            "abilities": json.loads(row.abilities),
+            "stats": json.loads(row.stats),
+            "moves": json.loads(row.moves),
+        }, age
+
+    def _store(self, record: Record):
+        fields = {
+            "types": json.dumps(record["types"]),
+            "abilities": json.dumps(record["abilities"]),
+            "stats": json.dumps(record["stats"]),
+            "moves": json.dumps(record["moves"]),
+            "cached_at": datetime.now(timezone.utc),
+        }
+        try:
+            with self.session_factory() as db:
+                row = db.query(Pokemon).filter(Pokemon.name == record["name"]).first()
+                if row is None:
+                    db.add(Pokemon(name=record["name"], **fields))
+                else:
+                    for column, value in fields.items():
+                        setattr(row, column, value)
+                try:
+                    db.commit()
+                except IntegrityError:
+                    db.rollback()  # a concurrent request stored the same Pokémon first
+        except SQLAlchemyError as e:
+            self.db_errors += 1
+            print(f"Pokémon cache write failed: {getattr(e, 'orig', None) or e}")
+
+
+# Shared by every fetch path (services/data_fetcher.py, models/pokemon.py, api/pokemon.py)
+pokemon_cache = PokemonCache(maxsize=config.POKEMON_CACHE_SIZE, ttl=config.POKEMON_CACHE_TTL_SECONDS,
+                             max_stale=config.POKEMON_CACHE_MAX_STALE_SECONDS)
@@ -0,0 +1,169 @@
+"""
+Head-to-head evaluation of move-selection policies.
+
+For every (policy A, policy B, matchup) job, M seeded battles are played
+across a process pool, half with A on the matchup's P1 side and half on P2.
+The report gives A's win rate with a Wilson confidence interval, the draw
+rate, average battle length and each policy's per-decision latency.
+
+Policies are named by spec strings so they can be rebuilt inside workers:
+
+    random                 uniform random legal move
+    heuristic              choose_ai_move_epsilon_greedy with epsilon=0
+    qtable[:path]          greedy QLearningAgent (default qtable.pkl)
+    dqn[:path]             greedy DQNAgent (default dqn.pt)
+    frozen:path            FrozenPolicy snapshot (.npz from ai.league or ai.policy_table)
+    blend:W[:path]         /play's HEURISTIC_WEIGHT=W blend of heuristic and qtable
+"""
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ai.league import play_matches
+
+Matchup = Tuple[Dict[str, Any], Dict[str, Any]]
+
+_policy_cache: Dict[str, Any] = {}
+
+
+class TimedPolicy:
+    """Wraps a policy and records the wall time of every decision it makes."""
+    def __init__(self, policy):
+        self.policy = policy
+        self.name = getattr(policy, "name", "policy")
+        self.decision_seconds: List[float] = []
+
+    def act_batch(self, simulators, side: str) -> List[str]:
+        started = time.perf_counter()
+        moves = self.policy.act_batch(simulators, side)
+        per_decision = (time.perf_counter() - started) / max(1, len(simulators))
+        self.decision_seconds.extend([per_decision] * len(simulators))
+        return moves
+
+
+def build_policy(spec: str):
+    """Instantiate a policy from its spec string (see module docstring)."""
+    from ai.policies import AgentPolicy, BlendPolicy, FrozenPolicy, HeuristicPolicy, RandomPolicy
+
+    kind, _, arg = spec.partition(":")
+    if kind == "random":
+        return RandomPolicy()
+    if kind == "heuristic":
+        return HeuristicPolicy()
+    if kind == "qtable":
+        from ai.rl_agent import load_agent
+        return AgentPolicy(load_agent(arg or "qtable.pkl", actions=[]), name=spec)
+    if kind == "dqn":
+        from ai.dqn_agent import DQNAgent
+        return AgentPolicy(DQNAgent.load(arg or "dqn.pt", epsilon=0.0), name=spec)
+    if kind == "frozen":
+        return FrozenPolicy.load(arg)
+    if kind == "blend":
+        weight, _, path = arg.partition(":")
+        return BlendPolicy(build_policy(f"qtable:{path}" if path else "qtable"), float(weight), name=spec)
+    raise ValueError(f"Unknown policy spec '{spec}'")
+
+def _cached_policy(spec: str):
+    # Agents are loaded once per worker process, not once per job
+    if spec not in _policy_cache:
+        _policy_cache[spec] = build_policy(spec)
+    return _policy_cache[spec]
+
+def wilson_interval(wins: int, n: int, z: float = 1.96) -> Tuple[float, float]:
+    """Wilson score interval for a binomial proportion (z=1.96 -> 95%)."""
+    if n == 0:
+        return 0.0, 1.0
+    p = wins / n
+    denom = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+def _run_job(spec_a: str, spec_b: str, matchup: Matchup, battles: int, seed: int,
+             batch: int, max_turns: int) -> Dict[str, Any]:
+    """Worker entry point: `battles` battles of A vs B on one matchup, `batch` stepped in lockstep."""
+    random.seed(seed)
+    np.random.seed(seed)
+    a, b = TimedPolicy(_cached_policy(spec_a)), TimedPolicy(_cached_policy(spec_b))
+    p1, p2 = matchup
+    wins = losses = draws = 0
+    turns = 0.0
+    # Half the battles with A as P1 and half with A as P2, whatever `batch` is
+    for first, second, side_battles in ((a, b, battles // 2), (b, a, battles - battles // 2)):
+        for start in range(0, side_battles, batch):
+            n = min(batch, side_battles - start)
+            r = play_matches(first, second, p1, p2, n, max_turns)
+            if first is a:
+                wins, losses = wins + r["wins"], losses + r["losses"]
+            else:
+                wins, losses = wins + r["losses"], losses + r["wins"]
+            draws += r["draws"]
+            turns += r["avg_turns"] * n
+    return {
+        "policy_a": spec_a, "policy_b": spec_b,
+        "matchup": f"{p1['name']}_vs_{p2['name']}",
+        "battles": battles, "wins": wins, "losses": losses, "draws": draws, "turns": turns,
+        "latency": {spec_a: a.decision_seconds, spec_b: b.decision_seconds},
+    }
+
+def evaluate_policies(specs: Sequence[str], matchups: Sequence[Matchup], battles: int = 100,
+                      workers: int = 1, seed: int = 0, batch: int = 1, max_turns: int = 100,
+                      pairs: Optional[Sequence[Tuple[str, str]]] = None) -> Dict[str, Any]:
+    """
+    Evaluate every ordered pair of distinct `specs` (or just `pairs`) on every matchup.
+    Job i is seeded with `seed + i`, so reruns with the same arguments replay the same battles.
+    `batch=1` measures serving latency (one decision per call); larger values measure batched cost.
+    """
+    if pairs is None:
+        pairs = [(a, b) for i, a in enumerate(specs) for b in specs[i + 1:]]
+    jobs = [(a, b, m, battles, seed + i, batch, max_turns)
+            for i, ((a, b), m) in enumerate((pair, m) for pair in pairs for m in matchups)]
+
+    if workers <= 1:
+        results = [_run_job(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_run_job, *zip(*jobs)))
+    return summarize(results)
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Per (A, B, matchup) rows, per (A, B) totals over all matchups, and per-policy latency."""
+    def row(group: List[Dict[str, Any]], **keys) -> Dict[str, Any]:
+        n = sum(r["battles"] for r in group)
+        wins = sum(r["wins"] for r in group)
+        low, high = wilson_interval(wins, n)
+        return {
+            **keys,
+            "battles": n,
+            "win_rate": wins / n if n else 0.0,
+            "ci95": [low, high],
+            "draw_rate": sum(r["draws"] for r in group) / n if n else 0.0,
+            "avg_turns": sum(r["turns"] for r in group) / n if n else 0.0,
+        }
+
+    by_pair: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    latencies: Dict[str, List[float]] = {}
+    for r in results:
+        by_pair.setdefault((r["policy_a"], r["policy_b"]), []).append(r)
+        for spec, samples in r["latency"].items():
+            latencies.setdefault(spec, []).extend(samples)
+
+    latency = {}
+    for spec, samples in latencies.items():
+        us = np.asarray(samples) * 1e6
+        latency[spec] = {
+            "decisions": int(us.size),
+            "mean_us": float(us.mean()) if us.size else 0.0,
+            "p50_us": float(np.percentile(us, 50)) if us.size else 0.0,
+            "p95_us": float(np.percentile(us, 95)) if us.size else 0.0,
+        }
+
+    return {
+        "matchups": [row([r], policy_a=r["policy_a"], policy_b=r["policy_b"], matchup=r["matchup"]) for r in results],
+        "pairs": [row(group, policy_a=a, policy_b=b) for (a, b), group in by_pair.items()],
+        "latency": latency,
+    }
@@ -0,0 +1,63 @@
+"""
+Request coalescing for async fetches ("single flight").
+
+Concurrent `SingleFlight.do(key, fn)` calls with the same key share one
+execution of `fn`: the first caller starts it as a task, later callers await
+that task. The result, or the exception, is delivered to every waiter and the
+key is forgotten once the task finishes, so the next call runs `fn` again.
+
+Cancelling one waiter only cancels its wait. The shared task is cancelled
+when its last waiter goes away.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Task[Any]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.leaders = self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        flight = self._flights.get(key)
+        if flight is None or flight.task.done():
+            task = asyncio.ensure_future(fn())
+            flight = self._flights[key] = _Flight(task)
+            task.add_done_callback(lambda t, key=key: self._finished(key, t))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # The last waiter left: stop the shared work, and let the next caller start afresh
+                flight.task.cancel()
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            raise
+
+    def _finished(self, key: Hashable, task: "asyncio.Task[Any]"):
+        flight = self._flights.get(key)
+        if flight is not None and flight.task is task:
+            del self._flights[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here so an error nobody awaited is not reported as unhandled
+
+    def stats(self) -> Dict[str, int]:
+        return {"in_flight": len(self._flights), "leaders": self.leaders, "coalesced": self.coalesced}
@@ -0,0 +1,115 @@
+"""
+Type membership index for type-filtered /pokemon/index listings.
+
+Each type's members are fetched from PokéAPI once per TTL and kept as a sorted
+array of dex ids plus a bitmap (a Python int with bit `id` set), so a single
+type is served from the array and two-type queries (fire AND flying) are a
+bitwise AND of the bitmaps. No Pokémon has more than MAX_TYPES_PER_POKEMON
+types, so a query naming more distinct types is rejected (TooManyTypes)
+before any of them is fetched.
+"""
+import asyncio
+import re
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import config
+from services.ttl_cache import TTLCache
+
+_DEX_ID = re.compile(r"/pokemon/(\d+)/?$")
+_UNNUMBERED = 1 << 20  # ids handed out to members whose URL carries none, after every real dex id
+MAX_TYPES_PER_POKEMON = 2
+
+
+class TypeNotFound(LookupError):
+    """The type does not exist upstream."""
+
+
+class TooManyTypes(ValueError):
+    """More distinct types than any Pokémon has."""
+
+
+def _bits_to_ids(bits: int) -> List[int]:
+    """Set bit positions in ascending order; one pass over the binary digits, not one per set bit."""
+    digits = bin(bits)[:1:-1]  # least significant bit first
+    ids, i = [], digits.find("1")
+    while i != -1:
+        ids.append(i)
+        i = digits.find("1", i + 1)
+    return ids
+
+
+class TypeIndex:
+    """
+    `types`: type name -> {"ids" (sorted array of dex ids), "bits" (bitmap)}.
+    Names are interned once per Pokémon in `names` (dex id -> name).
+    """
+    def __init__(self, maxsize: int = 64, ttl: float = 86400.0):
+        self.types = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.names: Dict[int, str] = {}
+        self._ids: Dict[str, int] = {}
+
+    def _dex_id(self, name: str, url: str) -> int:
+        match = _DEX_ID.search(url)
+        dex_id = int(match.group(1)) if match else self._ids.get(name)
+        if dex_id is None:
+            dex_id = _UNNUMBERED + len(self._ids)
+        self._ids[name] = dex_id
+        self.names[dex_id] = name
+        return dex_id
+
+    def put(self, type_name: str, members: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """Index a type from its PokéAPI `pokemon` list ([{"pokemon": {"name", "url"}}, ...])."""
+        ids = sorted({self._dex_id(m["pokemon"]["name"], m["pokemon"].get("url", "")) for m in members})
+        bits = 0
+        for dex_id in ids:
+            bits |= 1 << dex_id
+        entry = {"ids": array("I", ids), "bits": bits}
+        self.types.set(type_name.lower(), entry)
+        return entry
+
+    def get(self, type_name: str) -> Optional[Dict[str, Any]]:
+        return self.types.get(type_name.lower())
+
+    def members(self, entries: Sequence[Dict[str, Any]]) -> List[str]:
+        """Names of the Pokémon in every one of `entries`, in dex order."""
+        if len(entries) == 1:
+            ids = entries[0]["ids"]
+        else:
+            bits = entries[0]["bits"]
+            for entry in entries[1:]:
+                bits &= entry["bits"]
+            ids = _bits_to_ids(bits)
+        return [self.names[dex_id] for dex_id in ids]
+
+    def clear(self):
+        self.types.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.types.stats(), "pokemon": len(self.names)}
+
+
+async def fetch_type_members(type_names: Sequence[str], client=None) -> List[str]:
+    """
+    Names of the Pokémon having all of `type_names`, in dex order. Only types
+    missing from the index are fetched, concurrently and coalesced with
+    identical requests in flight. Raises TooManyTypes, before any request,
+    for more than MAX_TYPES_PER_POKEMON distinct types, and TypeNotFound on an
+    upstream 404.
+    """
+    from services.data_fetcher import fetch_json
+
+    type_names = list(dict.fromkeys(t.lower() for t in type_names))
+    if len(type_names) > MAX_TYPES_PER_POKEMON:
+        raise TooManyTypes(f"At most {MAX_TYPES_PER_POKEMON} types can be combined, got {len(type_names)}")
+    entries = {t: type_index.get(t) for t in type_names}
+    missing = [t for t, entry in entries.items() if entry is None]
+    replies = await asyncio.gather(*(fetch_json(f"{config.POKEAPI_BASE_URL}/type/{t}", client) for t in missing))
+    for type_name, (status, data) in zip(missing, replies):
+        if status != 200:
+            raise TypeNotFound(f"Type '{type_name}' not found")
+        entries[type_name] = type_index.put(type_name, data.get("pokemon", []))
+    return type_index.members(list(entries.values()))
+
+
+type_index = TypeIndex(ttl=config.TYPE_INDEX_TTL_SECONDS)
@@ -0,0 +1,128 @@
+"""
+Startup warm-up, so the first battles after a deploy run at steady-state speed.
+
+Run from main.lifespan (in the background unless WARMUP_BACKGROUND is off):
+
+  - engine     the battle simulator's type chart and move database
+               (services/battle_simulator.py) are built once, off the event loop
+  - pokemon    hot Pokémon are loaded into the Pokémon cache, WARMUP_CONCURRENCY
+               at a time: the AI roster (AI_POKEMON_POOL), WARMUP_POKEMON and the
+               WARMUP_TOP_BATTLED most-battled Pokémon of the battles table
+
+The agent artifacts are loaded by the lifespan itself and timed as the `agent`
+step. /health reports `warming_up` (HTTP 503) until the warm-up is done, or
+WARMUP_TIMEOUT_SECONDS have passed; a Pokémon that fails to load is counted
+and left to the first request that needs it.
+"""
+import asyncio
+import json
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+
+import config
+from database.models import Battle
+
+
+def _battle_names(value: Optional[str]) -> List[str]:
+    """Pokémon names in a battles.player_pokemon / ai_pokemon JSON column (a name, an info dict or a list of them)."""
+    try:
+        data = json.loads(value) if value else None
+    except (TypeError, ValueError):
+        return []
+    items = data if isinstance(data, list) else [data]
+    names = [item.get("name") if isinstance(item, dict) else item for item in items]
+    return [name.lower() for name in names if isinstance(name, str) and name]
+
+def most_battled(session_factory: Callable[[], Any], top_n: int, scan: int) -> List[str]:
+    """The `top_n` Pokémon appearing most often in the `scan` most recent battles."""
+    if top_n <= 0:
+        return []
+    counts = Counter()
+    try:
+        with session_factory() as db:
+            rows = (db.query(Battle.player_pokemon, Battle.ai_pokemon)
+                    .order_by(Battle.created_at.desc()).limit(scan))
+            for player, ai in rows:
+                counts.update(_battle_names(player) + _battle_names(ai))
+    except SQLAlchemyError as e:
+        print(f"Warm-up could not read battles: {getattr(e, 'orig', None) or e}")
+        return []
+    return [name for name, _ in counts.most_common(top_n)]
+
+def hot_pokemon(session_factory: Callable[[], Any]) -> List[str]:
+    """Names to preload, in priority order and without duplicates."""
+    from api.play import AI_POKEMON_POOL
+
+    names = [p["name"].lower() for p in AI_POKEMON_POOL] + list(config.WARMUP_POKEMON)
+    names += most_battled(session_factory, config.WARMUP_TOP_BATTLED, config.WARMUP_BATTLE_SCAN)
+    return list(dict.fromkeys(names))
+
+
+class WarmUp:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.ready = False
+        self.timed_out = False
+        self.steps: Dict[str, float] = {}  # step -> seconds
+        self.pokemon = {"total": 0, "loaded": 0, "failed": 0}
+
+    def mark_ready(self):
+        self.ready = True
+
+    def record(self, step: str, seconds: float):
+        self.steps[step] = round(seconds, 3)
+
+    async def _preload(self, names: List[str], client):
+        from services.data_fetcher import fetch_pokemon_record
+
+        semaphore = asyncio.Semaphore(max(1, config.WARMUP_CONCURRENCY))
+
+        async def load(name: str):
+            async with semaphore:
+                try:
+                    record = await fetch_pokemon_record(name, client)
+                except Exception as e:  # upstream down or circuit open: the first request retries
+                    print(f"Warm-up could not load {name}: {e!r}")
+                    record = None
+            self.pokemon["loaded" if record else "failed"] += 1
+
+        await asyncio.gather(*(load(name) for name in names))
+
+    async def _run(self, client, session_factory: Callable[[], Any]):
+        from services.battle_simulator import warm_up_registries
+
+        started = time.perf_counter()
+        await asyncio.to_thread(warm_up_registries)
+        self.record("engine", time.perf_counter() - started)
+
+        started = time.perf_counter()
+        names = await asyncio.to_thread(hot_pokemon, session_factory)
+        self.pokemon["total"] = len(names)
+        await self._preload(names, client)
+        self.record("pokemon", time.perf_counter() - started)
+
+    async def run(self, client, session_factory: Callable[[], Any]):
+        """Warm everything up, then mark ready; gives up waiting after WARMUP_TIMEOUT_SECONDS."""
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._run(client, session_factory), config.WARMUP_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            self.timed_out = True
+            print(f"Warm-up timed out after {config.WARMUP_TIMEOUT_SECONDS}s; serving anyway.")
+        except Exception as e:
+            print(f"Warm-up failed: {e!r}")
+        self.record("total", time.perf_counter() - started)
+        self.mark_ready()
+        print(f"Warm-up done: {self.pokemon['loaded']}/{self.pokemon['total']} Pokémon in {self.steps['total']}s.")
+
+    def status(self) -> Dict[str, Any]:
+        return {"ready": self.ready, "timed_out": self.timed_out, "steps": dict(self.steps),
+                "pokemon": dict(self.pokemon)}
+
+
+warmup = WarmUp()
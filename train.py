@@ -1,11 +1,16 @@
-from ai.rl_agent import QLearningAgent, save_agent
-from ai.battle_env import PokemonBattleEnv
+import argparse
 import random
 from collections import Counter
-import matplotlib.pyplot as plt
-from typing import Tuple, List
+from typing import Callable, Optional
+
+import numpy as np
 
-# Pokémon info 
+from ai.rl_agent import QLearningAgent, save_agent
+from ai.battle_env import PokemonBattleEnv
+from ai.metrics import TrainingMetrics
+from ai.checkpoint import QTableCheckpointer
+
+# Pokémon info
 p1_info = {
     "name": "charizard",
     "types": ["fire", "flying"],
@@ -30,28 +35,89 @@ p2_info = {
     "available_moves": ["tackle", "quick attack", "water gun"],
 }
 
-def train_agent(episodes=100000) -> Tuple[List[float], List[float], int]: 
-    print("Starting training...")
-    env = PokemonBattleEnv(p1_info, p2_info)
-    agent = QLearningAgent(actions=p1_info["available_moves"])
-
-    epsilon = 1.0
-    epsilon_decay = 0.995
-    min_epsilon = 0.1
-
-    episode_rewards = []
-    win_count = 0
+UPDATE_MODES = ("one_step", "n_step", "lambda")
+
+def train_agent(episodes=100000, log_every=100, metrics_dir: Optional[str] = None,
+                verbose=False, replay=False, batch_size=32, replay_updates=4,
+                replay_capacity=50000, prioritized=False, update="one_step",
+                n_step=3, lam=0.8, seed: Optional[int] = None,
+                epsilon_start=1.0, epsilon_decay=0.995, min_epsilon=0.1,
+                save_path: Optional[str] = 'qtable.pkl', agent: Optional[QLearningAgent] = None,
+                p1: Optional[dict] = None, p2: Optional[dict] = None,
+                on_episode_end: Optional[Callable[[int, QLearningAgent, TrainingMetrics], bool]] = None,
+                checkpoint_dir: Optional[str] = None, checkpoint_every=100, compact_every=20,
+                resume=False) -> TrainingMetrics:
+    """
+    Train a Q-learning agent on the p1/p2 matchup (charizard vs blastoise by default).
+
+    Nothing is printed per step; `TrainingMetrics` aggregates every `log_every`
+    episodes and, when `metrics_dir` is set, writes metrics.csv and series.npz there.
+
+    With `replay=True` transitions go to a replay buffer and each environment
+    step is followed by `replay_updates` minibatch updates of `batch_size`,
+    so every simulated step is reused many times.
+
+    `update` selects the online rule: "one_step" (classic Q-learning),
+    "n_step" (`n_step`-step returns) or "lambda" (Watkins' Q(lambda) with `lam`).
+    Exploration starts at `epsilon_start` and decays by `epsilon_decay` per
+    episode down to `min_epsilon`.
+    `on_episode_end(episode, agent, metrics)` may return True to stop early.
+    Pass `agent` to keep a handle on the trained agent (a fresh one is created otherwise).
+
+    With `checkpoint_dir`, the rows changed every `checkpoint_every` episodes are
+    appended to a delta log there and compacted into a snapshot every
+    `compact_every` checkpoints (see ai/checkpoint.py). `resume=True` reloads it
+    and continues from the checkpointed episode and epsilon; otherwise any
+    checkpoint already in the directory is replaced when training starts.
+    """
+    if update not in UPDATE_MODES:
+        raise ValueError(f"Unknown update mode '{update}', expected one of {UPDATE_MODES}")
+    if replay and update != "one_step":
+        raise ValueError("Replay training only supports the one_step update")
+    if agent is not None and not isinstance(agent, QLearningAgent) and (replay or update != "one_step"):
+        raise ValueError("replay/n_step/lambda options only apply to QLearningAgent")
+    if agent is not None and not isinstance(agent, QLearningAgent) and checkpoint_dir:
+        raise ValueError("Checkpointing only applies to QLearningAgent")
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+
+    if verbose:
+        print("Starting training...")
+    p1 = p1 or p1_info
+    p2 = p2 or p2_info
+    env = PokemonBattleEnv(p1, p2)
+    if agent is None:
+        agent = QLearningAgent(actions=env.simulator.p1.available_moves)
+    else:
+        agent.actions = env.simulator.p1.available_moves
+    if replay:
+        agent.enable_replay(capacity=replay_capacity, prioritized=prioritized, seed=seed)
+    metrics = TrainingMetrics(episodes, log_every=log_every, output_dir=metrics_dir, verbose=verbose)
+
+    epsilon = epsilon_start
+    start_episode = 0
+    checkpointer = None
+    if checkpoint_dir:
+        checkpointer = QTableCheckpointer(checkpoint_dir, compact_every=compact_every)
+        restored = checkpointer.restore(agent) if resume else None
+        if restored is not None:
+            start_episode, epsilon = restored
+            agent.actions = env.simulator.p1.available_moves
+            if verbose:
+                print(f"Resumed from episode {start_episode} (epsilon={epsilon:.3f})")
+        else:
+            # A new run: replace any earlier run's snapshot and delta log with this agent's table
+            checkpointer.compact(agent, start_episode, epsilon)
     action_counter = Counter()
-    epsilon_history = []
 
-    for episode in range(episodes):
+    for episode in range(start_episode, episodes):
         state = env.reset()
+        agent.begin_episode()
         done = False
         total_reward = 0
         step_count = 0
 
-        print(f"Episode {episode} started, epsilon={epsilon:.3f}")
-
         while not done and step_count < 100:
             if random.random() < epsilon:
                 action = random.choice(agent.actions)
@@ -60,55 +126,108 @@ def train_agent(episodes=100000) -> Tuple[List[float], List[float], int]:
 
             action_counter[action] += 1
 
+            greedy = update == "lambda" and agent.is_greedy(state, action)
             next_state, reward, done, _ = env.step(action)
-            agent.learn(state, action, reward, next_state)
+            if replay:
+                agent.remember(state, action, reward, next_state, done)
+                for _ in range(replay_updates):
+                    agent.learn_batch(batch_size)
+            elif update == "n_step":
+                agent.learn_n_step(state, action, reward, next_state, done, n=n_step)
+            elif update == "lambda":
+                agent.learn_lambda(state, action, reward, next_state, done, lam=lam, greedy=greedy)
+            else:
+                agent.learn(state, action, reward, next_state)
 
             state = next_state
             total_reward += reward
-            print(f" Step {step_count}: action={action}, reward={reward}, done={done}")
-
             step_count += 1
 
         epsilon = max(min_epsilon, epsilon * epsilon_decay)
-        epsilon_history.append(epsilon)
-        episode_rewards.append(total_reward)
-
-        if total_reward > 0:
-            win_count += 1
-
-        print(f"Episode {episode} finished with total reward {total_reward:.2f}")
-
-    print("Training completed")
-    print(f"Total wins: {win_count} out of {episodes} episodes, Win rate: {win_count / episodes * 100:.2f}%")
-    print("Action distribution:")
-    for action, count in action_counter.items():
-        print(f"  {action}: {count} times")
+        metrics.record(total_reward, epsilon, step_count, total_reward > 0)
+        if checkpointer is not None and (episode + 1) % checkpoint_every == 0:
+            checkpointer.checkpoint(agent, episode + 1, epsilon)
+        if on_episode_end is not None and on_episode_end(episode, agent, metrics):
+            break
+
+    if checkpointer is not None and (start_episode + metrics.count) % checkpoint_every:
+        checkpointer.checkpoint(agent, start_episode + metrics.count, epsilon)
+    metrics.close()
+    metrics.action_counts = dict(action_counter)
+
+    if verbose:
+        print("Training completed")
+        print(f"Total wins: {metrics.win_count} out of {metrics.count} episodes, Win rate: {metrics.win_rate * 100:.2f}%")
+        print("Action distribution:")
+        for action, count in action_counter.items():
+            print(f"  {action}: {count} times")
 
     # Save agent after training
-    save_agent(agent)
+    if save_path:
+        if isinstance(agent, QLearningAgent):
+            save_agent(agent, save_path)
+        else:
+            agent.save(save_path)
 
-    # Return consistent values
-    return episode_rewards, epsilon_history, win_count
+    return metrics
 
-if __name__ == "__main__":
-    episodes = 10000
-    rewards, epsilons, wins = train_agent(episodes=episodes)  # Accept all 3 return values
+def plot_metrics(metrics: TrainingMetrics):
+    """Plot rewards and epsilon decay. matplotlib is only imported when plotting is requested."""
+    import matplotlib.pyplot as plt
 
     plt.figure(figsize=(12, 5))
 
     plt.subplot(1, 2, 1)
-    plt.plot(rewards, label='Total Reward')
+    plt.plot(metrics.rewards[:metrics.count], label='Total Reward')
     plt.xlabel('Episode')
     plt.ylabel('Total Reward')
     plt.title('Training Progress: Rewards per Episode')
     plt.legend()
 
     plt.subplot(1, 2, 2)
-    plt.plot(epsilons, label='Epsilon (exploration rate)', color='orange')
+    plt.plot(metrics.epsilons[:metrics.count], label='Epsilon (exploration rate)', color='orange')
     plt.xlabel('Episode')
     plt.ylabel('Epsilon')
     plt.title('Epsilon Decay Over Training')
     plt.legend()
 
     plt.tight_layout()
-    plt.show()
\ No newline at end of file
+    plt.show()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the Q-learning agent headlessly.")
+    parser.add_argument("--episodes", type=int, default=10000)
+    parser.add_argument("--log-every", type=int, default=100, help="Episodes per aggregated metrics row")
+    parser.add_argument("--metrics-dir", default=None, help="Directory for metrics.csv / series.npz")
+    parser.add_argument("--plot", action="store_true", help="Show matplotlib plots after training")
+    parser.add_argument("--replay", action="store_true", help="Train from a replay buffer with minibatch updates")
+    parser.add_argument("--prioritized", action="store_true", help="Use prioritized replay sampling")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--replay-updates", type=int, default=4, help="Minibatch updates per environment step")
+    parser.add_argument("--update", choices=UPDATE_MODES, default="one_step", help="Online update rule")
+    parser.add_argument("--n-step", type=int, default=3, help="Horizon for --update n_step")
+    parser.add_argument("--lam", type=float, default=0.8, help="Trace decay for --update lambda")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--agent", choices=("qlearning", "dqn"), default="qlearning")
+    parser.add_argument("--checkpoint-dir", default=None, help="Write incremental Q-table checkpoints here")
+    parser.add_argument("--checkpoint-every", type=int, default=100, help="Episodes between checkpoints")
+    parser.add_argument("--compact-every", type=int, default=20, help="Checkpoints between full snapshots")
+    parser.add_argument("--resume", action="store_true", help="Continue from the checkpoint in --checkpoint-dir")
+    args = parser.parse_args()
+
+    agent = None
+    save_path = 'qtable.pkl'
+    if args.agent == "dqn":
+        from ai.dqn_agent import DQNAgent
+        agent = DQNAgent(actions=p1_info["available_moves"], seed=args.seed)
+        save_path = 'dqn.pt'
+
+    metrics = train_agent(agent=agent, save_path=save_path, episodes=args.episodes, log_every=args.log_every,
+                          metrics_dir=args.metrics_dir, verbose=True,
+                          replay=args.replay, batch_size=args.batch_size,
+                          replay_updates=args.replay_updates, prioritized=args.prioritized,
+                          update=args.update, n_step=args.n_step, lam=args.lam, seed=args.seed,
+                          checkpoint_dir=args.checkpoint_dir, checkpoint_every=args.checkpoint_every,
+                          compact_every=args.compact_every, resume=args.resume)
+    if args.plot:
+        plot_metrics(metrics)